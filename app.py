@@ -1,60 +1,54 @@
 import os
-import io
 import re
-import importlib
+import secrets
+import time
 from flask import (
     Flask, render_template, request, redirect, url_for,
-    session, abort, send_file, jsonify, make_response
+    session, abort, jsonify, make_response, Response, stream_with_context, g
 )
+from flask.sessions import SecureCookieSessionInterface
 from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_wtf import CSRFProtect
 from flask_wtf.csrf import CSRFError
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from limiter_storage import default_uri as default_limiter_uri  # registers sqlite://
 from werkzeug.exceptions import RequestEntityTooLarge
 
-# -----------------------------------------------------------------------------
-# pydyf compatibility shim (MUST run before importing weasyprint)
-# Some environments expose pydyf.PDF.__init__(self) while WeasyPrint>=53
-# calls PDF(version, identifier). This shim normalizes the constructor
-# and patches the symbol inside weasyprint.pdf as well.
-# -----------------------------------------------------------------------------
-_PATCH_WPDF = None
-try:
-    import inspect
-    import pydyf
-    sig = str(inspect.signature(pydyf.PDF.__init__))
-    if sig == "(self)":
-        _OldPDF = pydyf.PDF
-
-        class _ShimPDF(_OldPDF):  # keep class name semantics
-            def __init__(self, version="1.7", identifier=None):
-                super().__init__()  # ignore args for old API
-
-        pydyf.PDF = _ShimPDF
-
-        def _patch_weasyprint_pdf():
-            try:
-                wpdf = importlib.import_module("weasyprint.pdf")
-                wpdf.PDF = _ShimPDF
-            except Exception:
-                pass
-
-        _PATCH_WPDF = _patch_weasyprint_pdf
-except Exception:
-    _PATCH_WPDF = None
-
-# Import WeasyPrint AFTER the shim
-from weasyprint import HTML, CSS
-if _PATCH_WPDF:
-    _PATCH_WPDF()
-
-# DOCX
-from docx import Document
-
 # Forms
 from forms import ResumeRequestForm
 
+# Render cache / worker pool
+from render_cache import RenderCache, files_version, render_key
+from render_pool import RenderPool, PoolSaturated
+from export import Output, PDF, MIMETYPES, cache_tag, export_job, raster_job
+from pdf_profiles import profile_for
+from bundle import iter_zip
+
+# Resume model / text normalization
+from resume_model import LIST_FIELDS, Resume
+from taxonomy import get_taxonomy
+from textnorm import clean_field, split_items
+
+# Live preview
+from preview import SECTIONS, merge as merge_preview, section_hash, section_inputs
+
+# Sessions
+from session_store import SessionStore, StoreSessionInterface
+
+# nginx X-Accel-Redirect delivery
+from spool import Spool
+
+# Asynchronous render jobs
+from jobs import JobQueue, Retry
+
+# Instrumentation
+from metrics import Metrics, server_timing
+from events import EventLog
+
+# Prebuilt theme gallery (tools/build_gallery.py)
+from gallery import load_manifest
+
 # -----------------------------------------------------------------------------
 # App setup
 # -----------------------------------------------------------------------------
@@ -70,91 +64,175 @@ app.config.update(
     SESSION_COOKIE_SAMESITE="Lax",
     WTF_CSRF_TIME_LIMIT=None,
     TEMPLATES_AUTO_RELOAD=True,
+    # RATELIMIT_ENABLED=0 lifts the per-IP limits, e.g. for tools.loadtest from one address
+    RATELIMIT_ENABLED=os.environ.get("RATELIMIT_ENABLED", "1") != "0",
 )
 
 CSRFProtect(app)
 
+# Server-side sessions (sharded files under fs_session/); SESSION_BACKEND=cookie
+# falls back to Flask's signed-cookie sessions.
+session_store = None
+if os.environ.get("SESSION_BACKEND", "fs") != "cookie":
+    session_store = SessionStore(
+        os.environ.get("SESSION_STORE_DIR") or os.path.join(app.root_path, "fs_session"),
+        ttl=int(os.environ.get("SESSION_TTL", 24 * 3600)),
+        max_bytes=int(os.environ.get("SESSION_STORE_MAX_BYTES", 256 * 1024 * 1024)),
+        sweep_interval=int(os.environ.get("SESSION_SWEEP_INTERVAL", 300)),
+    )
+    app.session_interface = StoreSessionInterface(session_store)
+
+# Phase timers -> Server-Timing + /metrics, summed over every worker's
+# snapshot file in METRICS_DIR.
+metrics = Metrics(os.environ.get("METRICS_DIR") or None)
+
+# Submission/render/download events as JSONL, written off the request path
+# (tools/analyze_events.py); off unless EVENT_LOG_DIR is set.
+events = EventLog(
+    os.environ.get("EVENT_LOG_DIR") or None,
+    max_bytes=int(os.environ.get("EVENT_LOG_MAX_BYTES", 64 * 1024 * 1024)),
+    max_age=float(os.environ.get("EVENT_LOG_ROTATE_SECONDS", 3600)),
+    keep=int(os.environ.get("EVENT_LOG_KEEP", 48)),
+    queue_size=int(os.environ.get("EVENT_LOG_QUEUE", 10000)),
+)
+
+if session_store is None:
+    # own instance: Flask's default interface object is shared by every app
+    app.session_interface = SecureCookieSessionInterface()
+_open_session = app.session_interface.open_session
+
+def _timed_open_session(app_, request_):
+    with metrics.phase("session"):
+        return _open_session(app_, request_)
+
+app.session_interface.open_session = _timed_open_session
+
 limiter = Limiter(
     key_func=get_remote_address,
     app=app,
     default_limits=["60/minute", "800/hour"],
-    storage_uri=os.environ.get("LIMITER_STORAGE_URI", "memory://"),
+    # shared by every worker on the box; memory:// would count per process
+    storage_uri=os.environ.get("LIMITER_STORAGE_URI") or default_limiter_uri(),
+)
+
+# With SPOOL_DIR set, downloads are written there and handed to nginx with
+# X-Accel-Redirect (see the internal /_spool/ location in infra/nginx), so
+# workers don't stream bytes to slow clients.
+spool = None
+if os.environ.get("SPOOL_DIR"):
+    spool = Spool(
+        os.environ["SPOOL_DIR"],
+        secret=app.config["SECRET_KEY"],
+        prefix=os.environ.get("SPOOL_URI_PREFIX", "/_spool/"),
+        ttl=int(os.environ.get("SPOOL_TTL", 600)),
+        sweep_interval=int(os.environ.get("SPOOL_SWEEP_INTERVAL", 60)),
+    )
+
+# Render jobs (POST /jobs) live in a local SQLite file so queued work
+# survives worker restarts; each worker runs JOB_RUNNERS runner threads.
+# The file holds finished artifacts too, so it defaults to the instance
+# folder rather than the code tree.
+job_queue = JobQueue(
+    os.environ.get("JOBS_DB") or os.path.join(app.instance_path, "jobs.db"),
+    ttl=int(os.environ.get("JOBS_TTL", 3600)),
+    lease=float(os.environ.get("JOBS_LEASE", 120)),
+)
+JOB_RUNNERS = int(os.environ.get("JOB_RUNNERS", 1))
+
+# Rendered artifacts are cached by content; the disk tier is optional and is
+# shared by every worker that points at the same directory.
+render_cache = RenderCache(
+    max_bytes=int(os.environ.get("RENDER_CACHE_BYTES", 32 * 1024 * 1024)),
+    disk_dir=os.environ.get("RENDER_CACHE_DIR") or None,
+    disk_max_bytes=int(os.environ.get("RENDER_CACHE_DISK_BYTES", 512 * 1024 * 1024)),
+)
+
+# Live-preview HTML fragments, keyed by a hash of each section's inputs.
+fragment_cache = RenderCache(max_bytes=int(os.environ.get("FRAGMENT_CACHE_BYTES", 4 * 1024 * 1024)))
+
+# WeasyPrint layouts run in a small pre-warmed process pool so a burst of
+# downloads can't starve cheap routes; RENDER_POOL_SIZE=0 renders inline.
+# Nothing here imports WeasyPrint or python-docx: the pool starts on the
+# first render, or from gunicorn's post_fork hook (gunicorn.conf.py).
+render_pool = RenderPool(
+    size=int(os.environ.get("RENDER_POOL_SIZE", 2)),
+    queue_depth=int(os.environ.get("RENDER_QUEUE_DEPTH", 4)),
+    timeout=float(os.environ.get("RENDER_TIMEOUT", 30)),
+    css_path=os.path.join(app.static_folder or "static", "resume.css"),
+    # governor: recycle long-lived workers before their caches bloat
+    max_renders=int(os.environ.get("RENDER_MAX_RENDERS", 200)),
+    max_rss_mb=int(os.environ.get("RENDER_MAX_RSS_MB", 600)),
+    mem_limit_mb=int(os.environ.get("RENDER_MEM_LIMIT_MB", 0)),
+    on_recycle=lambda kind: metrics.inc("resumeunicorn_render_recycles_total", reason=kind),
 )
 
+def preload():
+    """Import and warm every render dependency in this process.
+
+    Called by the gunicorn master in preload mode (GUNICORN_PRELOAD=1) so
+    workers fork with python-docx templates, compiled Jinja templates and
+    the skill taxonomy already in shared, copy-on-write memory.
+
+    WeasyPrint, the pydyf shim, theme CSS and fonts are only warmed here
+    when RENDER_POOL_SIZE=0. With a pool, PDFs and images render in
+    processes forked from a separate forkserver, which never sees the
+    master's memory; those warm themselves in ``render_pool._warm_worker``,
+    and loading WeasyPrint in the master would only add to every worker's
+    RSS.
+    """
+    import gc
+    from generators.docx_builder import render_docx
+    from themes import DEFAULT_THEME, THEMES
+
+    # templates are immutable in production; skip the per-render mtime stat
+    app.config["TEMPLATES_AUTO_RELOAD"] = False
+    app.jinja_env.auto_reload = False
+    for name in ("form.html", "success.html", "resume.html"):
+        app.jinja_env.get_template(name)
+    get_taxonomy()  # compile the skill automaton before forking
+
+    warm = Resume(name="Warm Up", role="Engineer", email="warm@example.com",
+                  summary="Warm-up render.", skills=("Python",))
+    with app.test_request_context():
+        html = render_resume_html(warm)
+    if not render_pool.size:
+        import weasy_compat  # noqa: F401  applies the pydyf shim once
+    for theme in THEMES:
+        if not render_pool.size:
+            # one full export loads Pillow/pypdfium2 too; other themes parse their CSS
+            outputs = [Output("jpeg")] if theme == DEFAULT_THEME else []
+            export_job(html, app.root_path, render_pool.css_path, theme, outputs)
+        render_docx(warm.replace(theme=theme))
+    # keep the warm objects out of GC passes, which would dirty their pages
+    gc.freeze()
+
 # -----------------------------------------------------------------------------
 # Helpers
 # -----------------------------------------------------------------------------
-SAFE_ITEM = re.compile(r"[^A-Za-z0-9 +#.\-]")
-
 def csv_to_list(raw: str, limit: int = 24):
-    items = []
-    for s in (raw or "").split(","):
-        t = SAFE_ITEM.sub("", s).strip()
-        if t:
-            items.append(t)
-    seen = set()
-    out = []
-    for i in items:
-        k = i.lower()
-        if k not in seen:
-            seen.add(k)
-            out.append(i)
-    return out[:limit]
+    return split_items(raw, limit)
 
 def clean_text(s: str, n: int):
-    s = (s or "").strip()
-    s = re.sub(r"\s+", " ", s)
-    s = re.sub(r"[\x00-\x08\x0b-\x1f\x7f]", "", s)
-    return s[:n]
+    return clean_field(s, n)
 
 def safe_filename(stem: str, ext: str):
     stem = re.sub(r"[^A-Za-z0-9._-]+", "_", (stem or "resume")).strip("_") or "resume"
     return f"{stem}.{ext}"
 
-def render_resume_html(data: dict) -> str:
-    """Render resume with template; fall back to a tiny inline template if missing."""
-    try:
-        return render_template("resume.html", data=data)
-    except Exception:
-        # minimal, safe fallback so downloads still work
-        from markupsafe import escape
-        name = escape(data.get("name", ""))
-        role = escape(data.get("role", ""))
-        location = escape(data.get("location", ""))
-        email = escape(data.get("email", ""))
-        phone = escape(data.get("phone", ""))
-        linkedin = escape(data.get("linkedin", ""))
-        github = escape(data.get("github", ""))
-        portfolio = escape(data.get("portfolio", ""))
-        summary = escape(data.get("summary", ""))
-
-        skills_list = data.get("skills_list") or []
-        certs_list = data.get("certifications_list") or []
-        langs_list = data.get("languages_list") or []
-
-        bullets = lambda xs: "".join(f"<li>{escape(x)}</li>" for x in xs)
-
-        return f"""
-<!doctype html>
-<html>
-<head>
-<meta charset="utf-8">
-<title>{name} — Resume</title>
-<link rel="stylesheet" href="{request.url_root.rstrip('/')}/static/resume.css">
-</head>
-<body>
-  <h1>{name}</h1>
-  <div class="muted">{role}</div>
-  <div class="muted">{location}</div>
-  <div class="rule"></div>
-  <p class="muted">{email} · {phone} · {linkedin} · {github} · {portfolio}</p>
-  {"<h2>Summary</h2><p>"+summary+"</p>" if summary else ""}
-  {"<h2>Skills</h2><ul>"+bullets(skills_list)+"</ul>" if skills_list else ""}
-  {"<h2>Certifications</h2><ul>"+bullets(certs_list)+"</ul>" if certs_list else ""}
-  {"<h2>Languages</h2><ul>"+bullets(langs_list)+"</ul>" if langs_list else ""}
-</body>
-</html>
-        """
+def _resume() -> Resume:
+    """The session's resume, or None; parsed once per request."""
+    if "resume" not in g:
+        g.resume = Resume.from_state(session.get("resume_data"))
+    return g.resume
+
+def render_resume_html(data: Resume, page: bool = False) -> str:
+    """Render the resume template.
+
+    ``page=True`` is the /resume web page: it links the stylesheet and adds
+    the download buttons. Exports leave both out; their stylesheets come
+    from the theme registry (export.layout).
+    """
+    return render_template("resume.html", data=data, page=page)
 
 # -----------------------------------------------------------------------------
 # Routes
@@ -174,44 +252,25 @@ def index():
             abort(400, description="Invalid input.")
 
         if form.validate_on_submit():
-            # Normalize all fields we use later (never trust template presence)
-            data = dict(
-                name=clean_text(form.name.data, 80),
-                email=clean_text(form.email.data, 120),
-                phone=clean_text(getattr(form, "phone", type("F", (), {"data": ""}))().data, 40) if hasattr(form, "phone") else "",
-                role=clean_text(form.role.data, 100),
-                location=clean_text(getattr(form, "location", type("F", (), {"data": ""}))().data, 120) if hasattr(form, "location") else "",
-                years=clean_text(getattr(form, "years", type("F", (), {"data": ""}))().data or "", 10) if hasattr(form, "years") else "",
-                summary=clean_text(form.summary.data or "", 1200),
-                linkedin=clean_text(getattr(form, "linkedin", type("F", (), {"data": ""}))().data or "", 200) if hasattr(form, "linkedin") else "",
-                github=clean_text(getattr(form, "github", type("F", (), {"data": ""}))().data or "", 200) if hasattr(form, "github") else "",
-                portfolio=clean_text(getattr(form, "portfolio", type("F", (), {"data": ""}))().data or "", 200) if hasattr(form, "portfolio") else "",
-                work_mode=(getattr(form, "work_mode", type("F", (), {"data": ""}))().data or ""),
-                theme=(getattr(form, "theme", type("F", (), {"data": ""}))().data or "emerald"),
-            )
-
-            # CSV-ish lists -> arrays
-            data["skills_list"] = csv_to_list(getattr(form, "skills", type("F", (), {"data": ""}))().data)
-            data["certifications_list"] = csv_to_list(
-                getattr(form, "certifications", type("F", (), {"data": ""}))().data
-            )
-            data["languages_list"] = csv_to_list(
-                getattr(form, "languages", type("F", (), {"data": ""}))().data
-            )
+            # Normalize every field we use later in one pass (never trust template presence)
+            data = Resume.from_form(form.data)
 
             # simple required checks
-            if not data["name"] or not data["role"] or ("@" not in data["email"]):
+            if not data.name or not data.role or ("@" not in data.email):
                 abort(400, description="Invalid input.")
 
             # Save to session for preview & downloads (PRG)
-            session["resume_data"] = data
+            session["resume_data"] = data.state()
+            g.resume = data
+            session.pop("preview_data", None)
             session.modified = True
             return redirect(url_for("success"))
         else:
             # fall through to show validation errors
             pass
 
-    return render_template("form.html", form=form), (400 if form.errors else 200)
+    gallery = load_manifest(app.static_folder or "static")
+    return render_template("form.html", form=form, gallery=gallery), (400 if form.errors else 200)
 
 @app.get("/success")
 def success():
@@ -219,91 +278,509 @@ def success():
 
 @app.get("/resume")
 def resume():
-    data = session.get("resume_data")
-    if not data:
+    data = _resume()
+    if data is None:
         return redirect(url_for("index"))
-    html = render_resume_html(data)
-    return html
+    return render_resume_html(data, page=True)
+
+@app.post("/resume/preview")
+@limiter.limit("120/minute")
+def resume_preview():
+    """Re-render only the resume sections a partial form update changed.
+
+    JSON body: ``{"fields": {changed form fields}, "known": {section: hash},
+    "reset": bool}``. ``reset`` starts the draft from ``fields`` alone;
+    otherwise they are merged into the session's draft. The response holds
+    every section's hash and the HTML of the sections not in ``known``.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get("fields") or {}, dict):
+        abort(400, description="Expected a JSON object.")
+    base = Resume() if body.get("reset") else (
+        Resume.from_state(session.get("preview_data")) or _resume() or Resume())
+    draft = merge_preview(base, body.get("fields") or {})
+    if draft != base:
+        session["preview_data"] = draft.state()
+
+    known = body.get("known") if isinstance(body.get("known"), dict) else {}
+    hashes, sections = {}, {}
+    with metrics.phase("html"):
+        for name in SECTIONS:
+            template = f"sections/{name}.html"
+            h = hashes[name] = section_hash(draft, name, os.path.join(app.root_path, "templates", template))
+            if known.get(name) == h:
+                continue
+            html = fragment_cache.get_or_render(
+                h, lambda: render_template(template, data=section_inputs(draft, name)).encode("utf-8"))
+            sections[name] = html.decode("utf-8")
+    resp = jsonify(hashes=hashes, sections=sections)
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+@app.post("/resume/match")
+@limiter.limit("30/minute")
+def resume_match():
+    """Match the session's resume against a pasted job description.
+
+    Body: JSON ``{"text": ...}``, a ``text`` form field, or text/plain (up to
+    MAX_CONTENT_LENGTH). Returns the taxonomy terms the description mentions,
+    split into ``matched`` (on the resume) and ``missing``, and their ratio.
+    """
+    data = _resume()
+    if data is None:
+        abort(400, description="No resume data.")
+    if request.is_json:
+        body = request.get_json(silent=True)
+        text = body.get("text") if isinstance(body, dict) else None
+    elif request.mimetype == "text/plain":
+        text = request.get_data(as_text=True)
+    else:
+        text = request.form.get("text")
+    if not isinstance(text, str) or not text.strip():
+        abort(400, description="Expected a job description.")
+    items = [x for name in LIST_FIELDS for x in getattr(data, name)]
+    with metrics.phase("match"):
+        result = get_taxonomy().match(items, text)
+    resp = jsonify(result)
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+def _render_deps():
+    """Files whose content shapes every rendered artifact."""
+    return (
+        os.path.join(app.root_path, "templates", "resume.html"),
+        os.path.join(app.static_folder or "static", "resume.css"),
+        os.path.join(app.root_path, "themes.py"),  # accent colors
+        os.path.join(app.root_path, "pdf_profiles.py"),  # write_pdf options, profile CSS
+        os.path.join(app.root_path, "generators", "docx_builder.py"),
+    )
+
+def _run_render(fn, *args):
+    """render_pool.run plus phase timings: the worker's phases and the wait for it."""
+    t0 = time.perf_counter()
+    products = render_pool.run(fn, *args)
+    elapsed = time.perf_counter() - t0
+    for name, seconds in products.timings.items():
+        metrics.record_phase(name, seconds)
+    metrics.record_phase("queue", max(0.0, elapsed - sum(products.timings.values())))
+    for out in products:
+        metrics.inc("resumeunicorn_renders_total", format=out.fmt)
+    g.rendered = True
+    return products
+
+def _render_docx(data: Resume) -> bytes:
+    from generators.docx_builder import render_docx
+    with metrics.phase("docx"):
+        docx_bytes = render_docx(data)
+    metrics.inc("resumeunicorn_renders_total", format="docx")
+    g.rendered = True
+    return docx_bytes
+
+def _artifact_key(data: Resume, tag: str) -> str:
+    """Render cache key for one artifact; also served as its strong ETag."""
+    return render_key(data.state(), data.theme, tag, files_version(_render_deps()))
+
+def _cached_render(data: Resume, fmt: str, render):
+    return render_cache.get_or_render(_artifact_key(data, fmt), render)
+
+# Downloads are per-user (the URL is the same for everyone, the session picks
+# the content): browsers may keep them but must revalidate, shared caches never.
+PRIVATE_CACHE = "private, no-cache"
+
+DOCX_MIMETYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+def _not_modified(etag: str):
+    """A 304 for a matching If-None-Match, decided before anything is rendered."""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    resp = Response(status=304)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = PRIVATE_CACHE
+    resp.vary.add("Cookie")
+    metrics.inc("resumeunicorn_not_modified_total", endpoint=request.endpoint)
+    return resp
+
+def _user_key() -> str:
+    """Random per-session id naming this user's spool directory and jobs."""
+    if "user_key" not in session:
+        session["user_key"] = secrets.token_urlsafe(16)
+    return session["user_key"]
+
+def _spooled(body: bytes, mimetype: str):
+    """X-Accel-Redirect URI for body in the spool, or None to send it ourselves."""
+    if spool is None:
+        return None
+    try:
+        uri = spool.publish(body, mimetype, _user_key())
+    except OSError as e:
+        metrics.error(e)
+        return None
+    g.spooled_bytes = len(body)
+    return uri
+
+def _download(body: bytes, mimetype: str, etag: str, filename: str = None, ranges: bool = False):
+    uri = _spooled(body, mimetype)
+    resp = Response(b"" if uri else body, mimetype=mimetype)
+    if filename:
+        resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = PRIVATE_CACHE
+    resp.vary.add("Cookie")  # the artifact comes from this visitor's session
+    if uri:
+        # nginx sends the file (and answers Range itself); headers above pass through
+        resp.headers["X-Accel-Redirect"] = uri
+        return resp
+    # answers Range / If-Range with 206 (or 416) from the bytes we already have
+    return resp.make_conditional(request, accept_ranges=ranges, complete_length=len(body))
+
+def _profile(data: Resume) -> str:
+    """PDF profile for this request: ?profile=, else the theme's default."""
+    try:
+        g.profile = profile_for(data.theme, request.args.get("profile"))
+    except ValueError as e:
+        abort(400, str(e))
+    return g.profile
+
+def _export(data: Resume, outputs, profile: str) -> dict:
+    """Return {Output: bytes}, laying the resume out at most once.
+
+    Missing rasters are derived from a cached PDF when there is one; otherwise
+    a single layout produces the PDF and every missing output together, and
+    all of them are cached.
+    """
+    theme = data.theme
+    version = files_version(_render_deps())
+    state = data.state()
+    keys = {out: render_key(state, theme, cache_tag(out, profile), version) for out in {PDF, *outputs}}
+    found = {out: render_cache.get(keys[out]) for out in outputs}
+    missing = [out for out, value in found.items() if value is None]
+    if missing:
+        pdf_bytes = found[PDF] if PDF in found else render_cache.get(keys[PDF])
+        if pdf_bytes is None:
+            with metrics.phase("html"):
+                html = render_resume_html(data)
+            products = _run_render(export_job, html, app.root_path, render_pool.css_path, theme, missing, profile)
+        else:
+            products = _run_render(raster_job, pdf_bytes, missing)
+        for out, value in products.items():
+            render_cache.put(keys[out], value)
+            if out in found:
+                found[out] = value
+    return found
+
+def _int_arg(name: str, default: int, lo: int, hi: int) -> int:
+    value = request.args.get(name, default, type=int)
+    return min(hi, max(lo, value))
 
 @app.get("/resume.pdf")
 def resume_pdf():
-    data = session.get("resume_data")
-    if not data:
+    """The resume as PDF (?profile=standard|ats|print, default per theme)."""
+    data = _resume()
+    if data is None:
         abort(400, "No resume in session; please submit the form.")
+    profile = _profile(data)
+    etag = _artifact_key(data, cache_tag(PDF, profile))
+    unchanged = _not_modified(etag)
+    if unchanged:
+        return unchanged
     try:
-        html = render_resume_html(data)
-        # local CSS if present
-        styles = None
-        css_path = os.path.join(app.static_folder or "static", "resume.css")
-        if os.path.exists(css_path):
-            styles = [CSS(css_path)]
-        pdf_bytes = HTML(string=html, base_url=app.root_path).write_pdf(stylesheets=styles)
-        filename = safe_filename(data.get("name") or "resume", "pdf")
-        resp = make_response(pdf_bytes)
-        resp.headers["Content-Type"] = "application/pdf"
-        resp.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
-        resp.headers["Cache-Control"] = "no-store"
-        return resp
+        pdf_bytes = _export(data, [PDF], profile)[PDF]
+    except PoolSaturated:
+        raise
     except Exception as e:
+        metrics.error(e)
         return make_response(f"PDF render error: {type(e).__name__}: {e}", 500)
-
-@app.get("/resume.jpg")
-def resume_jpg():
-    """Render HTML → PNG with WeasyPrint, convert to JPEG via Pillow."""
-    data = session.get("resume_data")
-    if not data:
+    filename = safe_filename(data.name or "resume", "pdf")
+    return _download(pdf_bytes, MIMETYPES["pdf"], etag, filename, ranges=True)
+
+@app.get("/resume.jpg", defaults={"ext": "jpg"})
+@app.get("/resume.<any(png, webp):ext>")
+def resume_jpg(ext):
+    """Full-size raster of the resume layout (?dpi=48-300, ?quality=30-95, ?profile=)."""
+    data = _resume()
+    if data is None:
         abort(400, "No resume in session; please submit the form.")
+    fmt = "jpeg" if ext == "jpg" else ext
+    dpi = _int_arg("dpi", 96, 48, 300)
+    quality = None if fmt == "png" else _int_arg("quality", 92, 30, 95)
+    out = Output(fmt, dpi, quality)
+    profile = _profile(data)
+    etag = _artifact_key(data, cache_tag(out, profile))
+    unchanged = _not_modified(etag)
+    if unchanged:
+        return unchanged
     try:
-        from PIL import Image
-        html = render_resume_html(data)
-        png_io = io.BytesIO()
-        # write_png is available in modern WeasyPrint (61.x)
-        HTML(string=html, base_url=app.root_path).write_png(png_io)
-        png_io.seek(0)
-        img = Image.open(png_io).convert("RGB")
-        jpg_io = io.BytesIO()
-        img.save(jpg_io, format="JPEG", quality=92, optimize=True)
-        jpg_io.seek(0)
-        filename = safe_filename(data.get("name") or "resume", "jpg")
-        return send_file(jpg_io, mimetype="image/jpeg", as_attachment=True, download_name=filename)
+        img_bytes = _export(data, [out], profile)[out]
+    except PoolSaturated:
+        raise
     except Exception as e:
-        return make_response(f"JPG render error: {type(e).__name__}: {e}", 500)
+        metrics.error(e)
+        return make_response(f"{ext.upper()} render error: {type(e).__name__}: {e}", 500)
+    filename = safe_filename(data.name or "resume", ext)
+    return _download(img_bytes, MIMETYPES[fmt], etag, filename, ranges=True)
+
+@app.get("/resume.thumb.jpg")
+def resume_thumb():
+    """Small inline preview image (?w=80-600, ?quality=30-95, ?profile=)."""
+    data = _resume()
+    if data is None:
+        abort(400, "No resume in session; please submit the form.")
+    out = Output("thumb", width=_int_arg("w", 240, 80, 600), quality=_int_arg("quality", 80, 30, 95))
+    profile = _profile(data)
+    etag = _artifact_key(data, cache_tag(out, profile))
+    unchanged = _not_modified(etag)
+    if unchanged:
+        return unchanged
+    try:
+        thumb = _export(data, [out], profile)[out]
+    except PoolSaturated:
+        raise
+    except Exception as e:
+        metrics.error(e)
+        return make_response(f"Preview render error: {type(e).__name__}: {e}", 500)
+    return _download(thumb, MIMETYPES["thumb"], etag)
 
 @app.get("/resume.docx")
 def resume_docx():
-    data = session.get("resume_data")
-    if not data:
+    data = _resume()
+    if data is None:
+        abort(400, "No resume in session; please submit the form.")
+    etag = _artifact_key(data, "docx")
+    unchanged = _not_modified(etag)
+    if unchanged:
+        return unchanged
+    docx_bytes = _cached_render(data, "docx", lambda: _render_docx(data))
+    filename = safe_filename(data.name or "resume", "docx")
+    return _download(docx_bytes, DOCX_MIMETYPE, etag, filename)
+
+@app.get("/resume.bundle.zip")
+def resume_bundle():
+    """PDF + JPG + DOCX in one ZIP (?profile=), rendered first, then streamed."""
+    data = _resume()
+    if data is None:
+        abort(400, "No resume in session; please submit the form.")
+    stem = data.name or "resume"
+    jpg = Output("jpeg")
+    profile = _profile(data)
+    renders = [
+        (safe_filename(stem, "pdf"), lambda: _export(data, [PDF], profile)[PDF]),
+        # derived from the PDF layout above, no second layout
+        (safe_filename(stem, "jpg"), lambda: _export(data, [jpg], profile)[jpg]),
+        (safe_filename(stem, "docx"), lambda: _cached_render(data, "docx", lambda: _render_docx(data))),
+    ]
+    # Render every member before committing to a 200: a full render queue
+    # still surfaces as 503 + Retry-After and a failed render as a 500, never
+    # as a truncated archive. Streaming then only overlaps zipping and sending.
+    try:
+        rendered = [(name, produce()) for name, produce in renders]
+    except PoolSaturated:
+        raise
+    except Exception as e:
+        metrics.error(e)
+        return make_response(f"Bundle render error: {type(e).__name__}: {e}", 500)
+    body = stream_with_context(iter_zip((name, lambda b=b: b) for name, b in rendered))
+    resp = Response(body, mimetype="application/zip")
+    resp.headers["Content-Disposition"] = f'attachment; filename="{safe_filename(stem, "zip")}"'
+    resp.headers["Cache-Control"] = "no-store"
+    resp.headers["X-Accel-Buffering"] = "no"  # let nginx pass chunks straight through
+    return resp
+
+# -----------------------------------------------------------------------------
+# Render jobs
+# -----------------------------------------------------------------------------
+# ?format= -> output (None: DOCX); same defaults as the export routes, so
+# jobs and direct downloads share render cache entries
+JOB_FORMATS = {"pdf": PDF, "jpg": Output("jpeg"), "png": Output("png", 96, None),
+               "webp": Output("webp"), "docx": None}
+
+def _run_job(job_id, owner, key, fmt, payload):
+    """Runner-thread side of a job: the artifact's bytes, via the render cache."""
+    data = Resume.from_state(payload["data"])
+    if data is None:
+        raise ValueError("job payload from another resume model version")
+    with app.app_context():  # no request: the HTML links nothing, base_url is the app directory
+        try:
+            if fmt == "docx":
+                return render_cache.get_or_render(key, lambda: _render_docx(data))
+            out = Output(*payload["output"])
+            return _export(data, [out], payload["profile"])[out]
+        except PoolSaturated as e:
+            raise Retry(e.retry_after)  # back in the queue, not an attempt
+        except Exception as e:
+            metrics.error(e)
+            raise
+
+def _start_job_runners():
+    job_queue.start_runners(_run_job, JOB_RUNNERS)
+
+def _owned_job(job_id: str) -> dict:
+    job = job_queue.get(job_id, session.get("user_key") or "")
+    if job is None:
+        abort(404, "No such job.")
+    return job
+
+def _job_view(job: dict) -> dict:
+    view = dict(
+        id=job["id"], format=job["format"], status=job["status"], phase=job["phase"],
+        position=job_queue.position(job), error=job["error"] if job["status"] == "failed" else None,
+        status_url=url_for("job_status", job_id=job["id"]),
+    )
+    if job["status"] == "done":
+        view.update(size=job["size"], file_url=url_for("job_file", job_id=job["id"]))
+    return view
+
+def _job_json(view: dict, status: int = 200):
+    resp = jsonify(view)
+    resp.status_code = status
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
+@app.post("/jobs")
+@limiter.limit("20/minute")
+def job_create():
+    """Queue a render of the session's resume (?format=pdf|jpg|png|webp|docx, ?profile=).
+
+    Answers 202 at once; the request never waits for the render.
+    """
+    data = _resume()
+    if data is None:
         abort(400, "No resume in session; please submit the form.")
-    doc = Document()
-    # Title & heading
-    doc.add_heading(data.get("name", ""), level=0)
-    sub_bits = [data.get("role", ""), data.get("location", ""), data.get("email", ""), data.get("phone", "")]
-    doc.add_paragraph(" • ".join([x for x in sub_bits if x]))
-    # Summary
-    if data.get("summary"):
-        doc.add_heading("Professional Summary", level=1)
-        doc.add_paragraph(data["summary"])
-    # Skills / Certs / Languages
-    for key, title in [
-        ("skills_list", "Core Skills"),
-        ("certifications_list", "Certifications"),
-        ("languages_list", "Languages"),
-    ]:
-        vals = data.get(key)
-        if vals:
-            doc.add_heading(title, level=1)
-            doc.add_paragraph(", ".join(vals))
-    buf = io.BytesIO()
-    doc.save(buf)
-    buf.seek(0)
-    filename = safe_filename(data.get("name") or "resume", "docx")
-    return send_file(
-        buf,
-        mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        as_attachment=True,
-        download_name=filename,
+    fmt = request.args.get("format", "pdf")
+    if fmt not in JOB_FORMATS:
+        abort(400, f"Unknown format {fmt!r}.")
+    out = JOB_FORMATS[fmt]
+    if out is None:
+        key, payload = _artifact_key(data, "docx"), dict(data=data.state())
+    else:
+        profile = _profile(data)
+        key = _artifact_key(data, cache_tag(out, profile))
+        payload = dict(data=data.state(), profile=profile, output=list(out))
+    _start_job_runners()
+    view = _job_view(job_queue.submit(_user_key(), key, fmt, payload))
+    resp = _job_json(view, 202)
+    resp.headers["Location"] = view["status_url"]
+    return resp
+
+@app.get("/jobs/<job_id>")
+@limiter.limit("120/minute")
+def job_status(job_id):
+    """Job status for polling: status, phase, queue position, file_url once done."""
+    _start_job_runners()
+    return _job_json(_job_view(_owned_job(job_id)))
+
+@app.get("/jobs/<job_id>/file")
+def job_file(job_id):
+    """The finished artifact of a job (409 while it is still queued or running)."""
+    job = _owned_job(job_id)
+    if job["status"] != "done":
+        abort(409, "Job not finished.")
+    key, fmt, body = job_queue.result(job_id, session.get("user_key") or "")
+    g.format = fmt
+    unchanged = _not_modified(key)
+    if unchanged:
+        return unchanged
+    mimetype = DOCX_MIMETYPE if fmt == "docx" else MIMETYPES[JOB_FORMATS[fmt].fmt]
+    data = _resume()
+    filename = safe_filename((data.name if data else "") or "resume", fmt)
+    return _download(bytes(body), mimetype, key, filename, ranges=fmt != "docx")
+
+# -----------------------------------------------------------------------------
+# Instrumentation
+# -----------------------------------------------------------------------------
+EXPORT_ENDPOINTS = {"resume_pdf", "resume_jpg", "resume_thumb", "resume_docx", "resume_bundle", "job_file"}
+EXPORT_FORMATS = {"resume_pdf": "pdf", "resume_thumb": "thumb", "resume_docx": "docx", "resume_bundle": "zip"}
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+def _count_bytes(body, endpoint, event=None, started=None):
+    sent = 0
+    try:
+        for chunk in body:
+            sent += len(chunk)
+            yield chunk
+    finally:
+        metrics.inc("resumeunicorn_response_bytes_total", sent, endpoint=endpoint)
+        if event is not None:  # streamed: log once the last byte is out
+            event.update(bytes=sent, ms=round((time.perf_counter() - started) * 1000, 2))
+            events.emit("request", **event)
+
+def _request_event(resp) -> dict:
+    """Fields of the "request" event for a submission or export response."""
+    endpoint = request.endpoint
+    data = _resume()
+    fmt = EXPORT_FORMATS.get(endpoint) or (request.view_args or {}).get("ext") or g.get("format")
+    return dict(
+        endpoint=endpoint, method=request.method, status=resp.status_code,
+        ms=round((time.perf_counter() - g.get("request_started", time.perf_counter())) * 1000, 2),
+        bytes=g.get("spooled_bytes", resp.content_length), format=fmt, theme=data.theme if data else None,
+        profile=g.get("profile"), rendered=g.get("rendered", False), error=g.get("error"),
     )
 
+@app.after_request
+def _emit_timings(resp):
+    timings = g.get("phase_timings")
+    if timings:
+        resp.headers["Server-Timing"] = server_timing(timings)
+    endpoint = request.endpoint
+    if endpoint in EXPORT_ENDPOINTS:
+        metrics.observe("resumeunicorn_request_seconds",
+                        time.perf_counter() - g.get("request_started", time.perf_counter()), endpoint=endpoint)
+        event = _request_event(resp) if events.enabled else None
+        if resp.content_length is not None:
+            sent = g.get("spooled_bytes", resp.content_length)  # X-Accel: nginx sends them
+            metrics.inc("resumeunicorn_response_bytes_total", sent, endpoint=endpoint)
+        elif resp.is_streamed:
+            resp.response = _count_bytes(resp.response, endpoint, event, g.get("request_started"))
+            event = None
+        if event is not None:
+            events.emit("request", **event)
+    elif endpoint == "index" and request.method == "POST" and events.enabled:
+        events.emit("request", **_request_event(resp))
+    return resp
+
+CACHE_EVENTS = ("hits", "disk_hits", "misses", "evictions", "disk_evictions", "stores", "coalesced")
+POOL_OUTCOMES = ("submitted", "rejected", "completed", "failed")
+
+def _component_metrics():
+    """Collector for /metrics: the caches', render pool's, spool's and session store's own counters."""
+    for name, cache in (("render", render_cache), ("fragment", fragment_cache)):
+        snap = cache.snapshot()
+        for event in CACHE_EVENTS:
+            yield "resumeunicorn_render_cache_events_total", dict(cache=name, event=event), snap[event]
+        yield "resumeunicorn_render_cache_bytes", dict(cache=name), snap["bytes"]
+        yield "resumeunicorn_render_cache_items", dict(cache=name), snap["items"]
+    pool = dict(render_pool.stats)
+    for outcome in POOL_OUTCOMES:
+        yield "resumeunicorn_render_pool_tasks_total", dict(outcome=outcome), pool[outcome]
+    if spool is not None:
+        sp = dict(spool.metrics)
+        yield "resumeunicorn_spool_files", {}, sp["files"]
+        yield "resumeunicorn_spool_bytes", {}, sp["bytes_on_disk"]
+        yield "resumeunicorn_spool_swept_total", {}, sp["swept"]
+        yield "resumeunicorn_spool_last_sweep_timestamp_seconds", {}, sp["last_sweep_at"]
+    if session_store is not None:
+        ss = session_store.snapshot()
+        yield "resumeunicorn_sessions_live", {}, ss["live_sessions"]
+        yield "resumeunicorn_sessions_bytes", {}, ss["bytes_on_disk"]
+        yield "resumeunicorn_sessions_sweep_seconds", {}, ss["last_sweep_seconds"]
+        yield "resumeunicorn_sessions_last_sweep_timestamp_seconds", {}, ss["last_sweep_at"]
+        yield "resumeunicorn_sessions_swept_total", dict(reason="expired"), ss["swept_expired"]
+        yield "resumeunicorn_sessions_swept_total", dict(reason="over_cap"), ss["swept_over_cap"]
+        yield "resumeunicorn_session_cache_total", dict(result="hit"), ss["cache_hits"]
+        yield "resumeunicorn_session_cache_total", dict(result="miss"), ss["cache_misses"]
+
+metrics.add_collector(_component_metrics)
+
+@app.get("/metrics")
+@limiter.exempt
+def metrics_endpoint():
+    resp = make_response(metrics.render_prometheus())
+    resp.headers["Content-Type"] = "text/plain; version=0.0.4; charset=utf-8"
+    resp.headers["Cache-Control"] = "no-store"
+    return resp
+
 # -----------------------------------------------------------------------------
 # Errors
 # -----------------------------------------------------------------------------
@@ -311,6 +788,13 @@ def resume_docx():
 def handle_413(e):
     return "Request too large", 413
 
+@app.errorhandler(PoolSaturated)
+def handle_busy(e):
+    metrics.error(e)
+    resp = make_response("Renderer busy, please retry shortly.", 503)
+    resp.headers["Retry-After"] = str(e.retry_after)
+    return resp
+
 @app.errorhandler(CSRFError)
 def handle_csrf(e):
     ct = (request.mimetype or "")
@@ -0,0 +1,75 @@
+# bundle.py
+"""Streaming ZIP writer for the all-formats download.
+
+``iter_zip`` writes members one at a time into a small write buffer and
+yields whatever has accumulated, so a response can start sending the first
+file while later ones are still rendering. Only one member's bytes plus one
+chunk are held in memory at a time; nothing is seeked (zipfile falls back to
+data descriptors on unseekable streams).
+
+A member that fails to render after bytes have gone out can't be reported
+with a status code any more. ``iter_zip`` then logs it and re-raises
+without writing the central directory, so the server drops the connection
+and the client sees a failed download rather than a valid, incomplete ZIP.
+Callers that can should produce every member before the response starts.
+"""
+import io
+import logging
+import time
+import zipfile
+
+log = logging.getLogger(__name__)
+
+CHUNK = 64 * 1024
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, unseekable buffer drained by the generator."""
+
+    def __init__(self):
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._parts.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def iter_zip(members, compression=zipfile.ZIP_STORED):
+    """Yield ZIP bytes for members, an iterable of (arcname, produce) pairs.
+
+    ``produce`` is called lazily, right before its member is written, and
+    must return bytes.
+    """
+    sink = _Sink()
+    zf = zipfile.ZipFile(sink, mode="w", compression=compression)
+    for arcname, produce in members:
+        try:
+            data = produce()
+        except Exception:
+            log.exception("bundle: rendering %s failed mid-stream; aborting the download", arcname)
+            raise  # no zf.close(): the archive must not end cleanly
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        info.compress_type = compression
+        with zf.open(info, mode="w", force_zip64=len(data) > 0x7FFFFFFF) as dest:
+            view = memoryview(data)
+            for i in range(0, len(view), CHUNK):
+                dest.write(view[i:i + CHUNK])
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        del data, view
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    zf.close()
+    chunk = sink.drain()  # central directory
+    if chunk:
+        yield chunk
@@ -0,0 +1,238 @@
+# events.py
+"""Structured event log: one JSON line per submission, render and download.
+
+Request handlers call ``emit(event, **fields)``, which only puts the record
+on an in-memory queue and never blocks: when the queue is full the event is
+dropped and counted, and the next batch writes a ``{"event": "dropped"}``
+record saying how many were lost. A background thread per process
+serializes the queue in batches to ``<dir>/events-<pid>.jsonl``, flushing
+at most once per ``flush_interval`` (no fsync).
+
+The active file is rotated once it passes ``max_bytes`` or is older than
+``max_age`` seconds, to ``events-<pid>-<UTC timestamp>.jsonl``, which is
+then gzipped in its own thread. After each rotation the directory is swept
+under a flock: active and ungzipped files left by exited workers are
+rotated and gzipped too, and only the newest ``keep`` rotated files by
+mtime, counting every worker's, are kept. ``python -m tools.analyze_events``
+reads them all.
+"""
+import atexit
+import fcntl
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+_STOP = object()
+_ACTIVE_RE = re.compile(r"events-(\d+)\.jsonl$")
+_ROTATED_RE = re.compile(r"events-(\d+)-[0-9T.]+\.jsonl(\.gz)?$")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by someone else
+    return True
+
+
+class EventLog:
+    def __init__(self, directory: str = None, max_bytes: int = 64 * 1024 * 1024,
+                 max_age: float = 3600, keep: int = 48, flush_interval: float = 1.0,
+                 queue_size: int = 10000, batch: int = 1000, compress: bool = True):
+        self.directory = directory  # None disables the log
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep = keep
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.batch = batch
+        self.compress = compress
+        self.dropped = 0
+        self.written = 0
+        self._queue = None
+        self._writer = None
+        self._writer_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    # -- request side ----------------------------------------------------------
+    def emit(self, event: str, **fields):
+        """Queue one record; drops it (never waits) when the writer is behind."""
+        if not self.directory:
+            return
+        if self._writer_pid != os.getpid():
+            self._start_writer()
+        record = dict(ts=round(time.time(), 3), event=event)
+        record.update(fields)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def close(self, timeout: float = 5.0):
+        """Write whatever is queued and stop the writer (at exit, in tools)."""
+        if self._writer is None or self._writer_pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._writer.join(timeout)
+
+    # -- writer thread ---------------------------------------------------------
+    def _start_writer(self):
+        with self._lock:
+            if self._writer_pid == os.getpid():
+                return
+            # a queue or thread inherited across fork belongs to the parent
+            self._writer_pid = os.getpid()
+            self._queue = queue.Queue(self.queue_size)
+            self.dropped = self.written = 0
+            self._writer = threading.Thread(target=self._run, name="event-writer", daemon=True)
+            self._writer.start()
+        atexit.register(self.close)
+
+    def _active_path(self) -> str:
+        return os.path.join(self.directory, f"events-{os.getpid()}.jsonl")
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        f = open(self._active_path(), "a", encoding="utf-8")
+        return f, time.time(), f.tell()
+
+    def _run(self):
+        f = None
+        q = self._queue
+        while True:
+            try:
+                first = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                first = None
+            records, stop = [], first is _STOP
+            if first is not None and not stop:
+                records.append(first)
+            while len(records) < self.batch and not stop:
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    records.append(item)
+            with self._lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                records.append(dict(ts=round(time.time(), 3), event="dropped", count=dropped))
+            try:
+                if f is None and records:
+                    f, opened, size = self._open()
+                if records:
+                    data = "".join(json.dumps(r, separators=(",", ":"), default=str) + "\n" for r in records)
+                    f.write(data)
+                    f.flush()
+                    size += len(data.encode("utf-8"))
+                    self.written += len(records)
+                if f is not None and (stop or size >= self.max_bytes or time.time() - opened >= self.max_age):
+                    f.close()
+                    f = None
+                    self._rotate(inline=stop)
+            except OSError:
+                with self._lock:
+                    self.dropped += len(records)
+                if f is not None:
+                    f.close()
+                    f = None
+            if stop:
+                return
+
+    def _rotated_path(self, pid: int, when: float) -> str:
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(when))
+        dst = os.path.join(self.directory, f"events-{pid}-{stamp}.jsonl")
+        n = 1
+        while os.path.exists(dst) or os.path.exists(dst + ".gz"):
+            dst = os.path.join(self.directory, f"events-{pid}-{stamp}.{n}.jsonl")
+            n += 1
+        return dst
+
+    def _rotate(self, inline: bool = False):
+        dst = self._rotated_path(os.getpid(), time.time())
+        os.replace(self._active_path(), dst)
+        if inline:  # exiting: a daemon thread would be cut short
+            self._after_rotate(dst)
+        else:
+            threading.Thread(target=self._after_rotate, args=(dst,), name="event-gzip", daemon=True).start()
+
+    def _after_rotate(self, path: str):
+        if self.compress:
+            _gzip(path)
+        self._prune()
+
+    def _prune(self):
+        """Sweep every worker's files; one process at a time, others skip."""
+        try:
+            with open(os.path.join(self.directory, ".prune.lock"), "a") as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return  # another worker is pruning
+                self._collect_orphans()
+                rotated = []
+                for name in os.listdir(self.directory):
+                    if _ROTATED_RE.match(name):
+                        try:
+                            rotated.append((os.stat(os.path.join(self.directory, name)).st_mtime, name))
+                        except OSError:
+                            continue
+                rotated.sort()
+                for _, name in rotated[:max(0, len(rotated) - self.keep)]:
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+    def _collect_orphans(self):
+        """Rotate and gzip the files of workers that exited without doing it."""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            active, rotated = _ACTIVE_RE.match(name), _ROTATED_RE.match(name)
+            try:
+                if active and not _alive(int(active[1])):
+                    dst = self._rotated_path(int(active[1]), os.stat(path).st_mtime)
+                    os.replace(path, dst)
+                    if self.compress:
+                        _gzip(dst)
+                elif rotated and not rotated[2] and self.compress and not _alive(int(rotated[1])):
+                    _gzip(path)
+            except OSError:
+                continue
+
+
+def _gzip(path: str):
+    """path -> path.gz, via a temp name so readers never see half a file."""
+    tmp = path + ".gz.tmp"
+    try:
+        st = os.stat(path)
+        with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.utime(tmp, (st.st_atime, st.st_mtime))  # pruning goes by mtime
+        os.replace(tmp, path + ".gz")
+        os.remove(path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
@@ -0,0 +1,175 @@
+# export.py
+"""Single-layout export pipeline.
+
+A resume is laid out once into a WeasyPrint ``Document``; the PDF, full-size
+rasters (JPEG/PNG/WebP) and preview thumbnails are all produced from that one
+layout. Because the PDF is the canonical artifact of a layout, rasters can
+also be produced later from cached PDF bytes without laying out again.
+
+WeasyPrint >= 53 dropped PNG output, so rasters come from rasterizing the
+PDF with pypdfium2; ``Document.write_png`` is used instead when an older
+WeasyPrint still provides it.
+
+The job functions run inside render_pool workers and only take/return
+plain values. They return a ``Products`` dict whose ``timings`` attribute
+holds the seconds spent in each phase (css, layout, pdf, raster, encode),
+so the web process can report phases that ran in a worker.
+
+Every PDF is written with a profile from pdf_profiles (write_pdf options
+plus a stylesheet); rasters derive from that profile's PDF.
+"""
+import io
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+# fmt: "pdf" | "jpeg" | "png" | "webp" | "thumb"
+Output = namedtuple("Output", "fmt dpi quality width", defaults=(96, 92, None))
+
+PDF = Output("pdf")
+
+RASTER_FORMATS = {"jpeg": "JPEG", "png": "PNG", "webp": "WEBP"}
+MIMETYPES = {"pdf": "application/pdf", "jpeg": "image/jpeg", "png": "image/png",
+             "webp": "image/webp", "thumb": "image/jpeg"}
+
+
+class Products(dict):
+    """{Output: bytes} plus per-phase ``timings`` ({phase: seconds})."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = {}
+
+
+@contextmanager
+def _phase(timings, name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - t0
+
+
+def cache_tag(out: Output, profile: str) -> str:
+    """Stable string naming an output (of a PDF profile) for cache keys."""
+    if out.fmt == "pdf":
+        return f"pdf:{profile}"
+    if out.fmt == "thumb":
+        return f"thumb:w={out.width}:q={out.quality}:{profile}"
+    return f"{out.fmt}:dpi={out.dpi}:q={out.quality}:{profile}"
+
+
+def layout(html: str, base_url: str, css_path: str = None, theme: str = None, timings: dict = None,
+           profile: str = None):
+    from weasy_compat import HTML
+    styles = font_config = None
+    if css_path:
+        from themes import get_registry
+        with _phase(timings, "css"):  # near zero unless the CSS changed
+            reg = get_registry(css_path)
+            styles, font_config = reg.stylesheets(theme), reg.font_config
+            if profile:
+                styles = styles + reg.profile_sheets(profile)
+    with _phase(timings, "layout"):
+        return HTML(string=html, base_url=base_url).render(
+            stylesheets=styles, font_config=font_config
+        )
+
+
+def write_pdf(document, profile: str) -> bytes:
+    """PDF bytes of a laid-out document, written with profile's options."""
+    from pdf_profiles import PROFILES
+    from weasy_compat import pdf_options
+    return document.write_pdf(**pdf_options(PROFILES[profile].options))
+
+
+def _stack(pages):
+    """Stack page images vertically into a single image."""
+    from PIL import Image
+    if len(pages) == 1:
+        return pages[0]
+    width = max(p.width for p in pages)
+    canvas = Image.new("RGB", (width, sum(p.height for p in pages)), "white")
+    y = 0
+    for p in pages:
+        canvas.paste(p, (0, y))
+        y += p.height
+    return canvas
+
+
+def _image_from_pdf(pdf_bytes: bytes, dpi: int):
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        raise RuntimeError("raster export needs pypdfium2 (pip install pypdfium2)")
+    pdf = pdfium.PdfDocument(pdf_bytes)
+    try:
+        pages = [pdf[i].render(scale=dpi / 72).to_pil().convert("RGB") for i in range(len(pdf))]
+    finally:
+        pdf.close()
+    return _stack(pages)
+
+
+def _image_from_document(document, pdf_bytes, dpi: int):
+    from PIL import Image
+    write_png = getattr(document, "write_png", None)
+    if write_png is not None:  # WeasyPrint < 53
+        png_io = io.BytesIO()
+        write_png(png_io, resolution=dpi)
+        png_io.seek(0)
+        return Image.open(png_io).convert("RGB")
+    return _image_from_pdf(pdf_bytes, dpi)
+
+
+def encode(img, out: Output) -> bytes:
+    """Encode a full-size page image as the requested raster/thumbnail."""
+    buf = io.BytesIO()
+    if out.fmt == "thumb":
+        img = img.copy()
+        img.thumbnail((out.width, out.width * 2))
+        img.save(buf, format="JPEG", quality=out.quality, optimize=True)
+    elif out.fmt == "png":
+        img.save(buf, format="PNG", optimize=True)
+    else:
+        img.save(buf, format=RASTER_FORMATS[out.fmt], quality=out.quality)
+    return buf.getvalue()
+
+
+def _rasters(img_for_dpi, outputs, products: Products) -> Products:
+    """Encode every raster output, decoding each distinct dpi only once."""
+    images, timings = {}, products.timings
+    for out in outputs:
+        if out.fmt == "pdf":
+            continue
+        # thumbnails are scaled down from the default-resolution image
+        dpi = 96 if out.fmt == "thumb" else out.dpi
+        if dpi not in images:
+            with _phase(timings, "raster"):
+                images[dpi] = img_for_dpi(dpi)
+        with _phase(timings, "encode"):
+            products[out] = encode(images[dpi], out)
+    return products
+
+
+# -----------------------------------------------------------------------------
+# Jobs
+# -----------------------------------------------------------------------------
+def export_job(html: str, base_url: str, css_path: str, theme: str, outputs, profile: str = None) -> dict:
+    """Lay out once and return {Output: bytes} for every requested output.
+
+    The PDF is always produced (and returned) since rasters derive from it.
+    ``profile`` defaults to the theme's (pdf_profiles.profile_for).
+    """
+    from pdf_profiles import profile_for
+    profile = profile_for(theme, profile)
+    products = Products()
+    document = layout(html, base_url, css_path, theme, products.timings, profile)
+    with _phase(products.timings, "pdf"):
+        pdf_bytes = products[PDF] = write_pdf(document, profile)
+    return _rasters(lambda dpi: _image_from_document(document, pdf_bytes, dpi), outputs, products)
+
+
+def raster_job(pdf_bytes: bytes, outputs) -> dict:
+    """Rasters from an already laid-out PDF (e.g. one from the render cache)."""
+    return _rasters(lambda dpi: _image_from_pdf(pdf_bytes, dpi), outputs, Products())
@@ -15,6 +15,25 @@ from urllib.parse import urlparse
 # Safe characters for short text fields like "role", "school", "location"
 SAFE_TEXT_RE = r'^[A-Za-z0-9 ,./&()+#\-]{2,100}$'
 
+# Resume color themes (rendering looks these up in themes.THEME_ACCENTS)
+THEME_CHOICES = [
+    ("emerald", "Emerald"),
+    ("sapphire", "Sapphire"),
+    ("slate", "Slate"),
+    ("rose", "Rose"),
+]
+
+# Highest degree: form value -> label rendered on the resume
+DEGREE_CHOICES = [
+    ("hs", "High School"),
+    ("aa", "Associate"),
+    ("ba", "Bachelor's"),
+    ("ms", "Master's"),
+    ("phd", "PhD"),
+    ("bootcamp", "Bootcamp"),
+    ("other", "Other"),
+]
+
 def must_be_linkedin(form, field):
     """Require a linkedin.com (or linkedin.cn) URL if provided."""
     if not field.data:
@@ -88,16 +107,8 @@ class ResumeRequestForm(FlaskForm):
 
     highest_degree = RadioField(
         "Highest Degree",
-        choices=[
-            ("hs", "High School"),
-            ("aa", "Associate"),
-            ("ba", "Bachelor's"),
-            ("ms", "Master's"),
-            ("phd", "PhD"),
-            ("bootcamp", "Bootcamp"),
-            ("other", "Other"),
-        ],
-        validators=[Optional(), AnyOf(["hs", "aa", "ba", "ms", "phd", "bootcamp", "other"])],
+        choices=DEGREE_CHOICES,
+        validators=[Optional(), AnyOf([v for v, _ in DEGREE_CHOICES])],
     )
 
     grad_year = StringField(
@@ -166,12 +177,7 @@ class ResumeRequestForm(FlaskForm):
     # --- Theme (used by rendering and PDF) ---
     theme = RadioField(
         "Theme",
-        choices=[
-            ("emerald", "Emerald"),
-            ("sapphire", "Sapphire"),
-            ("slate", "Slate"),
-            ("rose", "Rose"),
-        ],
+        choices=THEME_CHOICES,
         default="emerald",
-        validators=[DataRequired(), AnyOf(["emerald", "sapphire", "slate", "rose"])],
+        validators=[DataRequired(), AnyOf([v for v, _ in THEME_CHOICES])],
     )
@@ -0,0 +1,52 @@
+# gallery.py
+"""Prebuilt theme gallery: sample resume artifacts served straight from static/.
+
+``python -m tools.build_gallery`` renders a fixed sample resume in every
+theme to ``static/gallery/<theme>.<sha256[:12]>.<ext>`` and writes
+``static/gallery/manifest.json``::
+
+    {"version": 1, "default_theme": "emerald",
+     "themes": {"emerald": {"label": "Emerald", "pdf": "gallery/emerald.3f9c0e1a2b4d.pdf",
+                            "docx": ..., "jpg": ..., "thumb": ..., "thumb_width": 240}, ...}}
+
+Paths are relative to the static folder (``url_for('static', filename=...)``).
+Content-hashed names make nginx's immutable cache headers safe, and none of
+these requests reach Python. Templates get the manifest from
+``load_manifest``, which re-reads it only when the file changes.
+"""
+import json
+import os
+import threading
+
+GALLERY_DIR = "gallery"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+_lock = threading.Lock()
+_cache = {}  # path -> (mtime_ns, manifest)
+
+
+def manifest_path(static_dir: str) -> str:
+    return os.path.join(static_dir, GALLERY_DIR, MANIFEST_NAME)
+
+
+def load_manifest(static_dir: str) -> dict:
+    """The gallery manifest, or {} when it hasn't been built."""
+    path = manifest_path(static_dir)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    hit = _cache.get(path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    with _lock:
+        _cache[path] = (mtime, manifest)
+    return manifest
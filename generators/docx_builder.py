@@ -1,7 +1,25 @@
+"""DOCX engine used by /resume.docx (and the offline tools).
+
+``Document()`` unzips and parses python-docx's default template on every
+call, which is most of the cost of a small resume. Instead, one base
+document per theme is built once per process with margins, styles and
+theme colors applied. Each resume gets a deep copy of the base's (tiny)
+document.xml tree to fill in; the other package parts are never re-parsed
+and are written from a pre-zipped prefix, with only word/document.xml
+appended per request.
+"""
+import copy
+import io
+import threading
+import zipfile
+
 from docx import Document
-from docx.shared import Pt, Inches
+from docx.document import Document as _DocumentProxy
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-import io
+from docx.shared import Pt, Inches, RGBColor
+from lxml import etree
+
+from themes import DEFAULT_THEME, THEME_ACCENTS
 
 HEADER_SIZE = 16
 SECTION_SIZE = 12
@@ -9,77 +27,149 @@ BODY_SIZE = 10.5
 
 LABELS = {
     "summary": "Professional Summary",
-    "skills": "Skills",
+    "skills": "Core Skills",
     "experience": "Experience",
     "projects": "Projects",
     "education": "Education",
+    "certifications": "Certifications",
+    "languages": "Languages",
 }
 
-def _add_heading(p, text, size, bold=False):
-    run = p.add_run(text)
-    run.bold = bold
-    run.font.size = Pt(size)
+_DOCUMENT_PART = "word/document.xml"
+_STYLES = ("Title", "Heading 1", "Heading 2", "List Bullet")
+
+
+class _BaseTemplate:
+    """Styled, empty document for one theme, parsed once."""
+
+    def __init__(self, theme: str):
+        doc = Document()
+        for s in doc.sections:
+            s.top_margin = Inches(0.5)
+            s.bottom_margin = Inches(0.5)
+            s.left_margin = Inches(0.7)
+            s.right_margin = Inches(0.7)
+
+        accent = RGBColor.from_string(THEME_ACCENTS.get(theme, THEME_ACCENTS[DEFAULT_THEME]).lstrip("#"))
+        styles = doc.styles
+        styles["Normal"].font.size = Pt(BODY_SIZE)
+        for name, size, color in (("Title", HEADER_SIZE, accent),
+                                  ("Heading 1", SECTION_SIZE, accent),
+                                  ("Heading 2", BODY_SIZE + 1, None)):
+            font = styles[name].font
+            font.size = Pt(size)
+            font.bold = True
+            font.color.rgb = color
+        styles["Title"].paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        buf = io.BytesIO()
+        doc.save(buf)
+        prefix = io.BytesIO()
+        with zipfile.ZipFile(io.BytesIO(buf.getvalue())) as src, \
+                zipfile.ZipFile(prefix, "w", zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                if info.filename != _DOCUMENT_PART:
+                    dst.writestr(info, src.read(info.filename))
+        self.prefix = prefix.getvalue()
+        self.doc = doc
+        # Resolving a style by name scans styles.xml; do it once per template.
+        self.style_ids = {name: styles[name].style_id for name in _STYLES}
+
+    def new(self):
+        """Fresh document proxy over a copy of the base body; styles are shared."""
+        return _DocumentProxy(copy.deepcopy(self.doc.element), self.doc.part)
 
-def _section(doc, title):
-    p = doc.add_paragraph()
-    _add_heading(p, title, SECTION_SIZE, bold=True)
+    def save(self, doc) -> bytes:
+        out = io.BytesIO(self.prefix)
+        out.seek(0, io.SEEK_END)
+        xml = etree.tostring(doc.element, xml_declaration=True, encoding="UTF-8", standalone=True)
+        with zipfile.ZipFile(out, "a", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(_DOCUMENT_PART, xml)
+        return out.getvalue()
 
-def build_docx(data: dict) -> io.BytesIO:
-    doc = Document()
-    for s in doc.sections:
-        s.top_margin = Inches(0.5)
-        s.bottom_margin = Inches(0.5)
-        s.left_margin = Inches(0.7)
-        s.right_margin = Inches(0.7)
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def base_template(theme: str = None) -> _BaseTemplate:
+    theme = theme if theme in THEME_ACCENTS else DEFAULT_THEME
+    tpl = _templates.get(theme)
+    if tpl is None:
+        with _templates_lock:
+            tpl = _templates.get(theme)
+            if tpl is None:
+                tpl = _templates[theme] = _BaseTemplate(theme)
+    return tpl
+
+
+def _fill(doc, data, style_ids: dict):
+    def styled(text, style):
+        p = doc.add_paragraph(text)
+        p._p.style = style_ids[style]
+        return p
 
     # Header
-    p = doc.add_paragraph()
-    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    _add_heading(p, data.get("name",""), HEADER_SIZE, bold=True)
-
-    sub = doc.add_paragraph()
-    sub.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    line = " | ".join([x for x in [
-        data.get("title"), data.get("location"),
-        data.get("phone"), data.get("email"), *data.get("links",[])
-    ] if x])
-    sub.add_run(line).font.size = Pt(BODY_SIZE)
+    styled(data.name, "Title")
+    line = " | ".join([x for x in [data.role, data.location, data.phone, data.email, *data.links] if x])
+    if line:
+        sub = doc.add_paragraph(line)
+        sub.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
     # Summary
-    if data.get("summary"):
-        _section(doc, LABELS["summary"])
-        doc.add_paragraph(data["summary"])
+    if data.summary:
+        styled(LABELS["summary"], "Heading 1")
+        doc.add_paragraph(data.summary)
 
     # Skills
-    if data.get("skills"):
-        _section(doc, LABELS["skills"])
-        doc.add_paragraph(", ".join(data["skills"]))
+    if data.skills:
+        styled(LABELS["skills"], "Heading 1")
+        doc.add_paragraph(", ".join(data.skills))
 
     # Experience
-    if data.get("experience"):
-        _section(doc, LABELS["experience"])
-        for r in data["experience"]:
-            line = " — ".join([v for v in [r.get("title"), r.get("company"), r.get("location")] if v])
-            hdr = doc.add_paragraph(); _add_heading(hdr, line, BODY_SIZE+1, bold=True)
-            dates = " • ".join([v for v in [r.get("start"), r.get("end")] if v])
-            if dates: doc.add_paragraph(dates)
-            for b in r.get("bullets", []):
-                doc.add_paragraph(b, style="List Bullet")
+    if data.experience:
+        styled(LABELS["experience"], "Heading 1")
+        for r in data.experience:
+            styled(" — ".join([v for v in [r.title, r.company, r.location] if v]), "Heading 2")
+            dates = " • ".join([v for v in [r.start, r.end] if v])
+            if dates:
+                doc.add_paragraph(dates)
+            for b in r.bullets:
+                styled(b, "List Bullet")
 
     # Projects
-    if data.get("options",{}).get("include_projects") and data.get("projects"):
-        _section(doc, LABELS["projects"])
-        for pr in data["projects"]:
-            hdr = doc.add_paragraph(); _add_heading(hdr, pr.get("name",""), BODY_SIZE+1, bold=True)
-            if pr.get("description"): doc.add_paragraph(pr["description"])
+    if data.include_projects and data.projects:
+        styled(LABELS["projects"], "Heading 1")
+        for pr in data.projects:
+            styled(pr.name, "Heading 2")
+            if pr.description:
+                doc.add_paragraph(pr.description)
 
     # Education
-    if data.get("options",{}).get("include_education") and data.get("education"):
-        _section(doc, LABELS["education"])
-        for ed in data["education"]:
-            line = " — ".join([v for v in [ed.get("degree"), ed.get("school")] if v])
-            hdr = doc.add_paragraph(); _add_heading(hdr, line, BODY_SIZE+1, bold=True)
-            if ed.get("grad"): doc.add_paragraph(ed["grad"])
-
-    bio = io.BytesIO(); doc.save(bio); bio.seek(0)
+    if data.include_education and data.education:
+        styled(LABELS["education"], "Heading 1")
+        for ed in data.education:
+            styled(" — ".join([v for v in [ed.degree, ed.school] if v]), "Heading 2")
+            if ed.grad:
+                doc.add_paragraph(ed.grad)
+
+    # Certifications / Languages
+    for label in ("certifications", "languages"):
+        vals = getattr(data, label)
+        if vals:
+            styled(LABELS[label], "Heading 1")
+            doc.add_paragraph(", ".join(vals))
+
+
+def render_docx(data) -> bytes:
+    """DOCX bytes for a resume_model.Resume."""
+    tpl = base_template(data.theme)
+    doc = tpl.new()
+    _fill(doc, data, tpl.style_ids)
+    return tpl.save(doc)
+
+
+def build_docx(data) -> io.BytesIO:
+    bio = io.BytesIO(render_docx(data))
+    bio.seek(0)
     return bio
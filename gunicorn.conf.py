@@ -0,0 +1,57 @@
+# gunicorn.conf.py
+"""gunicorn settings.
+
+    gunicorn -c gunicorn.conf.py app:app
+
+By default each worker imports only what the form routes need; WeasyPrint,
+python-docx and friends load on the first render. GUNICORN_PRELOAD=1 instead
+imports the app once in the master, runs ``app.preload()`` (python-docx,
+Jinja templates, the skill taxonomy, a warm-up resume, no template mtime
+checks) and forks workers that share those pages copy-on-write. WeasyPrint
+is only preloaded with RENDER_POOL_SIZE=0: pool processes come from their
+own forkserver and warm themselves, so the PDF gain is an inline-render one.
+``python -m tools.startup_report [--pool-size N]`` compares the modes.
+"""
+import os
+import shutil
+
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8001")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "0") == "1"
+
+
+def on_starting(server):
+    # metric snapshots of the previous run's workers would be summed forever
+    from metrics import default_dir
+    shutil.rmtree(os.environ.get("METRICS_DIR") or default_dir(), ignore_errors=True)
+
+
+def when_ready(server):
+    if preload_app:
+        import app
+        app.preload()
+
+
+def post_fork(server, worker):
+    # render pools can't be inherited across fork; start one per worker
+    # (workers warm up in their own processes, so this doesn't delay boot)
+    import app
+    if app.render_pool.size:
+        app.render_pool.start()
+    # pick up render jobs queued before a restart without waiting for a request
+    app._start_job_runners()
+
+
+def worker_exit(server, worker):
+    # in the worker: write the metrics recorded since the last flush
+    import app
+    app.metrics.flush()
+
+
+def child_exit(server, worker):
+    # in the master: fold the dead worker's counters into the metrics archive
+    # before its pid can be reused
+    from metrics import default_dir, mark_process_dead
+    mark_process_dead(worker.pid, os.environ.get("METRICS_DIR") or default_dir())
@@ -0,0 +1,215 @@
+# jobs.py
+"""Durable render job queue in a local SQLite file.
+
+``POST /jobs`` stores a job (the session's resume data plus the requested
+output) and returns at once; runner threads in every gunicorn worker claim
+queued jobs, render them through the usual render cache and pool, and store
+the finished bytes in the job row, where ``/jobs/<id>/file`` reads them.
+
+A claim is a lease: the runner that takes a job owns it until
+``lease_until``. A job whose worker died mid-render is claimed again once
+the lease runs out, up to ``max_attempts`` times, so queued and running
+jobs survive worker restarts. Finished and failed jobs are deleted ``ttl``
+seconds after their last update, and the pages their results held are
+handed back to the filesystem (incremental auto-vacuum), so the file stays
+about as large as the artifacts of the last ``ttl`` seconds. Like
+limiter_storage, each thread and process has its own connection to the
+WAL-mode database.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    key TEXT NOT NULL,
+    format TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    phase TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    error TEXT,
+    result BLOB,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_owner_key ON jobs (owner, key);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created);
+"""
+
+_CLAIM = """
+UPDATE jobs SET status = 'running', phase = 'rendering', attempts = attempts + 1,
+                lease_until = ?1 + ?2, updated = ?1
+WHERE id = (SELECT id FROM jobs
+            WHERE status = 'queued' OR (status = 'running' AND lease_until < ?1)
+            ORDER BY created LIMIT 1)
+RETURNING id, owner, key, format, payload, attempts
+"""
+
+_FIELDS = "id, format, status, phase, attempts, error, created, updated, length(result)"
+
+FINAL = ("done", "failed")
+
+
+class JobQueue:
+    def __init__(self, path: str, ttl: int = 3600, lease: float = 120, max_attempts: int = 3,
+                 busy_timeout: float = 5.0):
+        self.path = path
+        self.ttl = ttl
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._runner_pid = None
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and per process (connections don't survive fork).
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # only takes effect on a new file
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @staticmethod
+    def _row(row) -> dict:
+        if row is None:
+            return None
+        job = dict(zip(("id", "format", "status", "phase", "attempts", "error", "created", "updated", "size"), row))
+        if job["status"] != "done":
+            job["size"] = None
+        return job
+
+    # -- request side ----------------------------------------------------------
+    def submit(self, owner: str, key: str, fmt: str, payload: dict) -> dict:
+        """Queue a job, or return the owner's live job for the same artifact."""
+        conn = self._conn()
+        existing = conn.execute(
+            f"SELECT {_FIELDS} FROM jobs WHERE owner = ? AND key = ? AND status != 'failed' "
+            "ORDER BY created DESC LIMIT 1", (owner, key)).fetchone()
+        if existing is not None:
+            return self._row(existing)
+        now = time.time()
+        job_id = secrets.token_urlsafe(16)
+        conn.execute(
+            "INSERT INTO jobs (id, owner, key, format, payload, status, phase, created, updated) "
+            "VALUES (?, ?, ?, ?, ?, 'queued', 'queued', ?, ?)",
+            (job_id, owner, key, fmt, json.dumps(payload), now, now))
+        self._wake.set()
+        return self.get(job_id, owner)
+
+    def get(self, job_id: str, owner: str) -> dict:
+        """The job's status (None if it doesn't exist or isn't owner's)."""
+        row = self._conn().execute(
+            f"SELECT {_FIELDS} FROM jobs WHERE id = ? AND owner = ?", (job_id, owner)).fetchone()
+        return self._row(row)
+
+    def position(self, job: dict) -> int:
+        """Jobs queued ahead of job (0 once it is running)."""
+        if job["status"] != "queued":
+            return 0
+        (n,) = self._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created < ?", (job["created"],)).fetchone()
+        return n
+
+    def result(self, job_id: str, owner: str):
+        """(key, format, bytes) of a finished job, or None."""
+        return self._conn().execute(
+            "SELECT key, format, result FROM jobs WHERE id = ? AND owner = ? AND status = 'done'",
+            (job_id, owner)).fetchone()
+
+    # -- runner side -----------------------------------------------------------
+    def claim(self):
+        """Lease the oldest runnable job: (id, owner, key, format, payload, attempts) or None."""
+        row = self._conn().execute(_CLAIM, (time.time(), self.lease)).fetchone()
+        if row is None:
+            return None
+        return row[:4] + (json.loads(row[4]), row[5])
+
+    def finish(self, job_id: str, result: bytes):
+        self._conn().execute(
+            "UPDATE jobs SET status = 'done', phase = 'done', result = ?, lease_until = NULL, updated = ? "
+            "WHERE id = ?", (result, time.time(), job_id))
+
+    def fail(self, job_id: str, error: str, attempts: int, retry: bool = True):
+        """Give the job back to the queue, or fail it for good after max_attempts."""
+        final = not retry or attempts >= self.max_attempts
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, phase = ?, error = ?, lease_until = NULL, updated = ? WHERE id = ?",
+            ("failed" if final else "queued", "failed" if final else "queued", error, time.time(), job_id))
+
+    def release(self, job_id: str):
+        """Requeue a claimed job without counting the attempt (e.g. render pool full)."""
+        self._conn().execute(
+            "UPDATE jobs SET status = 'queued', phase = 'queued', attempts = attempts - 1, "
+            "lease_until = NULL, updated = ? WHERE id = ?", (time.time(), job_id))
+
+    def purge(self) -> int:
+        """Delete finished and failed jobs older than ttl; returns how many."""
+        conn = self._conn()
+        n = conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated < ?",
+                         (time.time() - self.ttl,)).rowcount
+        if n:
+            conn.executescript("PRAGMA incremental_vacuum")  # runs to completion; execute() frees one page
+        return n
+
+    def start_runners(self, run, threads: int = 1, idle: float = 0.5):
+        """Start this process's runner threads (idempotent, fork-aware).
+
+        ``run(job_id, owner, key, fmt, payload)`` returns the result bytes; it
+        may raise ``Retry(seconds)`` to put the job back without an attempt.
+        """
+        if self._runner_pid == os.getpid() or threads <= 0:
+            return
+        self._runner_pid = os.getpid()
+        self._wake = threading.Event()
+
+        def loop():
+            last_purge = 0.0
+            while True:
+                try:
+                    if time.time() - last_purge > 60:
+                        self.purge()
+                        last_purge = time.time()
+                    job = self.claim()
+                except sqlite3.Error:
+                    job = None
+                if job is None:
+                    self._wake.wait(idle)
+                    self._wake.clear()
+                    continue
+                job_id, owner, key, fmt, payload, attempts = job
+                try:
+                    self.finish(job_id, run(job_id, owner, key, fmt, payload))
+                except Retry as e:
+                    self.release(job_id)
+                    time.sleep(e.seconds)
+                except Exception as e:
+                    try:
+                        self.fail(job_id, f"{type(e).__name__}: {e}", attempts)
+                    except sqlite3.Error:
+                        pass  # the lease runs out and another runner retries
+
+        for i in range(threads):
+            threading.Thread(target=loop, name=f"job-runner-{i}", daemon=True).start()
+
+
+class Retry(Exception):
+    """Raised by a job's run function to requeue it after ``seconds``."""
+
+    def __init__(self, seconds: float = 1.0):
+        super().__init__(f"retry in {seconds}s")
+        self.seconds = seconds
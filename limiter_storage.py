@@ -0,0 +1,183 @@
+# limiter_storage.py
+"""Cross-process rate-limit storage for Flask-Limiter on a single box.
+
+``memory://`` keeps counters per gunicorn worker, so N workers allow N times
+the configured limits and every restart forgets them. This backend keeps the
+counters in one SQLite file in WAL mode (on /dev/shm by default), which every
+worker shares without an external server:
+
+* fixed window: one atomic UPSERT ... RETURNING per hit;
+* moving window: per-key event rows, checked and appended in one
+  ``BEGIN IMMEDIATE`` transaction;
+* expired counters and events of every key, including one-off clients that
+  never come back, are purged every ``_PURGE_EVERY`` writes or
+  ``_PURGE_SECONDS``, whichever comes first;
+* reads (``get``, ``get_expiry``, ``get_moving_window``) never take a write
+  lock; WAL readers don't block, and aren't blocked by, the writer.
+
+Importing this module registers the ``sqlite://`` scheme with ``limits``;
+use ``sqlite:////abs/path/limits.db``.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from limits.storage import MovingWindowSupport, Storage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    expiry REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    key TEXT NOT NULL,
+    atime REAL NOT NULL,
+    expiry REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS events_key_atime ON events (key, atime);
+"""
+
+# events rows written before the expiry column existed read as expired
+_MIGRATE_EVENTS = "ALTER TABLE events ADD COLUMN expiry REAL NOT NULL DEFAULT 0"
+_EVENTS_EXPIRY_INDEX = "CREATE INDEX IF NOT EXISTS events_expiry ON events (expiry)"
+
+_INCR = """
+INSERT INTO counters (key, value, expiry) VALUES (?1, ?2, ?3 + ?4)
+ON CONFLICT (key) DO UPDATE SET
+    value = CASE WHEN counters.expiry <= ?3 THEN excluded.value
+                 ELSE counters.value + excluded.value END,
+    expiry = CASE WHEN counters.expiry <= ?3 THEN excluded.expiry
+                  ELSE counters.expiry END
+RETURNING value
+"""
+
+_PURGE_EVERY = 1024   # writes between purges of expired counters and events
+_PURGE_SECONDS = 60.0  # ... or seconds, for workers that see little traffic
+
+
+def default_uri() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return "sqlite://" + os.path.join(base, "resumeunicorn-limits.db")
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        self.path = uri[len("sqlite://"):] or default_uri()[len("sqlite://"):]
+        self.busy_timeout = float(options.get("busy_timeout", 2.0))
+        self._local = threading.local()
+        self._writes = 0
+        self._purged = time.time()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._conn()  # create the schema up front
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread and per process (connections don't survive fork).
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        if "expiry" not in {row[1] for row in conn.execute("PRAGMA table_info(events)")}:
+            try:
+                conn.execute(_MIGRATE_EVENTS)
+            except sqlite3.OperationalError:  # another worker migrated first
+                pass
+        conn.execute(_EVENTS_EXPIRY_INDEX)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _maybe_purge(self, conn, now):
+        self._writes += 1
+        if self._writes % _PURGE_EVERY == 0 or now - self._purged >= _PURGE_SECONDS:
+            self.purge(now)
+
+    def purge(self, now: float = None) -> int:
+        """Delete expired counters and events of every key; returns rows removed."""
+        now = time.time() if now is None else now
+        self._purged = now
+        conn = self._conn()
+        n = conn.execute("DELETE FROM counters WHERE expiry <= ?", (now,)).rowcount
+        n += conn.execute("DELETE FROM events WHERE expiry <= ?", (now,)).rowcount
+        return n
+
+    # -- fixed window ----------------------------------------------------------
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        conn = self._conn()
+        now = time.time()
+        value = conn.execute(_INCR, (key, amount, now, expiry)).fetchone()[0]
+        self._maybe_purge(conn, now)
+        return value
+
+    def get(self, key: str) -> int:
+        row = self._conn().execute(
+            "SELECT value FROM counters WHERE key = ? AND expiry > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT expiry FROM counters WHERE key = ? AND expiry > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    # -- moving window ---------------------------------------------------------
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM events WHERE key = ? AND atime < ?", (key, now - expiry))
+            (count,) = conn.execute("SELECT COUNT(*) FROM events WHERE key = ?", (key,)).fetchone()
+            if count + amount > limit:
+                conn.execute("ROLLBACK")
+                return False
+            conn.executemany("INSERT INTO events (key, atime, expiry) VALUES (?, ?, ?)",
+                             [(key, now, now + expiry)] * amount)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._maybe_purge(conn, now)
+        return True
+
+    def get_moving_window(self, key: str, limit: int, expiry: int):
+        now = time.time()
+        oldest, count = self._conn().execute(
+            "SELECT MIN(atime), COUNT(*) FROM events WHERE key = ? AND atime >= ?",
+            (key, now - expiry),
+        ).fetchone()
+        return (oldest, count) if count else (now, 0)
+
+    # -- housekeeping ----------------------------------------------------------
+    def check(self) -> bool:
+        try:
+            self._conn().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        conn = self._conn()
+        n = conn.execute("DELETE FROM counters").rowcount
+        n += conn.execute("DELETE FROM events").rowcount
+        return n
+
+    def clear(self, key: str) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+        conn.execute("DELETE FROM events WHERE key = ?", (key,))
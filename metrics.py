@@ -0,0 +1,305 @@
+# metrics.py
+"""Render phase timers, Server-Timing headers and Prometheus metrics.
+
+Inside a request, ``phase(name)`` times one stage (session load, Jinja,
+CSS, layout, PDF, raster, encode, DOCX, queue wait). The stages of a request
+are sent back as a ``Server-Timing`` header and every stage is also recorded
+in a latency histogram, along with counters for renders, bytes sent and
+errors by exception type. Components that keep their own counters (render
+and fragment caches, the render pool, the spool, the session store) are
+sampled by collectors registered with ``add_collector`` whenever the
+snapshot is written.
+
+Each gunicorn worker keeps its metrics in memory and a background thread
+writes them to ``<dir>/<pid>.json`` at most once per ``flush_interval``.
+``/metrics`` sums the files of every worker, so the numbers are the same
+whichever worker answers the scrape. When a worker exits, gunicorn's
+``child_exit`` hook calls ``mark_process_dead``: its counters and histograms
+are folded into ``archive.json`` and its gauges dropped, so totals never go
+backwards and a later worker that reuses the pid starts from a fresh file.
+Clear the directory when the server starts.
+"""
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (type, help)
+METRICS = {
+    "resumeunicorn_phase_seconds": ("histogram", "Time spent in one render phase."),
+    "resumeunicorn_request_seconds": ("histogram", "Export request time until the response headers."),
+    "resumeunicorn_renders_total": ("counter", "Artifacts rendered (render cache misses) by format."),
+    "resumeunicorn_response_bytes_total": ("counter", "Response body bytes sent by export routes."),
+    "resumeunicorn_errors_total": ("counter", "Failed export requests by exception type."),
+    "resumeunicorn_not_modified_total": ("counter", "Export requests answered 304 without rendering."),
+    "resumeunicorn_render_recycles_total": ("counter", "Render worker generations killed or recycled, by reason."),
+    "resumeunicorn_render_cache_events_total": ("counter", "Render cache lookups and evictions by cache and event."),
+    "resumeunicorn_render_cache_bytes": ("gauge", "Bytes held in each worker's in-memory cache tier."),
+    "resumeunicorn_render_cache_items": ("gauge", "Entries held in each worker's in-memory cache tier."),
+    "resumeunicorn_render_pool_tasks_total": ("counter", "Render pool submissions by outcome."),
+    "resumeunicorn_spool_files": ("gauge", "Files in the X-Accel-Redirect spool after the last sweep."),
+    "resumeunicorn_spool_bytes": ("gauge", "Bytes in the X-Accel-Redirect spool after the last sweep."),
+    "resumeunicorn_spool_swept_total": ("counter", "Expired spool files deleted."),
+    "resumeunicorn_spool_last_sweep_timestamp_seconds": ("gauge", "Unix time of the last spool sweep."),
+    "resumeunicorn_sessions_live": ("gauge", "Unexpired sessions on disk after the last sweep."),
+    "resumeunicorn_sessions_bytes": ("gauge", "Bytes of session files on disk after the last sweep."),
+    "resumeunicorn_sessions_sweep_seconds": ("gauge", "Duration of the last session sweep."),
+    "resumeunicorn_sessions_last_sweep_timestamp_seconds": ("gauge", "Unix time of the last session sweep."),
+    "resumeunicorn_sessions_swept_total": ("counter", "Session files deleted by the sweeper, by reason."),
+    "resumeunicorn_session_cache_total": ("counter", "Session loads served from the decoded-session cache or disk."),
+}
+
+# Gauges describing something every worker shares (a directory on disk): each
+# worker reports the state it last saw, so take the largest instead of the sum.
+MAX_GAUGES = {
+    "resumeunicorn_spool_files", "resumeunicorn_spool_bytes",
+    "resumeunicorn_spool_last_sweep_timestamp_seconds",
+    "resumeunicorn_sessions_live", "resumeunicorn_sessions_bytes", "resumeunicorn_sessions_sweep_seconds",
+    "resumeunicorn_sessions_last_sweep_timestamp_seconds",
+}
+
+
+def default_dir() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "resumeunicorn-metrics")
+
+
+ARCHIVE = "archive.json"  # totals of exited workers
+
+
+def _key(labels: dict) -> str:
+    return json.dumps(sorted(labels.items()))
+
+
+def _read(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write(directory: str, path: str, snap: dict):
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        json.dump(snap, f)
+    os.replace(tmp, path)
+
+
+def _merge(acc: dict, snap: dict):
+    """Add snap's series into acc (same layout as ``Metrics.snapshot``)."""
+    for metric, series in snap.get("counters", {}).items():
+        out = acc["counters"].setdefault(metric, {})
+        for k, v in series.items():
+            out[k] = out.get(k, 0) + v
+    for metric, series in snap.get("histograms", {}).items():
+        out = acc["histograms"].setdefault(metric, {})
+        for k, v in series.items():
+            h = out.setdefault(k, [0] * len(v))
+            for i, x in enumerate(v):
+                h[i] += x
+    for metric, series in snap.get("gauges", {}).items():
+        out = acc["gauges"].setdefault(metric, {})
+        pick = max if metric in MAX_GAUGES else (lambda a, b: a + b)
+        for k, v in series.items():
+            out[k] = pick(out[k], v) if k in out else v
+
+
+class _DirLock:
+    """flock on <dir>/.lock: shared while reading snapshots, exclusive while archiving."""
+
+    def __init__(self, directory: str, mode: int):
+        self.path, self.mode = os.path.join(directory, ".lock"), mode
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self.fd, self.mode)
+
+    def __exit__(self, *exc):
+        os.close(self.fd)  # releases the lock
+
+
+def mark_process_dead(pid: int, directory: str = None):
+    """Fold an exited worker's counters and histograms into the archive.
+
+    Its gauges describe a process that no longer exists and are dropped.
+    """
+    directory = directory or default_dir()
+    path = os.path.join(directory, f"{pid}.json")
+    if not os.path.exists(path):
+        return
+    with _DirLock(directory, fcntl.LOCK_EX):
+        snap = _read(path)
+        archive = os.path.join(directory, ARCHIVE)
+        acc = dict(counters={}, histograms={}, gauges={})
+        _merge(acc, _read(archive))
+        _merge(acc, dict(snap, gauges={}))
+        _write(directory, archive, acc)
+        os.unlink(path)
+
+
+class Metrics:
+    def __init__(self, directory: str = None, flush_interval: float = 1.0):
+        self.directory = directory or default_dir()
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._counters = {}    # name -> {label key: value}
+        self._histograms = {}  # name -> {label key: [bucket counts..., sum, count]}
+        self._collectors = []
+        self._dirty = False
+        self._flusher_pid = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    # -- recording -------------------------------------------------------------
+    def inc(self, name: str, amount: float = 1, **labels):
+        self._start_flusher()
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            k = _key(labels)
+            series[k] = series.get(k, 0) + amount
+            self._dirty = True
+
+    def observe(self, name: str, seconds: float, **labels):
+        self._start_flusher()
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            h = series.setdefault(_key(labels), [0] * (len(BUCKETS) + 2))
+            for i, le in enumerate(BUCKETS):
+                if seconds <= le:
+                    h[i] += 1
+            h[-2] += seconds
+            h[-1] += 1
+            self._dirty = True
+
+    def record_phase(self, name: str, seconds: float):
+        """Add a finished phase to the request's Server-Timing and the histogram."""
+        if has_request_context():
+            timings = g.setdefault("phase_timings", {})
+            timings[name] = timings.get(name, 0.0) + seconds
+        self.observe("resumeunicorn_phase_seconds", seconds, phase=name)
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(name, time.perf_counter() - t0)
+
+    def error(self, exc: BaseException):
+        endpoint = request.endpoint if has_request_context() else "-"
+        if has_request_context():
+            g.error = type(exc).__name__  # for the request's event record
+        self.inc("resumeunicorn_errors_total", endpoint=endpoint or "-", exception=type(exc).__name__)
+
+    def add_collector(self, fn):
+        """Sample fn() into every snapshot.
+
+        fn yields ``(name, labels, value)``: for counters the process's
+        running total, for gauges its current value.
+        """
+        self._collectors.append(fn)
+
+    # -- cross-process aggregation ---------------------------------------------
+    def snapshot(self) -> dict:
+        with self._lock:
+            snap = dict(
+                counters={n: dict(s) for n, s in self._counters.items()},
+                histograms={n: {k: list(v) for k, v in s.items()} for n, s in self._histograms.items()},
+                gauges={},
+            )
+        for fn in self._collectors:
+            try:
+                for name, labels, value in fn():
+                    kind = "gauges" if METRICS[name][0] == "gauge" else "counters"
+                    snap[kind].setdefault(name, {})[_key(labels)] = value
+            except Exception:
+                continue  # a broken collector must not stop the flush
+        return snap
+
+    def flush(self):
+        """Write this process's metrics to <dir>/<pid>.json (atomically)."""
+        with self._lock:
+            if not self._dirty and not self._collectors:
+                return
+            self._dirty = False
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        try:
+            os.makedirs(self.directory, exist_ok=True)  # may have been cleared at server start
+            _write(self.directory, path, self.snapshot())
+        except OSError:
+            self._dirty = True
+
+    def _start_flusher(self):
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            # the first requests of a worker race here: one thread resets and starts
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            # metrics recorded before a fork belong to the parent's file
+            self._counters, self._histograms = {}, {}
+
+            def loop():
+                while True:
+                    time.sleep(self.flush_interval)
+                    self.flush()
+
+            threading.Thread(target=loop, name="metrics-flusher", daemon=True).start()
+
+    def collect(self) -> dict:
+        """Sum the snapshots of every worker process and the archive."""
+        self.flush()
+        acc = dict(counters={}, histograms={}, gauges={})
+        try:
+            with _DirLock(self.directory, fcntl.LOCK_SH):  # never mid-archive
+                for name in os.listdir(self.directory):
+                    if name.endswith(".json") and not name.startswith("."):
+                        _merge(acc, _read(os.path.join(self.directory, name)))
+        except OSError:
+            pass
+        return acc
+
+    def render_prometheus(self) -> str:
+        data = self.collect()
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            series = data[kind + "s"].get(name, {})
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for k in sorted(series):
+                labels = json.loads(k)
+                value = series[k]
+                if kind != "histogram":
+                    lines.append(f"{name}{_labels(labels)} {_num(value)}")
+                    continue
+                for le, count in zip(BUCKETS, value):
+                    lines.append(f"{name}_bucket{_labels(labels + [['le', repr(le)]])} {count}")
+                lines.append(f"{name}_bucket{_labels(labels + [['le', '+Inf']])} {value[-1]}")
+                lines.append(f"{name}_sum{_labels(labels)} {_num(value[-2])}")
+                lines.append(f"{name}_count{_labels(labels)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+
+def _num(value) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def server_timing(timings: dict) -> str:
+    """{phase: seconds} -> Server-Timing header value (durations in ms)."""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
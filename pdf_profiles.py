@@ -0,0 +1,52 @@
+# pdf_profiles.py
+"""PDF output profiles: how a laid-out resume is written to PDF.
+
+A profile is a set of ``write_pdf`` options plus an optional stylesheet
+applied on top of the theme:
+
+* ``standard`` -- the default: subset fonts, compressed streams, embedded
+  images recompressed losslessly and capped at 150 dpi.
+* ``ats``      -- text-first output for applicant tracking systems: no
+  images or backgrounds, no hinting, no metadata, images (if any) at 72 dpi.
+* ``print``    -- high fidelity: full font files with hinting, images
+  untouched, tagged PDF.
+
+``/resume.pdf?profile=ats`` picks one explicitly; otherwise the theme's
+entry in THEME_PROFILES (or DEFAULT_PROFILE) applies. ``python -m
+tools.check_pdf_size`` holds each profile to a byte budget.
+"""
+from collections import namedtuple
+
+Profile = namedtuple("Profile", "options css")
+
+ATS_CSS = (
+    "img, svg, picture, video, object, embed { display: none !important; }\n"
+    "* { background: none !important; box-shadow: none !important; text-shadow: none !important; }\n"
+)
+
+PROFILES = {
+    "standard": Profile(dict(full_fonts=False, hinting=False, uncompressed_pdf=False,
+                             optimize_images=True, dpi=150, jpeg_quality=85), ""),
+    "ats": Profile(dict(full_fonts=False, hinting=False, uncompressed_pdf=False,
+                        optimize_images=True, dpi=72, jpeg_quality=60,
+                        custom_metadata=False, pdf_tags=False), ATS_CSS),
+    "print": Profile(dict(full_fonts=True, hinting=True, uncompressed_pdf=False,
+                          optimize_images=False, dpi=None, jpeg_quality=95,
+                          pdf_tags=True), ""),
+}
+
+DEFAULT_PROFILE = "standard"
+
+# ResumeRequestForm.theme -> default profile (themes not listed get DEFAULT_PROFILE)
+THEME_PROFILES = {
+    "slate": "ats",
+}
+
+
+def profile_for(theme: str, requested: str = None) -> str:
+    """The profile name to use: requested if given, else the theme's default."""
+    if requested:
+        if requested not in PROFILES:
+            raise ValueError(f"unknown PDF profile {requested!r}")
+        return requested
+    return THEME_PROFILES.get(theme, DEFAULT_PROFILE)
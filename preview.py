@@ -0,0 +1,51 @@
+# preview.py
+"""Live preview: per-section HTML fragments of resume.html.
+
+``resume.html`` is assembled from the partials in ``templates/sections/``.
+The preview endpoint keeps a draft of the resume in the session, merges
+each partial update into it, and re-renders only the sections whose inputs
+changed. Each fragment is cached under a hash of the section's own inputs
+(plus the partial's mtime), so an edit to the summary never touches the
+header, skills or languages, and identical sections are shared between users.
+"""
+from urllib.parse import urlparse
+
+from render_cache import files_version, render_key
+from resume_model import FIELD_LIMITS, LIST_FIELDS, Resume, clean_value
+
+# section -> the normalized fields it renders
+SECTIONS = {
+    "header": ("name", "role", "location", "email", "phone",
+               "linkedin", "github", "portfolio"),
+    "summary": ("summary",),
+    "skills": ("skills",),
+    "certifications": ("certifications",),
+    "languages": ("languages",),
+}
+
+LINK_FIELDS = ("linkedin", "github", "portfolio")
+
+
+def merge(draft: Resume, update: dict) -> Resume:
+    """Normalize the known fields of a partial update into a copy of draft.
+
+    Same normalization as the index handler (``clean_value``). The form
+    validators don't run on previews, so link fields that aren't http(s)
+    URLs are dropped rather than rendered as hrefs.
+    """
+    changes = {name: clean_value(name, update[name])
+               for name in (*FIELD_LIMITS, *LIST_FIELDS) if name in update}
+    for name in LINK_FIELDS:
+        value = changes.get(name, getattr(draft, name))
+        if value and urlparse(value).scheme not in ("http", "https"):
+            changes[name] = ""
+    return draft.replace(**changes) if changes else draft
+
+
+def section_inputs(data: Resume, section: str) -> dict:
+    return {f: getattr(data, f) for f in SECTIONS[section]}
+
+
+def section_hash(data: Resume, section: str, template_path: str) -> str:
+    return render_key(section_inputs(data, section), "", f"section:{section}",
+                      files_version([template_path]))
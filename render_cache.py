@@ -0,0 +1,222 @@
+# render_cache.py
+"""Content-addressed cache for rendered resume artifacts (PDF/JPG/DOCX).
+
+Two tiers:
+  * an in-process LRU bounded by total bytes, and
+  * an optional on-disk tier (shared by every gunicorn worker on the box).
+
+Keys come from ``render_key`` and only depend on the normalized resume data,
+the theme, the output format and the mtimes of the files that shape the
+output, so identical sessions share artifacts and edits to templates/CSS
+invalidate everything automatically.
+
+``get_or_render`` renders a missing key once per process: threads that
+miss the same key while it is being rendered wait for that render instead
+of starting their own.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def _normalize(value):
+    """Make resume data JSON-stable (tuples -> lists, sets -> sorted lists)."""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(_normalize(v) for v in value)
+    return value
+
+
+def files_version(paths) -> str:
+    """mtime/size fingerprint of the files an artifact depends on."""
+    bits = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            bits.append(f"{p}:{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            bits.append(f"{p}:-")
+    return "|".join(bits)
+
+
+def render_key(data: dict, theme: str, fmt: str, version: str = "") -> str:
+    """Stable sha256 over (normalized data, theme, format, template version)."""
+    payload = json.dumps(
+        [_normalize(data or {}), theme or "", fmt, version],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """One in-progress render that other threads wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class RenderCache:
+    """Byte-bounded LRU with an optional disk tier. Thread-safe."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, disk_dir: str = None,
+                 disk_max_bytes: int = 512 * 1024 * 1024, max_item_bytes: int = None):
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_item_bytes = max_item_bytes or max(1, self.max_bytes // 4)
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = int(disk_max_bytes)
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self._flights = {}  # key -> _Flight being rendered
+        self.stats = dict(hits=0, disk_hits=0, misses=0, evictions=0,
+                          disk_evictions=0, stores=0, coalesced=0)
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    # -- memory tier ----------------------------------------------------------
+    def _mem_put(self, key, value):
+        if len(value) > self.max_item_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._items[key] = value
+        self._bytes += len(value)
+        while self._bytes > self.max_bytes and self._items:
+            _, dropped = self._items.popitem(last=False)
+            self._bytes -= len(dropped)
+            self.stats["evictions"] += 1
+
+    # -- disk tier ------------------------------------------------------------
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = f.read()
+            os.utime(path)  # refresh LRU position for the disk sweep
+            return value
+        except OSError:
+            return None
+
+    def _disk_put(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp, path)  # atomic: other workers never see partial files
+        except OSError:
+            return
+        self._disk_writes += 1
+        if self._disk_writes % 64 == 0:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Drop least recently used disk entries until under disk_max_bytes."""
+        if not self.disk_dir:
+            return
+        entries, total = [], 0
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                p = os.path.join(root, name)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+        entries.sort()
+        for _, size, p in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(p)
+                total -= size
+                with self._lock:
+                    self.stats["disk_evictions"] += 1
+            except OSError:
+                pass
+
+    # -- public API -----------------------------------------------------------
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                self.stats["hits"] += 1
+                return value
+        value = self._disk_get(key)
+        with self._lock:
+            if value is not None:
+                self.stats["disk_hits"] += 1
+                self._mem_put(key, value)
+            else:
+                self.stats["misses"] += 1
+        return value
+
+    def put(self, key, value: bytes):
+        with self._lock:
+            self.stats["stores"] += 1
+            self._mem_put(key, value)
+        self._disk_put(key, value)
+
+    def get_or_render(self, key, render):
+        """Return cached bytes for key, or call render() and store the result.
+
+        Concurrent callers for the same key share one render() call; if it
+        raises, they all get its exception.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            if key in self._items:  # stored by a render that finished since get()
+                return self._items[key]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = value = render()
+            self.put(key, value)
+            return value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = dict(self.stats)
+            out.update(items=len(self._items), bytes=self._bytes,
+                       max_bytes=self.max_bytes)
+        return out
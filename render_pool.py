@@ -0,0 +1,296 @@
+# render_pool.py
+"""Bounded process pool for WeasyPrint renders.
+
+Layout is CPU-bound and can take hundreds of milliseconds, so it runs in a
+small pool of pre-warmed worker processes instead of on the gunicorn request
+thread. The pool admits at most ``size + queue_depth`` renders at a time;
+anything beyond that is rejected immediately with ``PoolSaturated`` so the
+route can answer 503 + Retry-After instead of queueing without bound.
+
+Jobs (see export.py) are module-level functions so they can be sent to the
+workers; they only receive plain values (HTML string, paths, numbers) and
+return bytes.
+
+The pool also governs its workers, since WeasyPrint processes keep growing
+their font and layout caches:
+
+* a render that has been running for ``timeout`` seconds gets its worker
+  killed instead of leaving the layout running after the request has given
+  up. The deadline starts when a worker picks the render up (each worker
+  reports its pid and start time), so time spent queued behind other
+  renders never counts. The killed worker's generation is replaced, and
+  renders that were in flight on it are resubmitted once to the new one;
+* ``mem_limit_mb`` sets RLIMIT_AS in each worker, so a runaway layout fails
+  with MemoryError rather than waking the OOM killer;
+* each worker reports its render count and RSS with every result. Once one
+  passes ``max_renders`` or ``max_rss_mb``, its generation of workers is
+  retired gracefully (in-flight renders finish) and a fresh, warmed one
+  takes new work.
+
+Every kill and recycle is logged with its reason and passed to ``on_recycle``.
+"""
+import itertools
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+log = logging.getLogger(__name__)
+
+_WARM_HTML = "<!doctype html><html><body><h1>warm</h1><p>up</p></body></html>"
+_POLL = 0.05  # seconds between checks for a queued render's start report
+
+
+class PoolSaturated(Exception):
+    """Raised when the render queue is full."""
+
+    def __init__(self, retry_after: int = 2):
+        super().__init__("render queue is full")
+        self.retry_after = retry_after
+
+
+# -----------------------------------------------------------------------------
+# Worker setup
+# -----------------------------------------------------------------------------
+_renders = 0     # renders done by this worker process
+_started = None  # queue for (task id, pid, start time) reports, set by _warm_worker
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak, KiB on Linux
+
+
+def _governed(fn, args, task=None):
+    """Worker side of every job: report its start, run it, then return (result, pid, renders, rss)."""
+    global _renders
+    if task is not None and _started is not None:
+        # CLOCK_MONOTONIC is system-wide, so the parent can compare it with its own
+        _started.put((task, os.getpid(), time.monotonic()))
+    try:
+        return fn(*args), os.getpid(), _renders + 1, _rss_bytes()
+    finally:
+        _renders += 1
+
+
+def _warm_worker(css_path: str = None, mem_limit_mb: int = 0, started=None):
+    """Process initializer: cap memory, import WeasyPrint, parse theme CSS, lay out a tiny document."""
+    global _started
+    _started = started
+    if mem_limit_mb:
+        import resource
+        limit = mem_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    try:
+        from export import layout
+        from themes import DEFAULT_THEME
+        layout(_WARM_HTML, None, css_path, DEFAULT_THEME).write_pdf()
+    except Exception:
+        pass  # a failed warm-up only costs the first render some latency
+
+
+# -----------------------------------------------------------------------------
+# Pool
+# -----------------------------------------------------------------------------
+class RenderPool:
+    """Process pool with a bounded admission queue.
+
+    ``size=0`` disables the pool and runs jobs inline on the calling thread,
+    which is what the dev server and offline tools want.
+    """
+
+    def __init__(self, size: int = 2, queue_depth: int = 4, timeout: float = 30.0,
+                 start_method: str = "forkserver", css_path: str = None,
+                 max_renders: int = 0, max_rss_mb: int = 0, mem_limit_mb: int = 0,
+                 on_recycle=None):
+        self.size = max(0, int(size))
+        self.queue_depth = max(0, int(queue_depth))
+        self.timeout = timeout
+        self.start_method = start_method
+        self.css_path = css_path
+        self.max_renders = max(0, int(max_renders))
+        self.max_rss_mb = max(0, int(max_rss_mb))
+        self.mem_limit_mb = max(0, int(mem_limit_mb))
+        self.on_recycle = on_recycle  # called with "timeout" | "crash" | "memory" | "max_renders" | "rss"
+        self._slots = threading.BoundedSemaphore(max(1, self.size + self.queue_depth))
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._tasks = itertools.count(1)
+        self._queue = None         # start reports from the workers (per process)
+        self._queue_lock = threading.Lock()
+        self._running = {}         # task id -> (pid, start) for submitted, unfinished tasks
+        self._killed = weakref.WeakSet()  # generations retired by a timeout kill
+        self.stats = dict(submitted=0, rejected=0, completed=0, failed=0,
+                          killed=0, crashed=0, recycled=0)
+
+    def _get_executor(self):
+        # Pools don't survive fork: rebuild if we are in a new process.
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                ctx = multiprocessing.get_context(self.start_method)
+                if self.start_method == "forkserver":
+                    ctx.set_forkserver_preload(["render_pool", "weasy_compat", "themes", "export"])
+                if self._pid != os.getpid():
+                    self._queue, self._running = ctx.SimpleQueue(), {}
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size, mp_context=ctx, initializer=_warm_worker,
+                    initargs=(self.css_path, self.mem_limit_mb, self._queue),
+                )
+                self._pid = os.getpid()
+        return self._executor
+
+    def start(self):
+        """Spawn and warm every worker now rather than on the first download."""
+        if not self.size:
+            if self.css_path:
+                _warm_worker(self.css_path)  # inline mode: build the theme registry here
+            return
+        ex = self._get_executor()
+        for _ in range(self.size):
+            ex.submit(os.getpid)  # each submit spawns a worker until size is reached
+
+    def run(self, fn, *args):
+        """Run fn(*args) in the pool and return its result.
+
+        Raises PoolSaturated without waiting when the queue is full.
+        """
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise PoolSaturated(retry_after=max(1, int(self.timeout // 10) or 1))
+        self._count("submitted")
+        try:
+            if not self.size:
+                result = fn(*args)
+            else:
+                result = self._run_governed(fn, args)
+            self._count("completed")
+            return result
+        except Exception:
+            self._count("failed")
+            raise
+        finally:
+            self._slots.release()
+
+    def _count(self, name: str):
+        with self._lock:  # request threads update these concurrently
+            self.stats[name] += 1
+
+    def _submit(self, fn, args, task):
+        for attempt in (1, 2):
+            ex = self._get_executor()
+            try:
+                with self._queue_lock:
+                    self._running[task] = None
+                return ex, ex.submit(_governed, fn, args, task)
+            except (RuntimeError, BrokenProcessPool):
+                if attempt == 2:  # retired by another thread twice in a row
+                    with self._queue_lock:
+                        self._running.pop(task, None)
+                    raise
+
+    def _start_of(self, task):
+        """(pid, start) once a worker has picked task up, else None."""
+        with self._queue_lock:
+            while not self._queue.empty():
+                t, pid, at = self._queue.get()
+                if t in self._running:  # not a report for a task already given up on
+                    self._running[t] = (pid, at)
+            return self._running.get(task)
+
+    def _wait(self, future, task):
+        """The future's result, or FutureTimeout once it has *run* for ``timeout``."""
+        while True:
+            start = self._start_of(task)
+            if start is None:
+                wait = _POLL  # still queued: the deadline hasn't started
+            else:
+                wait = start[1] + self.timeout - time.monotonic()
+                if wait <= 0:
+                    raise FutureTimeout()
+            try:
+                return future.result(timeout=wait)
+            except FutureTimeout:
+                continue
+
+    def _run_governed(self, fn, args, retry: bool = True):
+        task = next(self._tasks)
+        ex, future = self._submit(fn, args, task)
+        try:
+            result, pid, renders, rss = self._wait(future, task)
+        except FutureTimeout:
+            pid = self._start_of(task)[0]
+            self._retire(ex, "timeout", f"render in worker {pid} exceeded {self.timeout}s", kill_pid=pid)
+            raise
+        except BrokenProcessPool:
+            if retry and ex in self._killed:
+                # collateral of another render's timeout kill: run it on the new generation
+                return self._run_governed(fn, args, retry=False)
+            self._retire(ex, "crash", "a worker died mid-render", kill=True)
+            raise
+        except MemoryError:
+            self._retire(ex, "memory", f"a render hit the {self.mem_limit_mb}MB memory limit")
+            raise
+        finally:
+            with self._queue_lock:
+                self._running.pop(task, None)
+        if self.max_renders and renders >= self.max_renders:
+            self._retire(ex, "max_renders", f"worker {pid} reached {renders} renders")
+        elif self.max_rss_mb and rss > self.max_rss_mb * 1024 * 1024:
+            self._retire(ex, "rss", f"worker {pid} RSS {rss // (1024 * 1024)}MB > {self.max_rss_mb}MB")
+        return result
+
+    def _retire(self, ex, kind: str, reason: str, kill: bool = False, kill_pid: int = None):
+        """Swap in a fresh generation of workers; finish (or kill) the old one.
+
+        ``kill_pid`` kills just that worker. The executor can't survive a
+        worker's death, so its other in-flight renders are resubmitted by
+        their callers (see _run_governed).
+        """
+        if kill_pid is not None:
+            self._killed.add(ex)  # before the kill, so the other renders see it
+        with self._lock:
+            replaced = self._executor is not ex  # by another thread
+            if not replaced:
+                self._executor = None
+                self.stats["killed" if kind == "timeout" else "crashed" if kind == "crash" else "recycled"] += 1
+        if kill_pid is not None:
+            # even in a generation that is already retired: this worker is still busy
+            log.warning("render pool: killing worker %s (%s)", kill_pid, reason)
+            try:
+                os.kill(kill_pid, signal.SIGKILL)
+            except OSError:
+                pass  # already gone
+        if replaced:
+            return
+        if kill and kill_pid is None:
+            log.warning("render pool: killing workers (%s)", reason)
+            # the executor has no public way to stop a running task
+            for proc in list((getattr(ex, "_processes", None) or {}).values()):
+                proc.kill()
+        elif kill_pid is None:
+            log.info("render pool: recycling workers (%s)", reason)
+        ex.shutdown(wait=False, cancel_futures=kill)
+        if self.on_recycle is not None:
+            try:
+                self.on_recycle(kind)
+            except Exception:
+                pass
+        self.start()  # warm the replacement now rather than on the next render
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,224 @@
+# resume_model.py
+"""Typed resume model: the one input of the HTML, PDF and DOCX renderers.
+
+``index`` builds a ``Resume`` from the validated form in one pass
+(``Resume.from_form``) and stores ``resume.state()`` in the session: a
+versioned list of field values in slot order, with no keys, so it is small
+and cheap to serialize. Requests rebuild it with ``Resume.from_state``.
+The same state is what the render cache hashes, so every output format
+has one canonical serialized form.
+
+Field names are the template's: ``role`` (the DOCX builder used to accept
+``title`` too), ``skills``/``certifications``/``languages`` as tuples
+(formerly ``<name>_list``) and structured ``experience``, ``projects`` and
+``education`` entries, which the web form fills only for education but
+JSONL records (tools/batch_render.py) may carry in full.
+
+Bump ``VERSION`` whenever the slots change: older states then no longer
+load and the user is asked to submit the form again.
+"""
+from forms import DEGREE_CHOICES
+from taxonomy import get_taxonomy
+from textnorm import clean_field, split_items
+from themes import DEFAULT_THEME
+
+VERSION = 1
+
+# field -> max length of the normalized text
+FIELD_LIMITS = dict(
+    name=80, email=120, phone=40, role=100, location=120, years=10,
+    summary=1200, linkedin=200, github=200, portfolio=200,
+)
+LIST_FIELDS = ("skills", "certifications", "languages")
+LIST_LIMIT = 24
+ENTRY_LIMIT = 12  # entries per section, bullets per entry
+
+DEGREES = dict(DEGREE_CHOICES)
+
+
+def clean_value(name: str, raw):
+    """One form field normalized as ``from_form`` does it (list fields -> tuple)."""
+    if name in LIST_FIELDS:
+        return tuple(get_taxonomy().unique_list(split_items(str(raw or ""), LIST_LIMIT), name))
+    return clean_field(str(raw or ""), FIELD_LIMITS[name])
+
+
+class _Entry:
+    """An experience/project/education entry: string slots, plus tuple slots in _TUPLES."""
+
+    __slots__ = ()
+    _LIMITS = {}
+    _TUPLES = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name, () if name in self._TUPLES else ""))
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        """Normalized entry from untrusted input, e.g. a JSONL record."""
+        values = {}
+        for name in cls.__slots__:
+            raw = d.get(name)
+            if name in cls._TUPLES:
+                items = raw if isinstance(raw, (list, tuple)) else ()
+                values[name] = tuple(x for x in (clean_field(str(i), 300) for i in items[:ENTRY_LIMIT]) if x)
+            else:
+                values[name] = clean_field(str(raw or ""), cls._LIMITS.get(name, 120))
+        return cls(**values)
+
+    def state(self) -> list:
+        return [list(getattr(self, n)) if n in self._TUPLES else getattr(self, n) for n in self.__slots__]
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(**{n: tuple(v) if n in cls._TUPLES else v for n, v in zip(cls.__slots__, state)})
+
+    def __bool__(self):
+        return any(getattr(self, n) for n in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.state() == other.state()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{n}={getattr(self, n)!r}' for n in self.__slots__)})"
+
+
+class Experience(_Entry):
+    __slots__ = ("title", "company", "location", "start", "end", "bullets")
+    _LIMITS = dict(title=100, company=100, location=120, start=20, end=20)
+    _TUPLES = ("bullets",)
+
+
+class Project(_Entry):
+    __slots__ = ("name", "description")
+    _LIMITS = dict(name=100, description=600)
+
+
+class Education(_Entry):
+    __slots__ = ("school", "degree", "grad")
+    _LIMITS = dict(school=100, degree=100, grad=20)
+
+
+class Resume:
+    __slots__ = (
+        "name", "email", "phone", "role", "location", "years", "summary",
+        "linkedin", "github", "portfolio", "work_mode", "theme",
+        "skills", "certifications", "languages",
+        "experience", "projects", "education",
+        "include_projects", "include_education",
+    )
+    _STRINGS = __slots__[:12]
+    _LISTS = __slots__[12:15]
+    _ENTRIES = dict(experience=Experience, projects=Project, education=Education)
+
+    def __init__(self, name: str = "", email: str = "", phone: str = "", role: str = "",
+                 location: str = "", years: str = "", summary: str = "", linkedin: str = "",
+                 github: str = "", portfolio: str = "", work_mode: str = "", theme: str = DEFAULT_THEME,
+                 skills: tuple = (), certifications: tuple = (), languages: tuple = (),
+                 experience: tuple = (), projects: tuple = (), education: tuple = (),
+                 include_projects: bool = True, include_education: bool = True):
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.role = role
+        self.location = location
+        self.years = years
+        self.summary = summary
+        self.linkedin = linkedin
+        self.github = github
+        self.portfolio = portfolio
+        self.work_mode = work_mode
+        self.theme = theme
+        self.skills = skills
+        self.certifications = certifications
+        self.languages = languages
+        self.experience = experience
+        self.projects = projects
+        self.education = education
+        self.include_projects = include_projects
+        self.include_education = include_education
+
+    # -- building --------------------------------------------------------------
+    @classmethod
+    def from_form(cls, values: dict) -> "Resume":
+        """Normalize a submitted form (``form.data``) in one pass."""
+        get = values.get
+        education = Education(school=clean_field(get("school") or "", 100),
+                              degree=DEGREES.get(get("highest_degree") or "", ""),
+                              grad=clean_field(get("grad_year") or "", 20))
+        return cls(
+            **{name: clean_value(name, get(name)) for name in (*FIELD_LIMITS, *LIST_FIELDS)},
+            work_mode=get("work_mode") or "",
+            theme=get("theme") or DEFAULT_THEME,
+            education=(education,) if education else (),
+        )
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Resume":
+        """From a loose dict: raw form fields or the old normalized session dict
+        (``<name>_list`` lists, ``title`` for ``role``), with optional
+        ``experience``/``projects``/``education`` lists and ``options``."""
+        values = dict(d)
+        for name in LIST_FIELDS:
+            items = values.get(f"{name}_list")
+            if isinstance(items, (list, tuple)) and not values.get(name):
+                values[name] = ",".join(str(x) for x in items)
+        if not values.get("role"):
+            values["role"] = values.get("title") or ""
+        resume = cls.from_form(values)
+        for name, entry in cls._ENTRIES.items():
+            raw = values.get(name)
+            if isinstance(raw, dict):
+                raw = [dict(raw, grad=raw.get("grad") or raw.get("when"))]
+            if isinstance(raw, list):
+                entries = (entry.from_dict(e) for e in raw[:ENTRY_LIMIT] if isinstance(e, dict))
+                setattr(resume, name, tuple(e for e in entries if e))
+        options = values.get("options") if isinstance(values.get("options"), dict) else {}
+        resume.include_projects = bool(options.get("include_projects", True))
+        resume.include_education = bool(options.get("include_education", True))
+        return resume
+
+    def replace(self, **changes) -> "Resume":
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return type(self)(**values)
+
+    # -- serialization ---------------------------------------------------------
+    def state(self) -> list:
+        """Compact, JSON-ready form: [VERSION, *slots]. Also the render cache input."""
+        out = [VERSION]
+        out.extend(getattr(self, n) for n in self._STRINGS)
+        out.extend(list(getattr(self, n)) for n in self._LISTS)
+        out.extend([e.state() for e in getattr(self, n)] for n in self._ENTRIES)
+        out.append(self.include_projects)
+        out.append(self.include_education)
+        return out
+
+    @classmethod
+    def from_state(cls, state) -> "Resume":
+        """Rebuild from ``state()``; None for a missing or other-version state.
+
+        Dicts are sessions stored before the model existed and go through
+        ``from_dict``.
+        """
+        if isinstance(state, dict):
+            return cls.from_dict(state)
+        if not isinstance(state, list) or len(state) != len(cls.__slots__) + 1 or state[0] != VERSION:
+            return None
+        values = dict(zip(cls.__slots__, state[1:]))
+        for n in cls._LISTS:
+            values[n] = tuple(values[n])
+        for n, entry in cls._ENTRIES.items():
+            values[n] = tuple(entry.from_state(e) for e in values[n])
+        return cls(**values)
+
+    @property
+    def links(self) -> tuple:
+        return tuple(x for x in (self.linkedin, self.github, self.portfolio) if x)
+
+    def __eq__(self, other):
+        return isinstance(other, Resume) and self.state() == other.state()
+
+    def __repr__(self):
+        return f"Resume(name={self.name!r}, role={self.role!r}, theme={self.theme!r})"
@@ -0,0 +1,298 @@
+# session_store.py
+"""Server-side session store: sharded files, compact encoding, TTL sweeping.
+
+Layout: ``<root>/<sid[0:2]>/<sid[2:4]>/<sid>``, so no directory holds more
+than a few hundred entries even with millions of sessions.
+
+Record format (version 1)::
+
+    b"RS" | version:u8 | flags:u8 | expires:u32 | payload
+
+``payload`` is Flask's tagged JSON (the same serializer the cookie session
+uses), zlib-compressed when that makes it smaller (flag bit 0). Each file's
+mtime is set to its expiry time, so the sweeper can expire sessions with a
+plain ``stat`` and never has to open them.
+
+A background thread in each process sweeps expired files and enforces a
+total size cap (soonest-expiring first); an advisory lock keeps concurrent
+gunicorn workers from sweeping at the same time. Decoded sessions are kept in
+a small per-process LRU keyed by the file's inode, size, mtime and ctime, so
+repeated ``/resume*`` hits don't re-read and re-decode the file. The mtime
+alone is not enough: it is the whole-second expiry, so two saves within one
+second would look the same. Every save is a new file (``os.replace``) and
+stamps a new nanosecond ctime. Callers get a deep copy, never the cached
+object.
+"""
+import copy
+import fcntl
+import os
+import secrets
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+MAGIC = b"RS"
+VERSION = 1
+FLAG_ZLIB = 1
+_HEADER = struct.Struct(">2sBBI")
+_COMPRESS_MIN = 200  # bytes; smaller payloads rarely shrink
+
+_serializer = TaggedJSONSerializer()
+
+
+def encode(data: dict, expires: int) -> bytes:
+    payload = _serializer.dumps(dict(data)).encode("utf-8")
+    flags = 0
+    if len(payload) >= _COMPRESS_MIN:
+        packed = zlib.compress(payload, 6)
+        if len(packed) < len(payload):
+            payload, flags = packed, FLAG_ZLIB
+    return _HEADER.pack(MAGIC, VERSION, flags, int(expires)) + payload
+
+
+def decode(raw: bytes):
+    """Return (data, expires) or None if raw isn't a version-1 record."""
+    if len(raw) < _HEADER.size:
+        return None
+    magic, version, flags, expires = _HEADER.unpack_from(raw)
+    if magic != MAGIC or version != VERSION:
+        return None
+    payload = raw[_HEADER.size:]
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    return _serializer.loads(payload.decode("utf-8")), expires
+
+
+class SessionStore:
+    def __init__(self, root: str, ttl: int = 86400, max_bytes: int = 256 * 1024 * 1024,
+                 sweep_interval: int = 300, cache_size: int = 512):
+        self.root = root
+        self.ttl = int(ttl)
+        self.max_bytes = int(max_bytes)
+        self.sweep_interval = sweep_interval
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # sid -> (file version, data)
+        self._lock = threading.Lock()
+        self._sweeper_pid = None
+        self.metrics = dict(live_sessions=0, bytes_on_disk=0, last_sweep_seconds=0.0,
+                            last_sweep_at=0.0, swept_expired=0, swept_over_cap=0,
+                            cache_hits=0, cache_misses=0)
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, sid: str) -> str:
+        return os.path.join(self.root, sid[:2], sid[2:4], sid)
+
+    @staticmethod
+    def _version(st) -> tuple:
+        return st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns
+
+    # -- read/write ------------------------------------------------------------
+    def load(self, sid: str):
+        path = self.path(sid)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if st.st_mtime < time.time():  # mtime holds the expiry time
+            return None
+        with self._lock:
+            hit = self._cache.get(sid)
+            if hit is not None and hit[0] == self._version(st):
+                self._cache.move_to_end(sid)
+                self.metrics["cache_hits"] += 1
+                return copy.deepcopy(hit[1])
+        try:
+            with open(path, "rb") as f:
+                record = decode(f.read())
+        except (OSError, ValueError, zlib.error):
+            return None
+        if record is None:
+            return None
+        data, _ = record
+        self._remember(sid, self._version(st), copy.deepcopy(data), miss=True)
+        return data
+
+    def save(self, sid: str, data: dict):
+        expires = int(time.time()) + self.ttl
+        path = self.path(sid)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(encode(data, expires))
+            os.utime(tmp, (expires, expires))
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self._remember(sid, self._version(os.stat(path)), copy.deepcopy(dict(data)))
+
+    def delete(self, sid: str):
+        with self._lock:
+            self._cache.pop(sid, None)
+        try:
+            os.remove(self.path(sid))
+        except OSError:
+            pass
+
+    def _remember(self, sid, version, data, miss=False):
+        with self._lock:
+            if miss:
+                self.metrics["cache_misses"] += 1
+            self._cache[sid] = (version, data)
+            self._cache.move_to_end(sid)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # -- sweeping --------------------------------------------------------------
+    def sweep(self):
+        """Delete expired sessions, then the soonest-expiring until under max_bytes."""
+        lock_path = os.path.join(self.root, ".sweep.lock")
+        with open(lock_path, "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return  # another worker is sweeping
+            t0 = time.perf_counter()
+            now = time.time()
+            live, total, expired = [], 0, 0
+            for dirpath, dirnames, filenames in os.walk(self.root):
+                for name in filenames:
+                    if name.startswith("."):
+                        continue
+                    p = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(p)
+                        # flat files in the root predate sharding; nothing reads them
+                        if st.st_mtime < now or dirpath == self.root:
+                            os.remove(p)
+                            expired += 1
+                            continue
+                    except OSError:
+                        continue
+                    live.append((st.st_mtime, st.st_size, p))
+                    total += st.st_size
+            over = 0
+            if total > self.max_bytes:
+                live.sort()
+                while live and total > self.max_bytes:
+                    _, size, p = live.pop(0)
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+                    total -= size
+                    over += 1
+            with self._lock:
+                self.metrics.update(
+                    live_sessions=len(live), bytes_on_disk=total,
+                    last_sweep_seconds=round(time.perf_counter() - t0, 6), last_sweep_at=now,
+                    swept_expired=self.metrics["swept_expired"] + expired,
+                    swept_over_cap=self.metrics["swept_over_cap"] + over,
+                )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.metrics)
+
+    def start_sweeper(self):
+        """Start this process's background sweeper (idempotent, fork-aware)."""
+        if self._sweeper_pid == os.getpid() or not self.sweep_interval:
+            return
+        self._sweeper_pid = os.getpid()
+
+        def loop():
+            while True:
+                try:
+                    self.sweep()
+                except Exception:
+                    pass
+                time.sleep(self.sweep_interval)
+
+        threading.Thread(target=loop, name="session-sweeper", daemon=True).start()
+
+
+# -----------------------------------------------------------------------------
+# Flask integration
+# -----------------------------------------------------------------------------
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+
+
+class StoreSessionInterface(SessionInterface):
+    """Keeps only a signed session id in the cookie; data lives in a SessionStore."""
+
+    session_class = ServerSession
+    salt = "session-store"
+
+    def __init__(self, store: SessionStore):
+        self.store = store
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt)
+
+    def open_session(self, app, request):
+        self.store.start_sweeper()
+        raw = request.cookies.get(self.get_cookie_name(app))
+        if raw:
+            try:
+                sid = self._signer(app).unsign(raw).decode("ascii")
+            except BadSignature:
+                sid = None
+            if sid:
+                data = self.store.load(sid)
+                if data is not None:
+                    return self.session_class(data, sid=sid)
+        return self.session_class(sid=secrets.token_hex(16), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add("Cookie")
+            return
+
+        if session.modified or session.new:
+            self.store.save(session.sid, session)
+        elif not self.should_set_cookie(app, session):
+            return
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode("ascii"),
+            expires=self.get_expiration_time(app, session),
+            httponly=httponly, domain=domain, path=path, secure=secure, samesite=samesite,
+        )
+        response.vary.add("Cookie")
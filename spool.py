@@ -0,0 +1,125 @@
+# spool.py
+"""Artifact spool for nginx X-Accel-Redirect delivery.
+
+With a spool configured, export routes don't send the rendered bytes
+themselves: they write them to ``<root>/<u[0:2]>/<u>/<sha256>.<ext>`` and
+answer with an empty response carrying ``X-Accel-Redirect: <prefix><path>``.
+nginx then serves the file from an ``internal`` location with sendfile
+(including Range requests), and the gunicorn worker is free as soon as the
+file is written instead of when a slow client has read the last byte.
+
+``u`` is an HMAC of a random per-session key, so one user's directory can't
+be derived from another's, and file names are content hashes, so the same
+artifact is written once. As in session_store, each file's mtime is its
+expiry time: publishing refreshes it, and a background thread per process
+deletes expired files with a plain ``stat``.
+"""
+import fcntl
+import hashlib
+import hmac
+import os
+import tempfile
+import threading
+import time
+
+# mimetype -> file extension, so nginx's types map agrees with the app
+EXTENSIONS = {
+    "application/pdf": "pdf",
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+}
+
+
+class Spool:
+    def __init__(self, root: str, secret: str, prefix: str = "/_spool/", ttl: int = 600,
+                 sweep_interval: int = 60):
+        self.root = root
+        self.prefix = prefix if prefix.endswith("/") else prefix + "/"
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._secret = secret.encode("utf-8")
+        self._sweeper_pid = None
+        self.metrics = dict(files=0, bytes_on_disk=0, swept=0, last_sweep_at=0.0)
+
+    def user_dir(self, user_key: str) -> str:
+        u = hmac.new(self._secret, user_key.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+        return f"{u[:2]}/{u}"
+
+    def publish(self, body: bytes, mimetype: str, user_key: str) -> str:
+        """Write body (once per content) and return its X-Accel-Redirect URI."""
+        self.start_sweeper()
+        rel = f"{self.user_dir(user_key)}/{hashlib.sha256(body).hexdigest()[:40]}.{EXTENSIONS.get(mimetype, 'bin')}"
+        path = os.path.join(self.root, rel)
+        expires = time.time() + self.ttl
+        try:
+            os.utime(path, (expires, expires))  # already spooled: just extend it
+        except FileNotFoundError:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, mode=0o755, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(body)
+                os.chmod(tmp, 0o644)  # read by the nginx user
+                os.utime(tmp, (expires, expires))
+                os.replace(tmp, path)
+            except BaseException:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+        return self.prefix + rel
+
+    # -- sweeping --------------------------------------------------------------
+    def sweep(self):
+        """Delete expired files and the user directories they leave empty."""
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, ".sweep.lock"), "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return  # another worker is sweeping
+            now = time.time()
+            files = total = swept = 0
+            for dirpath, dirnames, filenames in os.walk(self.root, topdown=False):
+                for name in filenames:
+                    if name == ".sweep.lock":
+                        continue
+                    p = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(p)
+                        # a temp file is still being written unless it's an hour old
+                        if st.st_mtime < (now - 3600 if name.startswith(".tmp-") else now):
+                            os.remove(p)
+                            swept += 1
+                            continue
+                    except OSError:
+                        continue
+                    files += 1
+                    total += st.st_size
+                if dirpath != self.root:
+                    try:
+                        os.rmdir(dirpath)  # only succeeds when empty
+                    except OSError:
+                        pass
+            self.metrics.update(files=files, bytes_on_disk=total, swept=self.metrics["swept"] + swept,
+                                last_sweep_at=now)
+
+    def start_sweeper(self):
+        """Start this process's background sweeper (idempotent, fork-aware)."""
+        if self._sweeper_pid == os.getpid() or not self.sweep_interval:
+            return
+        self._sweeper_pid = os.getpid()
+
+        def loop():
+            while True:
+                try:
+                    self.sweep()
+                except Exception:
+                    pass
+                time.sleep(self.sweep_interval)
+
+        threading.Thread(target=loop, name="spool-sweeper", daemon=True).start()
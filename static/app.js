@@ -18,6 +18,61 @@
   }
   document.querySelectorAll('textarea[maxlength]').forEach(attachCounter);
 
+  // Live preview: send the fields edited since the last response (debounced);
+  // the server answers with only the resume sections whose inputs changed.
+  const previewUrl = form.dataset.previewUrl;
+  const preview = document.getElementById('preview');
+  if(previewUrl && preview && window.fetch){
+    const csrf = form.querySelector('input[name="csrf_token"]');
+    const known = {};
+    let dirty = {}, timer = null, first = true, inflight = false;
+
+    function fieldValues(all){
+      const out = {};
+      Array.prototype.forEach.call(form.elements, function(el){
+        if(!el.name || el.name === 'csrf_token' || el.name === 'hp') return;
+        if(all || dirty[el.name]) out[el.name] = el.value;
+      });
+      return out;
+    }
+
+    function send(){
+      if(inflight){ schedule(); return; }
+      const body = {fields: fieldValues(first), known: known, reset: first};
+      const sent = dirty;
+      dirty = {};
+      inflight = true;
+      fetch(previewUrl, {
+        method: 'POST',
+        credentials: 'same-origin',
+        headers: {'Content-Type': 'application/json', 'X-CSRFToken': csrf ? csrf.value : ''},
+        body: JSON.stringify(body)
+      }).then(function(r){
+        if(!r.ok) throw new Error('preview ' + r.status);
+        return r.json();
+      }).then(function(res){
+        first = false;
+        Object.keys(res.sections || {}).forEach(function(name){
+          const slot = preview.querySelector('[data-section="' + name + '"]');
+          if(slot) slot.innerHTML = res.sections[name];  // server-rendered, escaped by Jinja
+        });
+        Object.assign(known, res.hashes || {});
+        preview.hidden = false;
+      }).catch(function(){
+        Object.assign(dirty, sent);  // retry these fields with the next edit
+      }).finally(function(){ inflight = false; });
+    }
+
+    function schedule(){
+      clearTimeout(timer);
+      timer = setTimeout(send, 350);
+    }
+
+    form.addEventListener('input', function(e){
+      if(e.target && e.target.name){ dirty[e.target.name] = true; schedule(); }
+    });
+  }
+
   // Prevent accidental double submit
   const btn = form.querySelector('button[type="submit"]');
   form.addEventListener('submit', function(){
@@ -25,3 +80,57 @@
     if(btn){ btn.disabled = true; btn.textContent = 'Working…'; }
   });
 })();
+
+// Download buttons: queue a render job and poll it, then fetch the finished
+// file, instead of holding one request open for the whole render. Without
+// fetch (or on any error) the links download directly as before.
+(function(){
+  const box = document.querySelector('[data-jobs-url]');
+  if(!box || !window.fetch || !window.Promise) return;
+  const status = document.querySelector('.job-status');
+  const csrf = box.dataset.csrf || '';
+
+  function say(text){
+    if(!status) return;
+    status.textContent = text;
+    status.hidden = !text;
+  }
+
+  function poll(url, delay){
+    return new Promise(function(resolve){ setTimeout(resolve, delay); }).then(function(){
+      return fetch(url, {credentials: 'same-origin'});
+    }).then(function(r){
+      if(!r.ok) throw new Error('job ' + r.status);
+      return r.json();
+    }).then(function(job){
+      if(job.status === 'done') return job;
+      if(job.status === 'failed') throw new Error(job.error || 'render failed');
+      say(job.position ? 'Waiting for a renderer (' + job.position + ' ahead)…' : 'Rendering…');
+      return poll(url, Math.min(2000, delay * 1.5));
+    });
+  }
+
+  box.addEventListener('click', function(e){
+    const link = e.target.closest('a[data-job-format]');
+    if(!link || link.dataset.busy) return;
+    e.preventDefault();
+    link.dataset.busy = '1';
+    say('Queued…');
+    fetch(box.dataset.jobsUrl + '?format=' + encodeURIComponent(link.dataset.jobFormat), {
+      method: 'POST',
+      credentials: 'same-origin',
+      headers: {'X-CSRFToken': csrf}
+    }).then(function(r){
+      if(r.status !== 202) throw new Error('jobs ' + r.status);
+      return r.json();
+    }).then(function(job){
+      return job.status === 'done' ? job : poll(job.status_url, 300);
+    }).then(function(job){
+      say('');
+      window.location.assign(job.file_url);  // served as an attachment
+    }).catch(function(){
+      say('');
+      window.location.assign(link.href);
+    }).finally(function(){ delete link.dataset.busy; });
+  });
+})();
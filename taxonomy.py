@@ -0,0 +1,199 @@
+# taxonomy.py
+"""Skill taxonomy: canonical list entries and job-description matching.
+
+``data/skills.txt`` lists canonical skills, certifications and languages
+with their aliases. It is compiled once per process into:
+
+* an alias map per list field, which dedupes the skills, certifications
+  and languages lists in ``index`` and the live preview: "JS, javascript,
+  Java Script" keeps only "JS", the user's first spelling. Stored lists
+  are never rewritten to canonical names; those only appear in
+  ``/resume/match`` results;
+* an Aho-Corasick automaton over word tokens, which finds every term in a
+  job description in one pass over its tokens: the cost depends on the
+  length of the text, not on how many terms the taxonomy has.
+
+Both sides are lower-cased and split into the same tokens (letters,
+digits, "+", "#" and inner dots, with an optional leading dot for ".NET"),
+so matches always fall on word boundaries. Names marked "~" in the data
+file are too ambiguous for free text and only dedupe list entries.
+"""
+import os
+import re
+import threading
+from collections import deque
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skills.txt")
+
+_TOKEN_RE = re.compile(r"\.?[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+
+def tokens(text: str) -> list:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def key(text: str) -> str:
+    """Lookup key of a name: its tokens, space-joined."""
+    return " ".join(tokens(text))
+
+
+def parse(lines):
+    """Yield (kind, canonical, [(alias, scan)]) from the data file format."""
+    kind = None
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            kind = line[1:-1].strip()
+            continue
+        names = []
+        head, _, rest = line.partition("|")
+        for name in [head, *rest.split(",")]:
+            name = name.strip()
+            if name:
+                names.append((name.lstrip("~").strip(), not name.startswith("~")))
+        if names:
+            yield kind, names[0][0], names
+
+
+class Taxonomy:
+    def __init__(self, entries):
+        self.names = []    # term id -> canonical name
+        self.kinds = []    # term id -> list field
+        self.aliases = {}  # kind -> {key: term id}
+        self._vocab = {}   # token -> token id
+        # automaton: per node, token id -> child node; fail link; term ids ending here
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for kind, canonical, names in entries:
+            tid = len(self.names)
+            self.names.append(canonical)
+            self.kinds.append(kind)
+            by_key = self.aliases.setdefault(kind, {})
+            for name, scan in names:
+                k = key(name)
+                if not k:
+                    continue
+                by_key.setdefault(k, tid)
+                if scan:
+                    self._insert(k.split(" "), tid)
+        self._link()
+
+    @classmethod
+    def load(cls, path: str = DATA_PATH) -> "Taxonomy":
+        with open(path, encoding="utf-8") as f:
+            return cls(parse(f))
+
+    def __len__(self):
+        return len(self.names)
+
+    # -- automaton -------------------------------------------------------------
+    def _insert(self, toks, tid):
+        node = 0
+        for tok in toks:
+            t = self._vocab.setdefault(tok, len(self._vocab))
+            nxt = self._goto[node].get(t)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][t] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        if tid not in self._out[node]:
+            self._out[node] = self._out[node] + (tid,)
+
+    def _link(self):
+        """Breadth-first fail links; each node also reports its suffixes' terms."""
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for t, child in goto[node].items():
+                f = fail[node]
+                while f and t not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(t, 0) if node else 0
+                out[child] = out[child] + tuple(x for x in out[fail[child]] if x not in out[child])
+                queue.append(child)
+
+    def scan(self, text: str) -> dict:
+        """{term id: occurrences} for every scannable term in text."""
+        goto, fail, out, vocab = self._goto, self._fail, self._out, self._vocab
+        found = {}
+        node = 0
+        for tok in tokens(text):
+            t = vocab.get(tok)
+            if t is None:  # no term contains this token
+                node = 0
+                continue
+            while node and t not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(t, 0)
+            for tid in out[node]:
+                found[tid] = found.get(tid, 0) + 1
+        return found
+
+    # -- list fields -----------------------------------------------------------
+    def lookup(self, item: str, kind: str = None):
+        """Term id of a list entry (any kind when kind is None), or None."""
+        k = key(item)
+        if kind is not None:
+            return self.aliases.get(kind, {}).get(k)
+        for by_key in self.aliases.values():
+            tid = by_key.get(k)
+            if tid is not None:
+                return tid
+        return None
+
+    def unique_list(self, items: list, kind: str) -> list:
+        """Entries as spelled, minus later synonyms of an earlier one (same term or same text)."""
+        seen, out = set(), []
+        for item in items:
+            tid = self.lookup(item, kind)
+            k = tid if tid is not None else item.lower()
+            if k not in seen:
+                seen.add(k)
+                out.append(item)
+        return out
+
+    def match(self, resume_items: list, text: str) -> dict:
+        """Resume entries vs a job description: matched and missing terms.
+
+        Terms are ordered by how often the description mentions them. Resume
+        entries the taxonomy doesn't know are looked for as token sequences.
+        """
+        found = self.scan(text)
+        have, unknown = set(), []
+        for item in resume_items:
+            tid = self.lookup(item)
+            if tid is not None:
+                have.add(tid)
+            elif key(item):
+                unknown.append(item)
+        ranked = sorted(found, key=lambda t: (-found[t], self.names[t].lower()))
+        matched = [self.names[t] for t in ranked if t in have]
+        missing = [self.names[t] for t in ranked if t not in have]
+        if unknown:
+            haystack = f" {key(text)} "
+            matched += [item for item in unknown if f" {key(item)} " in haystack]
+        total = len(matched) + len(missing)
+        return dict(matched=matched, missing=missing,
+                    score=round(len(matched) / total, 3) if total else None)
+
+
+_lock = threading.Lock()
+_taxonomy = None
+
+
+def get_taxonomy() -> Taxonomy:
+    """The bundled taxonomy, compiled on first use (once per process)."""
+    global _taxonomy
+    if _taxonomy is None:
+        with _lock:
+            if _taxonomy is None:
+                _taxonomy = Taxonomy.load()
+    return _taxonomy
+
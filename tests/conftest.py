@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Before app is imported: keep every on-disk side effect in a scratch directory
+# and render inline, without a process pool.
+_scratch = tempfile.mkdtemp(prefix="resumeunicorn-tests-")
+for name, value in dict(
+    SESSION_BACKEND="cookie",
+    RENDER_POOL_SIZE="0",
+    METRICS_DIR=os.path.join(_scratch, "metrics"),
+    JOBS_DB=os.path.join(_scratch, "jobs.db"),
+    LIMITER_STORAGE_URI="memory://",
+    RATELIMIT_ENABLED="0",
+).items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def app_module():
+    import app as app_module
+    app_module.app.config.update(
+        TESTING=True, WTF_CSRF_ENABLED=False, SESSION_COOKIE_SECURE=False,
+        SESSION_COOKIE_DOMAIN=None, RATELIMIT_ENABLED=False,
+    )
+    return app_module
+
+
+@pytest.fixture
+def resume():
+    from resume_model import Resume
+    return Resume(name="Jane Doe", email="jane@example.com", role="Backend Engineer",
+                  theme="rose", summary="Builds APIs.", skills=("Python", "Flask"))
+
+
+@pytest.fixture
+def client(app_module, resume):
+    c = app_module.app.test_client()
+    with c.session_transaction() as s:
+        s["resume_data"] = resume.state()
+    return c
@@ -0,0 +1,47 @@
+import io
+import zipfile
+
+import pytest
+
+from bundle import iter_zip
+
+
+def test_iter_zip_round_trip():
+    members = [("a.txt", lambda: b"alpha" * 50000), ("b.txt", lambda: b"beta")]
+    with zipfile.ZipFile(io.BytesIO(b"".join(iter_zip(members)))) as zf:
+        assert zf.read("a.txt") == b"alpha" * 50000
+        assert zf.read("b.txt") == b"beta"
+
+
+def test_iter_zip_failure_never_ends_the_archive():
+    def broken():
+        raise RuntimeError("render failed")
+
+    sent = []
+    with pytest.raises(RuntimeError):
+        for chunk in iter_zip([("a.txt", lambda: b"alpha"), ("b.txt", broken)]):
+            sent.append(chunk)
+    assert sent  # the first member was already on the wire
+    with pytest.raises(zipfile.BadZipFile):  # no central directory: not a valid ZIP
+        zipfile.ZipFile(io.BytesIO(b"".join(sent)))
+
+
+def test_bundle_render_failure_is_a_500_before_streaming(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "_export", lambda data, outputs, profile: {out: b"x" for out in outputs})
+
+    def broken(data):
+        raise RuntimeError("docx failed")
+
+    monkeypatch.setattr(app_module, "_render_docx", broken)
+    resp = client.get("/resume.bundle.zip")
+    assert resp.status_code == 500
+    assert resp.mimetype != "application/zip"
+
+
+def test_bundle_streams_every_member(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "_export", lambda data, outputs, profile: {out: b"x" for out in outputs})
+    monkeypatch.setattr(app_module, "_render_docx", lambda data: b"docx")
+    resp = client.get("/resume.bundle.zip")
+    assert resp.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(resp.get_data())) as zf:
+        assert sorted(zf.namelist()) == ["Jane_Doe.docx", "Jane_Doe.jpg", "Jane_Doe.pdf"]
@@ -0,0 +1,58 @@
+import io
+import threading
+
+from docx import Document
+from docx.shared import Pt
+
+from generators.docx_builder import HEADER_SIZE, LABELS, SECTION_SIZE, render_docx
+from resume_model import Experience, Project, Resume
+from themes import THEME_ACCENTS, THEMES
+
+ALICE = Resume(name="Alice Anders", role="Data Engineer", theme="rose", summary="Pipelines.",
+               skills=("Spark",), experience=(Experience(title="Engineer", company="Acme",
+                                                         bullets=("Built the lake",)),))
+BOB = Resume(name="Bob Brown", role="Designer", theme="rose", languages=("French",),
+             projects=(Project(name="Typeface", description="A serif"),))
+
+
+def _text(blob: bytes) -> str:
+    return "\n".join(p.text for p in Document(io.BytesIO(blob)).paragraphs)
+
+
+def test_concurrent_renders_from_one_template_stay_separate():
+    outputs, errors = [], []
+    start = threading.Barrier(8)
+
+    def worker(resume):
+        try:
+            start.wait()
+            for _ in range(10):
+                outputs.append((resume, render_docx(resume)))
+        except Exception as e:  # surfaced by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(ALICE if i % 2 else BOB,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors and len(outputs) == 80
+    for resume, blob in outputs:
+        text = _text(blob)
+        mine, other = (ALICE, BOB) if resume is ALICE else (BOB, ALICE)
+        assert mine.name in text and other.name not in text
+        assert text.count(mine.name) == 1
+    alice, bob = _text(render_docx(ALICE)), _text(render_docx(BOB))
+    assert LABELS["experience"] in alice and "Built the lake" in alice and LABELS["projects"] not in alice
+    assert LABELS["projects"] in bob and "Typeface" in bob and LABELS["experience"] not in bob
+
+
+def test_every_theme_keeps_its_styles():
+    for theme in THEMES:
+        doc = Document(io.BytesIO(render_docx(ALICE.replace(theme=theme))))
+        accent = THEME_ACCENTS[theme].lstrip("#").upper()
+        title, heading = doc.styles["Title"].font, doc.styles["Heading 1"].font
+        assert str(title.color.rgb) == accent and title.size == Pt(HEADER_SIZE)
+        assert str(heading.color.rgb) == accent and heading.size == Pt(SECTION_SIZE)
+        assert doc.paragraphs[0].style.name == "Title"
+        assert doc.sections[0].left_margin == doc.sections[0].right_margin
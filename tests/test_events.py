@@ -0,0 +1,40 @@
+import gzip
+import os
+import subprocess
+import sys
+
+from events import EventLog
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def _touch(path, mtime, data=b'{"event":"request"}\n'):
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, (mtime, mtime))
+
+
+def test_prune_counts_every_worker_and_collects_dead_workers_files(tmp_path):
+    dead = _dead_pid()
+    for i in range(4):  # older rotated files of other workers
+        _touch(tmp_path / f"events-{dead}-2020010{i}T000000.jsonl.gz", 1_000_000 + i)
+    _touch(tmp_path / f"events-{dead}.jsonl", 2_000_000)  # active file of an exited worker
+
+    log = EventLog(str(tmp_path), keep=3)
+    log.emit("request", path="/")
+    log.close()
+
+    names = sorted(os.listdir(tmp_path))
+    rotated = [n for n in names if n.startswith("events-")]
+    assert len(rotated) == 3
+    assert f"events-{dead}.jsonl" not in names
+    assert all(n.endswith(".jsonl.gz") for n in rotated)
+    orphan = [n for n in rotated if n.startswith(f"events-{dead}-") and "1970" in n]
+    assert len(orphan) == 1  # renamed with its mtime, gzipped, kept as one of the newest
+    with gzip.open(tmp_path / orphan[0]) as f:
+        assert f.read() == b'{"event":"request"}\n'
+    assert any(n.startswith(f"events-{os.getpid()}-") for n in rotated)
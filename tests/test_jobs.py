@@ -0,0 +1,21 @@
+import time
+
+from jobs import JobQueue
+
+
+def test_purge_drops_old_results_and_frees_their_pages(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.db"), ttl=60)
+    job = q.submit("owner", "key", "pdf", {})
+    job_id = q.claim()[0]
+    assert job_id == job["id"]
+    q.finish(job_id, b"%PDF" + b"x" * 1_000_000)
+    conn = q._conn()
+    conn.execute("UPDATE jobs SET updated = ?", (time.time() - 120,))
+    assert q.purge() == 1
+    assert q.get(job_id, "owner") is None
+    assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+def test_job_runs_outside_a_request(app_module, resume):
+    body = app_module._run_job("j", "owner", "k", "docx", dict(data=resume.state()))
+    assert body[:2] == b"PK"
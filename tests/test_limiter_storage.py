@@ -0,0 +1,31 @@
+import sqlite3
+import time
+
+from limiter_storage import SQLiteStorage
+
+
+def _events(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+
+def test_purge_drops_expired_events_of_keys_never_hit_again(tmp_path):
+    path = str(tmp_path / "limits.db")
+    storage = SQLiteStorage("sqlite://" + path)
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):  # one-off clients
+        assert storage.acquire_entry(f"LIMITER/{ip}/login", 5, 1)
+    assert storage.acquire_entry("LIMITER/10.0.0.9/login", 5, 3600)
+    assert storage.purge(time.time() + 2) == 3
+    assert _events(path) == 1
+    assert storage.get_moving_window("LIMITER/10.0.0.9/login", 5, 3600)[1] == 1
+
+
+def test_events_table_without_expiry_is_migrated(tmp_path):
+    path = str(tmp_path / "limits.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE events (key TEXT NOT NULL, atime REAL NOT NULL)")
+        conn.execute("INSERT INTO events VALUES ('old', 0)")
+    storage = SQLiteStorage("sqlite://" + path)
+    assert storage.acquire_entry("new", 1, 60)
+    storage.purge()
+    assert _events(path) == 1
@@ -0,0 +1,61 @@
+import json
+import os
+
+from metrics import ARCHIVE, Metrics, mark_process_dead
+
+
+def _snapshot(directory, pid, renders, live):
+    with open(os.path.join(directory, f"{pid}.json"), "w") as f:
+        json.dump(dict(
+            counters={"resumeunicorn_renders_total": {'[["format", "pdf"]]': renders}},
+            histograms={},
+            gauges={"resumeunicorn_render_cache_items": {"[]": live}},
+        ), f)
+
+
+def test_dead_worker_counters_survive_pid_reuse(tmp_path):
+    directory = str(tmp_path)
+    metrics = Metrics(directory)
+    _snapshot(directory, 4242, renders=7, live=3)
+    mark_process_dead(4242, directory)
+    assert os.path.exists(os.path.join(directory, ARCHIVE))
+    assert not os.path.exists(os.path.join(directory, "4242.json"))
+    _snapshot(directory, 4242, renders=1, live=5)  # a new worker got the same pid
+    data = metrics.collect()
+    assert data["counters"]["resumeunicorn_renders_total"]['[["format", "pdf"]]'] == 8
+    assert data["gauges"]["resumeunicorn_render_cache_items"]["[]"] == 5
+    text = metrics.render_prometheus()
+    assert 'resumeunicorn_renders_total{format="pdf"} 8' in text
+
+
+def test_concurrent_first_increments_are_all_counted(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    import metrics as metrics_module
+
+    real_getpid = os.getpid
+
+    def slow_getpid():  # widens the window between the pid check and the start
+        time.sleep(0.001)
+        return real_getpid()
+
+    metrics = Metrics(str(tmp_path), flush_interval=3600)
+    monkeypatch.setattr(metrics_module.os, "getpid", slow_getpid)
+    start = threading.Barrier(16)
+
+    def first_request():
+        start.wait()
+        for _ in range(100):
+            metrics.inc("resumeunicorn_renders_total", format="pdf")
+
+    before = {t.ident for t in threading.enumerate()}
+    threads = [threading.Thread(target=first_request) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    monkeypatch.undo()
+    flushers = [t for t in threading.enumerate() if t.name == "metrics-flusher" and t.ident not in before]
+    assert len(flushers) == 1
+    assert metrics.snapshot()["counters"]["resumeunicorn_renders_total"]['[["format", "pdf"]]'] == 1600
@@ -0,0 +1,98 @@
+import pytest
+
+
+def test_export_html_is_the_template(app_module, resume):
+    with app_module.app.test_request_context():
+        html = app_module.render_resume_html(resume)
+    assert 'class="theme-rose"' in html
+    assert 'data-section="header"' in html
+    assert "Jane Doe" in html and "Python" in html
+    # exports get their stylesheets from the theme registry, and no buttons
+    assert "<link" not in html and 'class="actions"' not in html
+
+
+def test_resume_page_links_the_downloads(client):
+    resp = client.get("/resume")
+    html = resp.get_data(as_text=True)
+    assert resp.status_code == 200
+    assert 'data-section="header"' in html
+    assert 'href="/resume.pdf"' in html and 'href="/resume.docx"' in html
+    assert 'href="/static/resume.css"' in html
+
+
+def test_resume_text_is_escaped(app_module, resume):
+    with app_module.app.test_request_context():
+        html = app_module.render_resume_html(resume.replace(summary="<b>bold</b>"))
+    assert "&lt;b&gt;bold&lt;/b&gt;" in html
+
+
+def test_entry_sections_render(app_module, resume):
+    from resume_model import Education, Experience, Project
+    data = resume.replace(
+        experience=(Experience(title="Engineer", company="Acme", start="2020", end="2024",
+                               bullets=("Shipped the API",)),),
+        projects=(Project(name="resumeunicorn", description="Resume builder"),),
+        education=(Education(school="State University", degree="BSc", grad="2019"),),
+    )
+    with app_module.app.test_request_context():
+        html = app_module.render_resume_html(data)
+        hidden = app_module.render_resume_html(data.replace(include_projects=False))
+    assert "Experience" in html and "Engineer — Acme" in html and "<li>Shipped the API</li>" in html
+    assert "Projects" in html and "resumeunicorn" in html and "Resume builder" in html
+    assert "Education" in html and "State University" in html and "BSc" in html
+    assert "resumeunicorn" not in hidden and "State University" in hidden
+
+
+PDF_BYTES = b"%PDF-1.7 " + b"x" * 100
+
+
+@pytest.fixture
+def exports(app_module, monkeypatch):
+    """Stub the renderer; the list records the outputs of every render."""
+    calls = []
+
+    def fake_export(data, outputs, profile):
+        calls.append(list(outputs))
+        return {out: PDF_BYTES for out in outputs}
+
+    monkeypatch.setattr(app_module, "_export", fake_export)
+    return calls
+
+
+def _pdf_etag(app_module, data):
+    c = app_module.app.test_client()
+    with c.session_transaction() as s:
+        s["resume_data"] = data.state()
+    resp = c.get("/resume.pdf")
+    assert resp.status_code == 200
+    return resp.headers["ETag"]
+
+
+def test_pdf_etag_follows_the_resume(app_module, resume, exports):
+    etag = _pdf_etag(app_module, resume)
+    assert _pdf_etag(app_module, resume) == etag
+    assert _pdf_etag(app_module, resume.replace(name="John Doe")) != etag
+    assert _pdf_etag(app_module, resume.replace(theme="slate")) != etag
+
+
+def test_pdf_if_none_match_skips_the_render(client, exports):
+    etag = client.get("/resume.pdf").headers["ETag"]
+    del exports[:]
+    resp = client.get("/resume.pdf", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b"" and resp.headers["ETag"] == etag
+    assert exports == []
+
+
+def test_pdf_range_request(client, exports):
+    resp = client.get("/resume.pdf", headers={"Range": "bytes=0-9"})
+    assert resp.status_code == 206
+    assert resp.headers["Content-Range"] == f"bytes 0-9/{len(PDF_BYTES)}"
+    assert resp.data == PDF_BYTES[:10]
+
+
+def test_pdf_cache_headers(client, exports):
+    for headers in ({}, {"If-None-Match": client.get("/resume.pdf").headers["ETag"]}):
+        resp = client.get("/resume.pdf", headers=headers)
+        assert resp.headers["Cache-Control"] == "private, no-cache"
+        assert "Cookie" in resp.vary
@@ -0,0 +1,69 @@
+import threading
+import time
+
+from render_cache import RenderCache, files_version, render_key
+
+
+def test_render_key_is_stable_and_covers_its_inputs(tmp_path):
+    a = dict(name="Jane", skills=["Python"], options=dict(x=1, y=2))
+    b = dict(options=dict(y=2, x=1), skills=("Python",), name="Jane")
+    assert render_key(a, "rose", "pdf", "v1") == render_key(b, "rose", "pdf", "v1")
+    base = render_key(a, "rose", "pdf", "v1")
+    assert render_key(a, "sapphire", "pdf", "v1") != base
+    assert render_key(a, "rose", "docx", "v1") != base
+    assert render_key(a, "rose", "pdf", "v2") != base
+
+    css = tmp_path / "resume.css"
+    css.write_text("body{}")
+    before = files_version([str(css)])
+    css.write_text("body{color:red}")
+    assert files_version([str(css)]) != before
+
+
+def test_lru_evicts_by_bytes_and_skips_oversized_items():
+    cache = RenderCache(max_bytes=100, max_item_bytes=60)
+    cache.put("a", b"a" * 40)
+    cache.put("b", b"b" * 40)
+    assert cache.get("a") is not None  # "a" is now the most recently used
+    cache.put("c", b"c" * 40)  # 120 bytes: the least recently used ("b") goes
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    cache.put("big", b"x" * 61)
+    assert cache.get("big") is None
+    snap = cache.snapshot()
+    assert snap["bytes"] == 80 and snap["items"] == 2 and snap["evictions"] == 1
+
+
+def test_disk_tier_survives_a_cleared_memory_tier(tmp_path):
+    cache = RenderCache(max_bytes=1000, disk_dir=str(tmp_path))
+    cache.put("k" * 64, b"pdf bytes")
+    fresh = RenderCache(max_bytes=1000, disk_dir=str(tmp_path))  # another worker, empty memory
+    assert fresh.get("k" * 64) == b"pdf bytes"
+    assert fresh.stats["disk_hits"] == 1
+    assert fresh.get("k" * 64) == b"pdf bytes"
+    assert fresh.stats["hits"] == 1  # promoted to memory
+
+
+def test_get_or_render_renders_once_for_concurrent_callers():
+    cache = RenderCache(max_bytes=1000)
+    calls = []
+    gate = threading.Barrier(8)
+
+    def render():
+        calls.append(1)
+        time.sleep(0.2)
+        return b"rendered"
+
+    results = []
+
+    def caller():
+        gate.wait()
+        results.append(cache.get_or_render("key", render))
+
+    threads = [threading.Thread(target=caller) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [b"rendered"] * 8
+    assert len(calls) == 1
@@ -0,0 +1,64 @@
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import pytest
+
+from render_pool import RenderPool
+
+
+def _sleep(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+@pytest.fixture
+def pool():
+    pools = []
+
+    def make(**kw):
+        p = RenderPool(start_method="fork", queue_depth=4, **kw)
+        pools.append(p)
+        return p
+
+    yield make
+    for p in pools:
+        p.shutdown()
+
+
+def _in_threads(*calls, gap=0.05):
+    results = [None] * len(calls)
+
+    def run(i, fn):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i, fn)) for i, fn in enumerate(calls)]
+    for t in threads:
+        t.start()
+        time.sleep(gap)
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_queue_wait_does_not_count_against_the_timeout(pool):
+    p = pool(size=1, timeout=1.0)
+    p.start()
+    results = _in_threads(*[lambda i=i: p.run(_sleep, 0.4, i) for i in range(4)])
+    assert results == [0, 1, 2, 3]  # 1.6s in total, but each ran for 0.4s
+    assert p.stats["killed"] == 0
+
+
+def test_timeout_kills_one_worker_and_spares_the_others(pool):
+    p = pool(size=2, timeout=1.0)
+    p.start()
+    hung = lambda: p.run(_sleep, 30, "hung")
+    other = lambda: p.run(_sleep, 0.8, "ok")  # still running when the hung one is killed
+    results = _in_threads(hung, other, gap=0.5)
+    assert isinstance(results[0], FutureTimeout)
+    assert results[1] == "ok"
+    assert p.stats["killed"] == 1
+    assert p.stats["completed"] == 1 and p.stats["failed"] == 1
@@ -0,0 +1,31 @@
+from session_store import SessionStore
+
+SID = "ab" * 16
+
+
+def test_save_by_another_worker_within_the_same_second_is_seen(tmp_path):
+    a = SessionStore(str(tmp_path), sweep_interval=0)
+    b = SessionStore(str(tmp_path), sweep_interval=0)  # a second worker, own cache
+    a.save(SID, {"draft": "one"})
+    assert b.load(SID) == {"draft": "one"}
+    a.save(SID, {"draft": "two"})  # same size, same whole-second expiry
+    assert b.load(SID) == {"draft": "two"}
+
+
+def test_load_returns_a_copy(tmp_path):
+    store = SessionStore(str(tmp_path), sweep_interval=0)
+    store.save(SID, {"resume_data": [1, ["Python"]]})
+    first = store.load(SID)
+    first["resume_data"][1].append("Flask")
+    assert store.load(SID) == {"resume_data": [1, ["Python"]]}
+    assert store.snapshot()["cache_hits"] >= 1
+
+
+def test_sweep_reports_live_sessions_and_bytes(tmp_path):
+    store = SessionStore(str(tmp_path), sweep_interval=0)
+    store.save(SID, {"x": 1})
+    store.sweep()
+    snap = store.snapshot()
+    assert snap["live_sessions"] == 1
+    assert snap["bytes_on_disk"] > 0
+    assert snap["last_sweep_at"] > 0
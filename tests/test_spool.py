@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from spool import Spool
+
+PDF_BYTES = b"%PDF-1.7 spooled"
+
+
+@pytest.fixture
+def spool(app_module, tmp_path, monkeypatch):
+    """The spool app.py builds when SPOOL_DIR is set, without the sweeper thread."""
+    s = Spool(str(tmp_path / "spool"), secret=app_module.app.config["SECRET_KEY"], sweep_interval=0)
+    monkeypatch.setattr(app_module, "spool", s)
+    monkeypatch.setattr(app_module, "_export",
+                        lambda data, outputs, profile: {out: PDF_BYTES for out in outputs})
+    return s
+
+
+def _spooled_file(spool, resp):
+    uri = resp.headers["X-Accel-Redirect"]
+    assert uri.startswith("/_spool/")
+    return os.path.join(spool.root, uri[len("/_spool/"):])
+
+
+def test_download_is_handed_to_nginx(client, spool):
+    resp = client.get("/resume.pdf")
+    assert resp.status_code == 200
+    assert resp.data == b""
+    assert resp.headers["Content-Type"] == "application/pdf"
+    assert resp.headers["ETag"]
+    path = _spooled_file(spool, resp)
+    assert path.endswith(".pdf")
+    with open(path, "rb") as f:
+        assert f.read() == PDF_BYTES
+
+
+def test_sessions_get_separate_paths(app_module, resume, client, spool):
+    other = app_module.app.test_client()
+    with other.session_transaction() as s:
+        s["resume_data"] = resume.state()  # same artifact, different visitor
+    first = client.get("/resume.pdf").headers["X-Accel-Redirect"]
+    assert client.get("/resume.pdf").headers["X-Accel-Redirect"] == first
+    second = other.get("/resume.pdf").headers["X-Accel-Redirect"]
+    assert second != first
+    assert os.path.dirname(second) != os.path.dirname(first)
+
+
+def test_sweep_removes_expired_files(client, spool):
+    path = _spooled_file(spool, client.get("/resume.pdf"))
+    spool.sweep()
+    assert os.path.exists(path)
+    assert spool.metrics["files"] == 1
+    os.utime(path, (0, 0))  # mtime is the expiry time
+    spool.sweep()
+    assert not os.path.exists(path)
+    assert not os.path.exists(os.path.dirname(path))  # the emptied user directory too
+    assert spool.metrics["swept"] == 1 and spool.metrics["files"] == 0
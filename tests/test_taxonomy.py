@@ -0,0 +1,20 @@
+from resume_model import Resume
+from taxonomy import get_taxonomy
+
+
+def test_list_keeps_the_users_spelling_and_drops_synonyms():
+    resume = Resume.from_form(dict(skills="AWS, js, Amazon Web Services, JavaScript, Python, python3"))
+    assert resume.skills == ("AWS", "js", "Python")
+
+
+def test_legacy_lists_survive_the_round_trip():
+    legacy = dict(name="Jane", skills_list=["PLSQL", "C++", "AWS"], languages_list=["English"])
+    resume = Resume.from_dict(legacy)
+    assert resume.skills == ("PLSQL", "C++", "AWS")
+    assert Resume.from_dict(dict(skills_list=list(resume.skills))).skills == resume.skills
+
+
+def test_match_reports_canonical_names():
+    result = get_taxonomy().match(["js", "AWS"], "We use JavaScript on Amazon Web Services and Go.")
+    assert "JavaScript" in result["matched"]
+    assert "Amazon Web Services" in result["matched"]
@@ -0,0 +1,40 @@
+"""textnorm must return exactly what the cleaners it replaced returned."""
+from hypothesis import given, strategies as st
+
+import textnorm
+from tools.bench_textnorm import old_app_clean_text, old_csv_to_list, old_utils_clean_text
+
+# Characters and fragments each cleaner treats specially: controls, Unicode
+# whitespace, bidi and zero-width marks, NFKC-folding forms, HTML, commas.
+SPECIAL = (
+    [chr(c) for c in range(0, 33)] + ["\x7f", "\x85", "\xa0", "\u1680", "\u2000", "\u2007",
+    "\u2028", "\u2029", "\u202f", "\u205f", "\u3000", "\u200b", "\u200d", "\u200f", "\u202a",
+    "\u202e", "\u2066", "\u2069", "\ufeff", "\uff1c", "\uff06", "\ufb01", "\xbd", "\u2460",
+    "\xe9", "\xdf", "\u0130", "\ufb03", "<", ">", "&", "&amp;", "&lt;", "&#60;", "<b>", "</i>",
+    "<!--", "-->", ",", ",,", " , ", "+", "#", ".", "-", "`", "\\", "'", '"', "C++", "c#", "JS",
+    "Python", "python", "Jane Doe", "node.js", "  "]
+)
+
+texts = st.lists(st.one_of(st.sampled_from(SPECIAL), st.characters()), max_size=40).map("".join)
+lengths = st.sampled_from([0, 1, 5, 10, 40, 80, 500]) | st.integers(0, 1300)
+
+
+@given(texts, lengths)
+def test_clean_field_matches_app_clean_text(s, n):
+    assert textnorm.clean_field(s, n) == old_app_clean_text(s, n)
+
+
+@given(texts, lengths)
+def test_clean_safe_matches_utils_clean_text(s, n):
+    assert textnorm.clean_safe(s, n) == old_utils_clean_text(s, n)
+
+
+@given(texts, st.integers(1, 30))
+def test_split_items_matches_csv_to_list(s, limit):
+    assert textnorm.split_items(s, limit) == old_csv_to_list(s, limit)
+
+
+@given(texts)
+def test_clean_safe_defaults(s):
+    assert textnorm.clean_safe(s) == old_utils_clean_text(s)
+    assert textnorm.split_items(s) == old_csv_to_list(s)
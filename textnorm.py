@@ -0,0 +1,77 @@
+# textnorm.py
+"""Compiled text normalization shared by the form handler and utils.
+
+Replaces the chains of regex passes in ``app.clean_text``,
+``utils.clean_text`` and ``app.csv_to_list`` with one ``str.translate``
+plus one regex substitution per string, producing byte-for-byte the same
+output (tests/test_textnorm.py compares them).
+
+How the passes fold together:
+
+* Deleting control/bidi/zero-width characters and mapping every other
+  whitespace character to " " are both per-character, so they share one
+  translate table.
+* Collapsing whitespace runs and deleting disallowed characters become one
+  pure deletion, `` (?= )|[disallowed]`` -> "": every space that is
+  followed by another space goes, so each run keeps exactly one. The
+  lookahead sees the string before deletion, so a deleted character still
+  separates the runs on either side of it, just as it does when the two
+  passes run one after the other.
+* ``bleach.clean`` only changes text containing ``<``, ``>`` or ``&``. The
+  allow-list already removes ``<`` and ``>``, so bleach only runs on the
+  rare strings that still contain ``&``.
+"""
+import re
+import unicodedata
+
+# All Unicode whitespace lives below U+3001 (str.isspace == re's \s).
+_WHITESPACE = [c for c in range(0x3001) if chr(c).isspace()]
+
+# -- app.clean_text profile: collapse whitespace, drop C0 controls + DEL -------
+_FIELD_TABLE = {c: " " for c in _WHITESPACE}
+_FIELD_RE = re.compile(r" (?= )|[\x00-\x08\x0e-\x1b\x7f]")
+
+# -- utils.clean_text profile: NFKC, drop controls/bidi, allow-list, bleach ----
+SAFE_PUNCT = r""".,:;!?'"()[]{}@#$%^&*-_+=/\\|~"""
+_DROP = [*range(0, 32), 127, *range(0x200B, 0x2010), *range(0x202A, 0x202F), *range(0x2066, 0x206A)]
+_SAFE_TABLE = {c: " " for c in _WHITESPACE}
+_SAFE_TABLE.update({c: None for c in _DROP})
+_SAFE_RE = re.compile(fr" (?= )|[^0-9A-Za-z {re.escape(SAFE_PUNCT)}]")
+
+# -- csv_to_list: the item allow-list, with the comma kept as separator --------
+_ITEM_RE = re.compile(r"[^A-Za-z0-9 +#.\-,]")
+
+
+def clean_field(s: str, n: int) -> str:
+    """Same result as the original app.clean_text(s, n)."""
+    s = (s or "").translate(_FIELD_TABLE).strip(" ")
+    return _FIELD_RE.sub("", s)[:n]
+
+
+def clean_safe(s: str, max_len: int = 500) -> str:
+    """Same result as the original utils.clean_text(s, max_len)."""
+    if not s:
+        return ""
+    if not s.isascii():  # ASCII is already NFKC
+        s = unicodedata.normalize("NFKC", s)
+    s = s.translate(_SAFE_TABLE).strip(" ")
+    s = _SAFE_RE.sub("", s)[:max_len]
+    if "&" in s:
+        import bleach
+        s = bleach.clean(s, tags=[], attributes={}, strip=True)
+    return s
+
+
+def split_items(raw: str, limit: int = 24) -> list:
+    """Same result as the original app.csv_to_list(raw, limit)."""
+    seen = set()
+    out = []
+    for s in _ITEM_RE.sub("", raw or "").split(","):
+        t = s.strip()
+        if t:
+            k = t.lower()
+            if k not in seen:
+                seen.add(k)
+                out.append(t)
+    return out[:limit]
+
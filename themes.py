@@ -0,0 +1,95 @@
+# themes.py
+"""Parsed resume stylesheets, one set per theme, sharing a FontConfiguration.
+
+WeasyPrint re-parses every stylesheet and rediscovers fonts each time it is
+handed a fresh ``CSS``/``FontConfiguration``. The registry parses
+``static/resume.css`` plus a small accent sheet once per theme, keeps one
+FontConfiguration for all of them, and only re-parses when the CSS file's
+mtime changes. Each render worker process owns one registry.
+"""
+import os
+import threading
+
+from forms import THEME_CHOICES
+from pdf_profiles import PROFILES
+
+DEFAULT_THEME = "emerald"
+
+# Accent color per ResumeRequestForm.theme choice
+THEME_ACCENTS = {
+    "emerald": "#047857",
+    "sapphire": "#1d4ed8",
+    "slate": "#334155",
+    "rose": "#be123c",
+}
+
+THEMES = tuple(v for v, _ in THEME_CHOICES)
+
+
+def accent_css(theme: str) -> str:
+    color = THEME_ACCENTS.get(theme, THEME_ACCENTS[DEFAULT_THEME])
+    return (
+        f"h1, h2, .name, .h {{ color: {color}; }}\n"
+        f".rule {{ border-top-color: {color}; }}\n"
+        f"a {{ color: {color}; }}\n"
+    )
+
+
+class ThemeRegistry:
+    def __init__(self, css_path: str):
+        self.css_path = css_path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._sheets = {}
+        self._profile_sheets = {}
+        self.font_config = None
+        self.loads = 0
+
+    def _css_mtime(self):
+        try:
+            return os.stat(self.css_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self, mtime):
+        from weasy_compat import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        if self.font_config is None:
+            self.font_config = FontConfiguration()
+        fc = self.font_config
+        base = CSS(filename=self.css_path, font_config=fc) if mtime is not None else None
+        sheets = {}
+        for theme in THEMES:
+            accent = CSS(string=accent_css(theme), font_config=fc)
+            sheets[theme] = [base, accent] if base is not None else [accent]
+        self._sheets = sheets
+        self._profile_sheets = {name: [CSS(string=p.css, font_config=fc)] if p.css else []
+                                for name, p in PROFILES.items()}
+        self._mtime = mtime
+        self.loads += 1
+
+    def stylesheets(self, theme: str):
+        """Parsed stylesheets for theme; re-parses only if the CSS file changed."""
+        mtime = self._css_mtime()
+        if mtime != self._mtime or not self._sheets:
+            with self._lock:
+                if mtime != self._mtime or not self._sheets:
+                    self._load(mtime)
+        return self._sheets.get(theme) or self._sheets[DEFAULT_THEME]
+
+    def profile_sheets(self, profile: str):
+        """Extra parsed stylesheets for a PDF profile (applied after the theme's)."""
+        self.stylesheets(DEFAULT_THEME)  # loads on first use
+        return self._profile_sheets.get(profile, [])
+
+
+_registries = {}
+
+
+def get_registry(css_path: str) -> ThemeRegistry:
+    """Process-wide registry for css_path (created on first use)."""
+    reg = _registries.get(css_path)
+    if reg is None:
+        reg = _registries.setdefault(css_path, ThemeRegistry(css_path))
+    return reg
@@ -0,0 +1,164 @@
+"""Summarize the JSONL event log: latency percentiles, error rates, format mix.
+
+    python -m tools.analyze_events [DIR_OR_FILE ...] [--since-hours 24] [--endpoint resume_pdf] [--histogram]
+
+Reads every ``events-*.jsonl`` and rotated ``*.jsonl.gz`` file (see
+events.py) under the given directories, default ``$EVENT_LOG_DIR``, one
+line at a time. Latencies go into fixed log-scale buckets (5% wide), so
+memory stays constant however much log there is and the percentiles are
+accurate to within a bucket. Per endpoint it prints request count,
+p50/p95/p99/max in ms, 4xx and 5xx rates, render errors and how many
+requests had to render (render cache misses); then the format and profile
+mix of successful downloads and the number of events the server dropped.
+"""
+import argparse
+import gzip
+import json
+import math
+import os
+import sys
+import time
+
+RATIO = 1.05
+FLOOR_MS = 0.1
+
+
+def _bucket(ms: float) -> int:
+    return 0 if ms <= FLOOR_MS else 1 + int(math.log(ms / FLOOR_MS, RATIO))
+
+
+def _upper(i: int) -> float:
+    return FLOOR_MS * RATIO ** i
+
+
+class Latency:
+    """Log-bucketed latency histogram."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, ms: float):
+        i = _bucket(ms)
+        self.buckets[i] = self.buckets.get(i, 0) + 1
+        self.count += 1
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return float("nan")
+        rank = q * self.count
+        seen = 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen >= rank:
+                return min(_upper(i), self.max)
+        return self.max
+
+    def histogram(self, width: int = 40):
+        """(label, count, bar) rows, one per power-of-two ms range."""
+        rows = {}
+        for i, n in self.buckets.items():
+            edge = 2 ** max(0, math.ceil(math.log2(max(_upper(i), 1.0))))
+            rows[edge] = rows.get(edge, 0) + n
+        top = max(rows.values(), default=1)
+        return [(f"<= {edge} ms", n, "#" * max(1, round(n / top * width))) for edge, n in sorted(rows.items())]
+
+
+class Endpoint:
+    def __init__(self):
+        self.latency = Latency()
+        self.client_errors = self.server_errors = self.errors = self.rendered = 0
+
+
+def log_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(n for n in os.listdir(path)
+                           if n.startswith("events-") and n.endswith((".jsonl", ".jsonl.gz")))
+            yield from (os.path.join(path, n) for n in names)
+        else:
+            yield path
+
+
+def read_events(paths):
+    """Yield event dicts from every file, streaming; bad lines are skipped."""
+    for path in log_files(paths):
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except (OSError, EOFError):  # rotated away, or a gzip cut short at exit
+            continue
+
+
+def analyze(events, since: float = None, endpoint: str = None) -> dict:
+    by_endpoint, formats, profiles = {}, {}, {}
+    dropped = total = 0
+    for ev in events:
+        if since is not None and ev.get("ts", 0) < since:
+            continue
+        if ev.get("event") == "dropped":
+            dropped += ev.get("count", 0)
+            continue
+        if ev.get("event") != "request" or (endpoint and ev.get("endpoint") != endpoint):
+            continue
+        total += 1
+        stats = by_endpoint.setdefault(ev.get("endpoint") or "-", Endpoint())
+        if isinstance(ev.get("ms"), (int, float)):
+            stats.latency.add(ev["ms"])
+        status = ev.get("status") or 0
+        stats.client_errors += 400 <= status < 500
+        stats.server_errors += status >= 500
+        stats.errors += bool(ev.get("error"))
+        stats.rendered += bool(ev.get("rendered"))
+        if ev.get("format") and status in (200, 206, 304):
+            formats[ev["format"]] = formats.get(ev["format"], 0) + 1
+            if ev.get("profile"):
+                profiles[ev["profile"]] = profiles.get(ev["profile"], 0) + 1
+    return dict(total=total, dropped=dropped, endpoints=by_endpoint, formats=formats, profiles=profiles)
+
+
+def _mix(counts: dict) -> str:
+    n = sum(counts.values())
+    return ", ".join(f"{k} {v} ({v / n:.0%})" for k, v in sorted(counts.items(), key=lambda kv: -kv[1])) or "-"
+
+
+def report(result: dict, histogram: bool = False):
+    print(f"{'endpoint':<16} {'requests':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} "
+          f"{'4xx':>6} {'5xx':>6} {'errors':>6} {'rendered':>8}")
+    for name, st in sorted(result["endpoints"].items(), key=lambda kv: -kv[1].latency.count):
+        n, lat = max(1, st.latency.count), st.latency
+        print(f"{name:<16} {lat.count:>8} {lat.quantile(.5):9.1f} {lat.quantile(.95):9.1f} "
+              f"{lat.quantile(.99):9.1f} {lat.max:9.1f} {st.client_errors / n:6.1%} {st.server_errors / n:6.1%} "
+              f"{st.errors:>6} {st.rendered / n:8.1%}")
+        if histogram:
+            for label, count, bar in lat.histogram():
+                print(f"    {label:>12} {count:>8} {bar}")
+    print(f"\nformats:  {_mix(result['formats'])}")
+    print(f"profiles: {_mix(result['profiles'])}")
+    print(f"requests: {result['total']}, dropped events: {result['dropped']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("paths", nargs="*", help="log directories or files (default: $EVENT_LOG_DIR)")
+    ap.add_argument("--since-hours", type=float, help="only events from the last N hours")
+    ap.add_argument("--endpoint", help="only this endpoint")
+    ap.add_argument("--histogram", action="store_true", help="latency histogram per endpoint")
+    args = ap.parse_args(argv)
+    paths = args.paths or ([os.environ["EVENT_LOG_DIR"]] if os.environ.get("EVENT_LOG_DIR") else [])
+    if not paths:
+        ap.error("no log directory given and EVENT_LOG_DIR is not set")
+    since = time.time() - args.since_hours * 3600 if args.since_hours else None
+    report(analyze(read_events(paths), since, args.endpoint), args.histogram)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Render many resumes offline from JSONL (career fairs, bootcamp cohorts).
+
+    python -m tools.batch_render cohort.jsonl -o out/ [-j 4] [--formats pdf,docx,jpg]
+
+Each input line is one resume: raw form fields (``skills`` as a
+comma-separated string) or the older normalized dict (``skills_list``
+etc.), optionally with ``experience``, ``projects`` and ``education``
+lists and ``options``. An optional ``id`` names the
+output files and the checkpoint entry; otherwise the line number is used.
+
+Records go through the same ``Resume`` model normalization,
+``render_resume_html`` template and WeasyPrint/DOCX paths as the web app,
+spread over ``-j`` processes. Finished ids are appended to
+``<out>/.checkpoint``, so re-running after a crash skips them
+(``--restart`` ignores the checkpoint).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import defaultdict
+
+STAGES = ("normalize", "html", "layout", "pdf", "raster", "docx", "write")
+
+_app = None
+
+
+def _init_worker():
+    # Render inline in this process; no pool, no render cache, no session sweeper.
+    os.environ["RENDER_POOL_SIZE"] = "0"
+    os.environ["RENDER_CACHE_BYTES"] = "0"
+    os.environ["SESSION_BACKEND"] = "cookie"
+    global _app
+    import app as _app_module
+    _app = _app_module
+
+
+def to_data(record: dict):
+    """Normalize a JSONL record into the Resume the index POST handler would build."""
+    from resume_model import Resume
+
+    data = Resume.from_dict(record)
+    # same required checks as the form
+    if not data.name or not data.role or ("@" not in data.email):
+        raise ValueError("record needs name, role and a valid email")
+    return data
+
+
+def render_one(task):
+    """Render one record; returns (rid, {stage: seconds}, error or None)."""
+    rid, record, out_dir, formats = task
+    from export import Output, layout, raster_job, write_pdf
+    from pdf_profiles import profile_for
+    from generators.docx_builder import render_docx
+
+    timings = {}
+    clock = time.perf_counter
+
+    def timed(stage, fn, *args):
+        t0 = clock()
+        try:
+            return fn(*args)
+        finally:
+            timings[stage] = timings.get(stage, 0.0) + clock() - t0
+
+    try:
+        data = timed("normalize", to_data, record)
+        outputs = {}
+        if "pdf" in formats or "jpg" in formats:
+            with _app.app.test_request_context():
+                html = timed("html", _app.render_resume_html, data)
+            profile = profile_for(data.theme)
+            document = timed("layout", layout, html, _app.app.root_path,
+                             _app.render_pool.css_path, data.theme, None, profile)
+            pdf_bytes = timed("pdf", write_pdf, document, profile)
+            if "pdf" in formats:
+                outputs["pdf"] = pdf_bytes
+            if "jpg" in formats:
+                jpg = Output("jpeg")
+                outputs["jpg"] = timed("raster", raster_job, pdf_bytes, [jpg])[jpg]
+        if "docx" in formats:
+            outputs["docx"] = timed("docx", render_docx, data)
+
+        stem = os.path.splitext(_app.safe_filename(f"{rid}-{data.name or 'resume'}", "pdf"))[0]
+
+        def write():
+            for ext, blob in outputs.items():
+                tmp = os.path.join(out_dir, f".{stem}.{ext}.tmp")
+                with open(tmp, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp, os.path.join(out_dir, f"{stem}.{ext}"))
+
+        timed("write", write)
+        return rid, timings, None
+    except Exception as e:
+        return rid, timings, f"{type(e).__name__}: {e}"
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            yield str(record.get("id") or lineno), record
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("input", help="JSONL file, one resume per line")
+    ap.add_argument("-o", "--out", required=True, help="output directory")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    ap.add_argument("--formats", default="pdf,docx,jpg", help="comma-separated subset of pdf,docx,jpg")
+    ap.add_argument("--restart", action="store_true", help="ignore the checkpoint and render everything")
+    args = ap.parse_args(argv)
+
+    formats = {f.strip() for f in args.formats.split(",") if f.strip()}
+    unknown = formats - {"pdf", "docx", "jpg"}
+    if unknown:
+        ap.error(f"unknown formats: {', '.join(sorted(unknown))}")
+    os.makedirs(args.out, exist_ok=True)
+    checkpoint = os.path.join(args.out, ".checkpoint")
+    done = set()
+    if not args.restart and os.path.exists(checkpoint):
+        with open(checkpoint, encoding="utf-8") as f:
+            done = {line.strip() for line in f if line.strip()}
+
+    tasks = [(rid, rec, args.out, formats) for rid, rec in read_records(args.input) if rid not in done]
+    print(f"{len(tasks)} to render, {len(done)} already done per checkpoint", file=sys.stderr)
+
+    totals = defaultdict(float)
+    ok = failed = 0
+    t0 = time.perf_counter()
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(max(1, args.jobs), initializer=_init_worker) as pool, \
+            open(checkpoint, "w" if args.restart else "a", encoding="utf-8") as ckpt:
+        for rid, timings, error in pool.imap_unordered(render_one, tasks, chunksize=4):
+            for stage, seconds in timings.items():
+                totals[stage] += seconds
+            if error:
+                failed += 1
+                print(f"[{rid}] FAILED {error}", file=sys.stderr)
+                continue
+            ok += 1
+            ckpt.write(rid + "\n")
+            ckpt.flush()
+    wall = time.perf_counter() - t0
+
+    print(f"rendered {ok}, failed {failed} in {wall:.2f}s "
+          f"({ok / wall if wall else 0:.2f} resumes/sec, {args.jobs} procs)")
+    if ok or failed:
+        n = ok + failed
+        print(f"{'stage':<10} {'total s':>9} {'mean ms':>9}")
+        for stage in STAGES:
+            if stage in totals:
+                print(f"{stage:<10} {totals[stage]:9.2f} {totals[stage] / n * 1000:9.2f}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
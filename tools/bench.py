@@ -0,0 +1,247 @@
+"""Benchmark suite for the hot paths in app.py.
+
+    python -m tools.bench [-k pdf] [-o run.json] [--baseline base.json --threshold 0.10]
+    python -m tools.bench --profile resume_pdf/typical/sapphire [--profile-out pdf.prof]
+
+Cases (fixtures from ``tools.fixtures``: small, typical and maximal resumes):
+
+* ``index_post``, ``render_html``, ``resume_pdf``, ``resume_jpg`` and
+  ``resume_docx`` for every fixture x theme, driven through the Flask test
+  client (CSRF and rate limits off, render cache off, pool size 0 so the
+  render runs in the measured process);
+* ``csv_to_list``, ``clean_text_app`` (``app.clean_text``) and
+  ``clean_text_utils`` (``utils.clean_text``) for every fixture.
+
+Each case runs in a fresh process so its peak RSS is its own. Per case the
+JSON report holds wall and CPU milliseconds per call (median over samples)
+and peak RSS in KiB. With ``--baseline`` the run is compared to a saved
+report and exits 1 if any case is slower or larger by more than
+``--threshold``. ``--profile CASE`` runs one case under cProfile and writes
+a ``.prof`` file (open it with ``snakeviz`` or ``flameprof`` for a flame
+graph).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+from tools.fixtures import FIXTURES, THEMES
+
+# kind -> (samples, calls per sample)
+RENDER_KINDS = {
+    "index_post": (15, 10),
+    "render_html": (15, 20),
+    "resume_pdf": (7, 1),
+    "resume_jpg": (7, 1),
+    "resume_docx": (15, 5),
+}
+TEXT_KINDS = {
+    "csv_to_list": (15, 2000),
+    "clean_text_app": (15, 2000),
+    "clean_text_utils": (15, 2000),
+}
+METRICS = ("wall_ms", "cpu_ms", "peak_rss_kb")
+
+
+def all_cases():
+    cases = [f"{kind}/{fx}/{theme}" for kind in RENDER_KINDS for fx in FIXTURES for theme in THEMES]
+    cases += [f"{kind}/{fx}" for kind in TEXT_KINDS for fx in FIXTURES]
+    return cases
+
+
+def _load_app(sessions):
+    # Measure the render itself: inline rendering, no cache, no rate limits,
+    # sessions in a throwaway directory.
+    os.environ.update(
+        RENDER_POOL_SIZE="0", RENDER_CACHE_BYTES="0", LIMITER_STORAGE_URI="memory://",
+        SESSION_STORE_DIR=sessions, SESSION_SWEEP_INTERVAL="0",
+    )
+    import app as A
+    A.app.config.update(TESTING=True, WTF_CSRF_ENABLED=False,
+                        SESSION_COOKIE_SECURE=False, SESSION_COOKIE_DOMAIN=None)
+    A.limiter.enabled = False
+    return A
+
+
+def build(case, sessions):
+    """Return a zero-argument callable performing one call of ``case``."""
+    kind, fx, *rest = case.split("/")
+    form = dict(FIXTURES[fx])
+    A = _load_app(sessions)
+
+    if kind in TEXT_KINDS:
+        if kind == "csv_to_list":
+            raw = form.get("skills") or form["name"]
+            return lambda: A.csv_to_list(raw)
+        text = form.get("summary") or form["name"]
+        if kind == "clean_text_app":
+            return lambda: A.clean_text(text, 1200)
+        import utils
+        return lambda: utils.clean_text(text, 1200)
+
+    form["theme"] = rest[0]
+    client = A.app.test_client()
+
+    def post():
+        resp = client.post("/", data=form)
+        assert resp.status_code == 302, f"index POST returned {resp.status_code}"
+
+    if kind == "index_post":
+        return post
+    if kind == "render_html":
+        from tools.fixtures import as_data
+        data = as_data(form, rest[0])
+
+        def render_html():
+            with A.app.test_request_context():
+                A.render_resume_html(data)
+        return render_html
+
+    post()  # put the fixture in the session
+    url = {"resume_pdf": "/resume.pdf", "resume_jpg": "/resume.jpg", "resume_docx": "/resume.docx"}[kind]
+
+    def get():
+        resp = client.get(url)
+        assert resp.status_code == 200, f"{url} returned {resp.status_code}: {resp.data[:200]!r}"
+    return get
+
+
+def run_case(case):
+    """Time one case in this process; returns its report entry."""
+    kind = case.split("/")[0]
+    samples, inner = {**RENDER_KINDS, **TEXT_KINDS}[kind]
+    wall, cpu = [], []
+    with tempfile.TemporaryDirectory(prefix="bench-sessions-") as sessions:
+        op = build(case, sessions)
+        op()  # warm templates, fonts and caches outside the measurement
+        for _ in range(samples):
+            w0, c0 = time.perf_counter(), time.process_time()
+            for _ in range(inner):
+                op()
+            wall.append((time.perf_counter() - w0) * 1000 / inner)
+            cpu.append((time.process_time() - c0) * 1000 / inner)
+    return dict(
+        wall_ms=round(statistics.median(wall), 4),
+        wall_ms_min=round(min(wall), 4),
+        wall_ms_stdev=round(statistics.stdev(wall), 4) if len(wall) > 1 else 0.0,
+        cpu_ms=round(statistics.median(cpu), 4),
+        peak_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        calls=samples * inner,
+    )
+
+
+def run_all(cases):
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for case in cases:
+        # one short-lived process per case, so ru_maxrss is this case's peak
+        with ctx.Pool(1, maxtasksperchild=1) as pool:
+            try:
+                results[case] = pool.apply(run_case, (case,))
+            except Exception as e:
+                results[case] = dict(error=f"{type(e).__name__}: {e}")
+        r = results[case]
+        line = r.get("error") or f"{r['wall_ms']:10.3f} ms  {r['cpu_ms']:10.3f} cpu ms  {r['peak_rss_kb']:8d} KiB"
+        print(f"{case:<40} {line}", file=sys.stderr)
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Return a list of regression messages (current vs baseline cases)."""
+    regressions = []
+    for case, cur in sorted(current.items()):
+        base = baseline.get(case)
+        if not base or "error" in base:
+            continue
+        if "error" in cur:
+            regressions.append(f"{case}: {cur['error']}")
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), cur.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            mark = "REGRESSION" if change > threshold else ""
+            print(f"{case:<40} {metric:<12} {old:>12.3f} -> {new:>12.3f} {change:+8.1%} {mark}", file=sys.stderr)
+            if mark:
+                regressions.append(f"{case} {metric} {change:+.1%}")
+    return regressions
+
+
+def profile(case, out_path):
+    import cProfile
+    import pstats
+
+    kind = case.split("/")[0]
+    samples, inner = {**RENDER_KINDS, **TEXT_KINDS}[kind]
+    prof = cProfile.Profile()
+    with tempfile.TemporaryDirectory(prefix="bench-sessions-") as sessions:
+        op = build(case, sessions)
+        op()
+        prof.enable()
+        for _ in range(samples * inner):
+            op()
+        prof.disable()
+    prof.dump_stats(out_path)
+    pstats.Stats(prof).sort_stats("cumulative").print_stats(25)
+    print(f"wrote {out_path}", file=sys.stderr)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-k", "--filter", action="append", default=[],
+                    help="only cases containing this substring (repeatable)")
+    ap.add_argument("-o", "--output", help="write the JSON report here (default: stdout)")
+    ap.add_argument("--baseline", help="saved report to compare against")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="allowed relative increase per metric before failing (default 0.10)")
+    ap.add_argument("--list", action="store_true", help="print case names and exit")
+    ap.add_argument("--profile", metavar="CASE", help="run one case under cProfile")
+    ap.add_argument("--profile-out", help="cProfile output path (default bench-<case>.prof)")
+    args = ap.parse_args(argv)
+
+    cases = [c for c in all_cases() if not args.filter or any(f in c for f in args.filter)]
+    if args.list:
+        print("\n".join(cases))
+        return 0
+    if args.profile:
+        if args.profile not in all_cases():
+            ap.error(f"unknown case {args.profile!r} (see --list)")
+        out = args.profile_out or f"bench-{args.profile.replace('/', '-')}.prof"
+        profile(args.profile, out)
+        return 0
+
+    results = run_all(cases)
+    report = dict(
+        meta=dict(python=platform.python_version(), platform=platform.platform(),
+                  cpus=os.cpu_count(), created=time.strftime("%Y-%m-%dT%H:%M:%S%z")),
+        cases=results,
+    )
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    failed = [c for c, r in results.items() if "error" in r]
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["cases"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:", file=sys.stderr)
+            for r in regressions:
+                print("  " + r, file=sys.stderr)
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Per-hit overhead of the limiter storages, plus a cross-process correctness check.
+
+    python -m tools.bench_limiter [-n 20000] [--procs 4]
+
+Times ``hit()`` for the fixed-window and moving-window strategies on
+``memory://`` and the shared ``sqlite://`` backend, then has several
+processes hammer one key and checks that exactly ``limit`` hits were allowed
+in total (``memory://`` would allow ``limit`` per process).
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+
+import limiter_storage  # noqa: F401  registers sqlite://
+
+STRATEGIES = (("fixed-window", FixedWindowRateLimiter), ("moving-window", MovingWindowRateLimiter))
+
+
+def time_hits(uri, strategy, n):
+    limiter = strategy(storage_from_string(uri))
+    item = parse(f"{n * 2}/hour")  # never trips, so every call does the full write path
+    limiter.hit(item, "warm")
+    t0 = time.perf_counter()
+    for i in range(n):
+        limiter.hit(item, "bench", str(i % 64))
+    hit_us = (time.perf_counter() - t0) / n * 1e6
+    t0 = time.perf_counter()
+    for i in range(n):
+        limiter.test(item, "bench", str(i % 64))
+    test_us = (time.perf_counter() - t0) / n * 1e6
+    return hit_us, test_us
+
+
+def _hammer(args):
+    uri, strategy_name, limit, tries = args
+    strategy = dict(STRATEGIES)[strategy_name]
+    limiter = strategy(storage_from_string(uri))
+    item = parse(f"{limit}/hour")
+    return sum(limiter.hit(item, "shared") for _ in range(tries))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-n", type=int, default=20000, help="hits per measurement")
+    ap.add_argument("--procs", type=int, default=4, help="processes for the correctness check")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    sqlite_uri = "sqlite://" + os.path.join(tmp, "limits.db")
+    print(f"{'storage':<10} {'strategy':<14} {'hit() us':>10} {'test() us':>10}")
+    for uri in ("memory://", sqlite_uri):
+        for name, strategy in STRATEGIES:
+            hit_us, test_us = time_hits(uri, strategy, args.n)
+            print(f"{uri.split(':')[0]:<10} {name:<14} {hit_us:10.1f} {test_us:10.1f}")
+
+    limit, tries = 500, 400
+    with multiprocessing.get_context("spawn").Pool(args.procs) as pool:
+        for name, _ in STRATEGIES:
+            storage_from_string(sqlite_uri).reset()
+            allowed = sum(pool.map(_hammer, [(sqlite_uri, name, limit, tries)] * args.procs))
+            status = "ok" if allowed == min(limit, tries * args.procs) else "MISMATCH"
+            print(f"{args.procs} procs x {tries} hits, limit {limit} ({name}): allowed {allowed} [{status}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark: job-description matching cost vs taxonomy size.
+
+    python -m tools.bench_taxonomy [--sizes 1000,5000,20000,50000] [--kb 16] [-n 20]
+
+Builds synthetic taxonomies (one- to four-word terms over a pseudo-word
+vocabulary, plus the bundled data/skills.txt) and times, per size, the
+automaton build, its memory, and a scan of a ``--kb`` job description
+against a naive baseline that looks for every term in turn. The automaton's
+µs/KB should stay roughly flat as the taxonomy grows while the baseline
+grows with the number of terms. Both must find the same terms.
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+import taxonomy
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice("bcdfghjklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+
+
+def synthetic(size: int, seed: int = 1):
+    """(entries, vocabulary) for a taxonomy of size terms plus the bundled ones."""
+    rng = random.Random(seed)
+    vocab = sorted({_word(rng) for _ in range(max(2000, size // 2))})
+    with open(taxonomy.DATA_PATH, encoding="utf-8") as f:
+        entries = list(taxonomy.parse(f))
+    seen = {taxonomy.key(c) for _, c, _ in entries}
+    while len(entries) < size:
+        name = " ".join(rng.choice(vocab) for _ in range(rng.choice((1, 1, 2, 2, 3, 4))))
+        if name not in seen:
+            seen.add(name)
+            alias = [(name, True)] + ([(name.replace(" ", ""), True)] if " " in name else [])
+            entries.append(("skills", name.title(), alias))
+    return entries, vocab
+
+
+def description(entries, vocab, kb: int, seed: int = 2) -> str:
+    """About kb KB of filler words with a term every ~15 words."""
+    rng = random.Random(seed)
+    filler = ["the", "and", "with", "experience", "team", "years", "strong", "we", "you", "build"] + vocab[:200]
+    words, size = [], 0
+    while size < kb * 1024:
+        w = rng.choice(entries)[1] if rng.random() < 1 / 15 else rng.choice(filler)
+        words.append(w + rng.choice((" ", " ", ", ", ". ")))
+        size += len(words[-1])
+    return "".join(words)
+
+
+def naive(terms, text: str) -> set:
+    """Baseline: one substring search per alias over the tokenized text."""
+    haystack = f" {taxonomy.key(text)} "
+    return {tid for tid, k in terms if f" {k} " in haystack}
+
+
+def _best(fn, n: int) -> float:
+    best = float("inf")
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="1000,5000,20000,50000", help="taxonomy sizes (terms)")
+    ap.add_argument("--kb", type=int, default=16, help="job description size in KB")
+    ap.add_argument("-n", type=int, default=20, help="repetitions (best time is reported)")
+    args = ap.parse_args(argv)
+
+    print(f"{'terms':>7} {'nodes':>8} {'build ms':>9} {'MB':>6} {'scan µs/KB':>11} {'naive µs/KB':>12} "
+          f"{'found':>6}")
+    ok = True
+    for size in (int(s) for s in args.sizes.split(",")):
+        entries, vocab = synthetic(size)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        tax = taxonomy.Taxonomy(entries)
+        build = time.perf_counter() - t0
+        mem = tracemalloc.get_traced_memory()[0] / 2 ** 20
+        tracemalloc.stop()
+        text = description(entries, vocab, args.kb)
+        kb = len(text.encode("utf-8")) / 1024
+        terms = [(tid, k) for tid, (_, _, names) in enumerate(entries)
+                 for k in {taxonomy.key(a) for a, scan in names if scan} if k]
+        found = set(tax.scan(text))
+        if found != naive(terms, text):
+            ok = False
+            print(f"MISMATCH at {size} terms", file=sys.stderr)
+        scan = _best(lambda: tax.scan(text), args.n)
+        slow = _best(lambda: naive(terms, text), max(1, args.n // 4))
+        print(f"{len(tax):>7} {len(tax._goto):>8} {build * 1e3:9.1f} {mem:6.1f} {scan * 1e6 / kb:11.1f} "
+              f"{slow * 1e6 / kb:12.1f} {len(found):>6}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Microbenchmark: textnorm vs the original cleaners.
+
+    python -m tools.bench_textnorm [-n 20000]
+
+The original implementations below are also the reference outputs of
+tests/test_textnorm.py, which checks equivalence on generated inputs.
+"""
+import argparse
+import re
+import time
+import unicodedata
+
+import bleach
+
+import textnorm
+
+# -----------------------------------------------------------------------------
+# Original implementations (reference outputs)
+# -----------------------------------------------------------------------------
+SAFE_ITEM = re.compile(r"[^A-Za-z0-9 +#.\-]")
+SAFE_PUNCT = r""".,:;!?'"()[]{}@#$%^&*-_+=/\\|~"""
+SAFE_CHARS = re.compile(fr"[^0-9A-Za-z\s{re.escape(SAFE_PUNCT)}]")
+CONTROL_CHARS = ''.join(map(chr, list(range(0, 32)) + [127]))
+CONTROL_TABLE = str.maketrans('', '', CONTROL_CHARS)
+
+
+def old_csv_to_list(raw: str, limit: int = 24):
+    items = []
+    for s in (raw or "").split(","):
+        t = SAFE_ITEM.sub("", s).strip()
+        if t:
+            items.append(t)
+    seen = set()
+    out = []
+    for i in items:
+        k = i.lower()
+        if k not in seen:
+            seen.add(k)
+            out.append(i)
+    return out[:limit]
+
+
+def old_app_clean_text(s: str, n: int):
+    s = (s or "").strip()
+    s = re.sub(r"\s+", " ", s)
+    s = re.sub(r"[\x00-\x08\x0b-\x1f\x7f]", "", s)
+    return s[:n]
+
+
+def old_utils_clean_text(s: str, max_len: int = 500) -> str:
+    if not s:
+        return ""
+    s = unicodedata.normalize("NFKC", s)
+    s = s.translate(CONTROL_TABLE)
+    s = re.sub(r"[\u200b-\u200f\u202a-\u202e\u2066-\u2069]", "", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    s = SAFE_CHARS.sub("", s)
+    s = s[:max_len]
+    s = bleach.clean(s, tags=[], attributes={}, strip=True)
+    return s
+
+
+# -----------------------------------------------------------------------------
+# Benchmark
+# -----------------------------------------------------------------------------
+FORM = dict(
+    name="Jane Doe", email="jane@example.com", phone="+1 (555) 123-4567", role="Backend Engineer",
+    location="Austin, TX", years="8", linkedin="https://linkedin.com/in/janedoe",
+    github="https://github.com/janedoe", portfolio="https://jane.dev",
+    summary="Backend engineer with eight years of experience building\r\nAPIs and data pipelines.  " * 8,
+    skills="Python, Flask, PostgreSQL, python, Docker, AWS, C++, C#, Kubernetes, Redis",
+    certifications="AWS Solutions Architect, CKA", languages="English, Spanish",
+)
+FIELDS = dict(name=80, email=120, phone=40, role=100, location=120, years=10,
+              summary=1200, linkedin=200, github=200, portfolio=200)
+LISTS = ("skills", "certifications", "languages")
+
+
+def old_form(values):
+    data = {k: old_app_clean_text(values.get(k) or "", n) for k, n in FIELDS.items()}
+    for k in LISTS:
+        data[f"{k}_list"] = old_csv_to_list(values.get(k))
+    return data
+
+
+def new_form(values):
+    data = {k: textnorm.clean_field(values.get(k) or "", n) for k, n in FIELDS.items()}
+    for k in LISTS:
+        data[f"{k}_list"] = textnorm.split_items(values.get(k) or "")
+    return data
+
+
+def timeit(fn, n):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def bench(n):
+    summary = FORM["summary"]
+    rows = (
+        ("app.clean_text (summary)", lambda: old_app_clean_text(summary, 1200),
+         lambda: textnorm.clean_field(summary, 1200)),
+        ("utils.clean_text (summary)", lambda: old_utils_clean_text(summary, 1200),
+         lambda: textnorm.clean_safe(summary, 1200)),
+        ("csv_to_list (skills)", lambda: old_csv_to_list(FORM["skills"]),
+         lambda: textnorm.split_items(FORM["skills"])),
+        ("whole form (index POST)", lambda: old_form(FORM),
+         lambda: new_form(FORM)),
+    )
+    print(f"{'case':<28} {'old us':>9} {'new us':>9} {'speedup':>8}")
+    for label, old, new in rows:
+        assert old() == new()
+        a, b = timeit(old, n), timeit(new, n)
+        print(f"{label:<28} {a:9.2f} {b:9.2f} {a / b:7.1f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-n", type=int, default=20000, help="iterations per benchmark case")
+    args = ap.parse_args()
+    bench(args.n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Build the theme gallery: the sample resume in every theme, as static files.
+
+    python -m tools.build_gallery [--static static/] [--keep-old]
+
+Renders ``tools.fixtures.TYPICAL`` through the same template, layout and
+DOCX paths as the app, once per ``ResumeRequestForm.theme`` choice, into
+PDF, DOCX, full-size JPEG and thumbnail files with content-hashed names
+under ``<static>/gallery/``, then writes ``manifest.json`` (see gallery.py).
+The manifest is replaced last and atomically, so running servers never see
+it point at a file that isn't there yet. Files from earlier builds are
+deleted unless ``--keep-old`` is given. Run it at deploy time, after the
+templates and CSS are in place.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+THUMB_WIDTH = 240
+
+
+def _write(directory, stem, ext, blob):
+    name = f"{stem}.{hashlib.sha256(blob).hexdigest()[:12]}.{ext}"
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):  # same content, same name: nothing to do
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    return name
+
+
+def build(static_dir: str, keep_old: bool = False) -> dict:
+    # Render inline in this process; no pool, no render cache, no sessions.
+    os.environ["RENDER_POOL_SIZE"] = "0"
+    os.environ["RENDER_CACHE_BYTES"] = "0"
+    os.environ["SESSION_BACKEND"] = "cookie"
+    import app as A
+    from export import Output, export_job
+    from forms import THEME_CHOICES
+    from gallery import GALLERY_DIR, MANIFEST_NAME, MANIFEST_VERSION, manifest_path
+    from generators.docx_builder import render_docx
+    from themes import DEFAULT_THEME
+    from tools.fixtures import TYPICAL, as_data
+
+    out_dir = os.path.join(static_dir, GALLERY_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    jpg, thumb = Output("jpeg"), Output("thumb", width=THUMB_WIDTH, quality=80)
+
+    themes = {}
+    for theme, label in THEME_CHOICES:
+        data = as_data(TYPICAL, theme)
+        with A.app.test_request_context():
+            html = A.render_resume_html(data)
+        products = export_job(html, A.app.root_path, A.render_pool.css_path, theme, [jpg, thumb])
+        files = dict(label=label, thumb_width=THUMB_WIDTH)
+        for key, ext, blob in (("pdf", "pdf", products[Output("pdf")]), ("jpg", "jpg", products[jpg]),
+                               ("thumb", "thumb.jpg", products[thumb]), ("docx", "docx", render_docx(data))):
+            files[key] = f"{GALLERY_DIR}/{_write(out_dir, theme, ext, blob)}"
+        themes[theme] = files
+        print(f"{theme:<10} " + " ".join(files[k].split("/")[-1] for k in ("pdf", "docx", "jpg", "thumb")))
+
+    manifest = dict(version=MANIFEST_VERSION, default_theme=DEFAULT_THEME, themes=themes)
+    fd, tmp = tempfile.mkstemp(dir=out_dir, prefix=".tmp-")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)  # keeps THEME_CHOICES order
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, manifest_path(static_dir))
+
+    if not keep_old:
+        current = {p.split("/")[-1] for files in themes.values()
+                   for k, p in files.items() if k in ("pdf", "docx", "jpg", "thumb")}
+        for name in os.listdir(out_dir):
+            if name != MANIFEST_NAME and name not in current and not name.startswith(".tmp-"):
+                os.remove(os.path.join(out_dir, name))
+    return manifest
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--static", default=None, help="static folder to build into (default: the app's)")
+    ap.add_argument("--keep-old", action="store_true", help="keep files from earlier builds")
+    args = ap.parse_args(argv)
+    static_dir = args.static or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+    build(static_dir, keep_old=args.keep_old)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""PDF size-regression check: sample resumes against a byte budget per profile.
+
+    python -m tools.check_pdf_size [--profiles ats,standard] [--fixtures typical] [--measure]
+
+Renders each fixture in every theme with every PDF profile (see
+pdf_profiles.py) through the same template, layout and ``write_pdf`` path
+as ``/resume.pdf``, and exits 1 if any PDF is larger than
+``BUDGETS[profile][fixture]`` bytes. ``--measure`` prints the sizes and
+never fails; use it to re-baseline after an intended change (fonts
+installed on the build host count: full-font ``print`` PDFs embed them).
+"""
+import argparse
+import os
+import sys
+
+# profile -> fixture -> max bytes (one-page resumes; print embeds full fonts)
+BUDGETS = {
+    "ats": {"small": 30_000, "typical": 40_000, "maximal": 60_000},
+    "standard": {"small": 35_000, "typical": 50_000, "maximal": 80_000},
+    "print": {"small": 2_500_000, "typical": 2_500_000, "maximal": 3_000_000},
+}
+
+
+def measure(profiles, fixtures):
+    """Yield (profile, fixture, theme, size in bytes)."""
+    # Render inline in this process; no pool, no render cache, no sessions.
+    os.environ["RENDER_POOL_SIZE"] = "0"
+    os.environ["RENDER_CACHE_BYTES"] = "0"
+    os.environ["SESSION_BACKEND"] = "cookie"
+    import app as A
+    from export import PDF, export_job
+    from tools.fixtures import FIXTURES, THEMES, as_data
+
+    for fixture in fixtures:
+        for theme in THEMES:
+            data = as_data(FIXTURES[fixture], theme)
+            with A.app.test_request_context():
+                html = A.render_resume_html(data)
+            for profile in profiles:
+                pdf = export_job(html, A.app.root_path, A.render_pool.css_path, theme, [], profile)[PDF]
+                yield profile, fixture, theme, len(pdf)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--profiles", default=",".join(BUDGETS), help="comma-separated profiles")
+    ap.add_argument("--fixtures", default="small,typical,maximal", help="comma-separated fixtures")
+    ap.add_argument("--measure", action="store_true", help="print sizes only, never fail")
+    args = ap.parse_args(argv)
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    fixtures = [f.strip() for f in args.fixtures.split(",") if f.strip()]
+    unknown = [p for p in profiles if p not in BUDGETS]
+    if unknown:
+        ap.error(f"no budget for profile(s): {', '.join(unknown)}")
+
+    over = 0
+    print(f"{'profile':<9} {'fixture':<8} {'theme':<9} {'bytes':>10} {'budget':>10}")
+    for profile, fixture, theme, size in measure(profiles, fixtures):
+        budget = BUDGETS[profile].get(fixture)
+        status = ""
+        if budget is not None and size > budget and not args.measure:
+            over += 1
+            status = f"  OVER by {size - budget} bytes"
+        print(f"{profile:<9} {fixture:<8} {theme:<9} {size:>10} {budget if budget else '-':>10}{status}")
+    if over:
+        print(f"{over} PDF(s) over budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
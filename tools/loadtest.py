@@ -0,0 +1,336 @@
+"""Load test: replay form submissions and downloads at a target arrival rate.
+
+    python -m tools.loadtest --url http://127.0.0.1:8001 --rate 5 --duration 30
+    python -m tools.loadtest --sweep --workers 1,2,4 --threads 2,4,8 [--rates 1,2,4,8,16]
+
+Each simulated user is one session, started on an open-loop Poisson
+schedule (``--rate`` sessions per second, whether or not earlier ones have
+finished):
+
+1. ``GET /`` and pull the CSRF token out of the form;
+2. ``POST /`` a ``ResumeRequestForm`` payload (the tools.fixtures resumes
+   in random themes, or one JSON object of form fields per line of
+   ``--payloads``), then follow the PRG redirect to ``/success``;
+3. fetch the success page's thumbnail, then download PDF/JPG/DOCX, each
+   with the probability given by ``--mix``.
+
+Cookies are kept by hand: the app's session cookie is ``Secure`` and bound
+to the production domain, so a cookie jar would never send it back to a
+plain-HTTP local instance. Reported: sessions and requests per second,
+p50/p99 per endpoint, and 429 (Flask-Limiter) and 5xx counts.
+
+``--sweep`` starts gunicorn (gunicorn.conf.py) for each workers x threads
+combination on a free port, with scratch session/metrics/job directories
+and rate limits off (``--keep-limits`` leaves them on), then raises the
+arrival rate until the box saturates: the saturation point is the highest
+rate at which the backlog left when arrivals stopped drained within
+``--slo`` seconds, p99 stayed under ``--slo`` and fewer than 1% of
+requests failed.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from tools.fixtures import FIXTURES, THEMES
+
+CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"|value="([^"]+)"[^>]*name="csrf_token"')
+DOWNLOADS = {"pdf": "/resume.pdf", "jpg": "/resume.jpg", "docx": "/resume.docx", "thumb": "/resume.thumb.jpg?w=240"}
+DEFAULT_MIX = "thumb=1,pdf=0.8,jpg=0.3,docx=0.4"
+
+
+def _quantile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}   # endpoint -> [seconds]
+        self.status = {}    # endpoint -> {status: count}
+        self.sessions = self.failed_sessions = 0
+
+    def record(self, endpoint, status, seconds):
+        with self._lock:
+            self.latency.setdefault(endpoint, []).append(seconds)
+            counts = self.status.setdefault(endpoint, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    def session_done(self, ok):
+        with self._lock:
+            self.sessions += 1
+            self.failed_sessions += not ok
+
+    def summary(self, elapsed) -> dict:
+        endpoints = {}
+        for name, lat in self.latency.items():
+            counts = self.status[name]
+            endpoints[name] = dict(
+                requests=len(lat), p50_ms=_quantile(lat, .5) * 1000, p99_ms=_quantile(lat, .99) * 1000,
+                rate_limited=counts.get(429, 0),
+                server_errors=sum(n for s, n in counts.items() if s >= 500),
+                transport_errors=counts.get(0, 0),
+            )
+        requests = sum(e["requests"] for e in endpoints.values())
+        failed = sum(e["rate_limited"] + e["server_errors"] + e["transport_errors"] for e in endpoints.values())
+        all_lat = [x for lat in self.latency.values() for x in lat]
+        return dict(
+            seconds=elapsed, sessions=self.sessions, failed_sessions=self.failed_sessions,
+            sessions_per_s=self.sessions / elapsed if elapsed else 0.0,
+            requests_per_s=requests / elapsed if elapsed else 0.0,
+            requests=requests, failed_requests=failed, p99_ms=_quantile(all_lat, .99) * 1000,
+            endpoints=endpoints,
+        )
+
+
+class Client:
+    """One user: a keep-alive connection and a hand-kept cookie dict."""
+
+    def __init__(self, base, stats, timeout):
+        parts = urlsplit(base)
+        conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.conn = conn_class(parts.hostname, parts.port, timeout=timeout)
+        self.host = parts.netloc
+        self.stats = stats
+        self.cookies = {}
+
+    def request(self, endpoint, method, path, body=None, headers=None):
+        """Returns (status, headers, body); status 0 on a transport error."""
+        headers = dict(headers or {}, Host=self.host)
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        t0 = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            resp = self.conn.getresponse()
+            data = resp.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.stats.record(endpoint, 0, time.perf_counter() - t0)
+            return 0, {}, b""
+        self.stats.record(endpoint, resp.status, time.perf_counter() - t0)
+        for value in resp.headers.get_all("Set-Cookie") or ():
+            name, _, rest = value.partition("=")
+            self.cookies[name.strip()] = rest.split(";", 1)[0]
+        return resp.status, resp.headers, data
+
+    def close(self):
+        self.conn.close()
+
+
+def user_session(base, payload, mix, stats, timeout):
+    c = Client(base, stats, timeout)
+    ok = False
+    try:
+        status, _, body = c.request("GET /", "GET", "/")
+        m = CSRF_RE.search(body.decode("utf-8", "replace")) if status == 200 else None
+        if not m:
+            return
+        form = dict(payload, csrf_token=m.group(1) or m.group(2))
+        status, headers, _ = c.request("POST /", "POST", "/", urlencode(form),
+                                       {"Content-Type": "application/x-www-form-urlencoded"})
+        if status != 302:
+            return
+        location = urlsplit(headers.get("Location", "/success"))
+        status, _, _ = c.request("GET /success", "GET", location.path or "/success")
+        if status != 200:
+            return
+        ok = True
+        for fmt, p in mix.items():
+            if random.random() < p:
+                status, _, _ = c.request(f"GET {fmt}", "GET", DOWNLOADS[fmt])
+                ok = ok and status in (200, 206)
+    finally:
+        c.close()
+        stats.session_done(ok)
+
+
+def load_payloads(path):
+    if not path:
+        return [dict(form, theme=theme) for form in FIXTURES.values() for theme in THEMES]
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run(base, rate, duration, payloads, mix, concurrency=256, timeout=60.0, seed=None) -> dict:
+    """Open-loop run: Poisson arrivals at rate sessions/s for duration seconds."""
+    rng = random.Random(seed)
+    stats = Stats()
+    offered = 0
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        next_at = t0
+        while True:
+            next_at += rng.expovariate(rate)
+            if next_at - t0 >= duration:
+                break
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(user_session, base, rng.choice(payloads), mix, stats, timeout)
+            offered += 1
+    # sessions still running when arrivals stop count toward the elapsed time
+    summary = stats.summary(time.perf_counter() - t0)
+    summary.update(offered=offered, offered_per_s=offered / duration,
+                   drain_s=max(0.0, summary["seconds"] - duration))
+    return summary
+
+
+def print_summary(label, s):
+    print(f"\n{label}: {s['sessions']} sessions ({s['failed_sessions']} failed) in {s['seconds']:.1f}s, "
+          f"{s['sessions_per_s']:.2f} sessions/s, {s['requests_per_s']:.1f} req/s, "
+          f"{s['drain_s']:.1f}s to drain after arrivals stopped")
+    print(f"  {'endpoint':<13} {'requests':>8} {'p50 ms':>9} {'p99 ms':>9} {'429':>6} {'5xx':>6} {'conn err':>8}")
+    for name, e in s["endpoints"].items():
+        print(f"  {name:<13} {e['requests']:>8} {e['p50_ms']:9.1f} {e['p99_ms']:9.1f} "
+              f"{e['rate_limited']:>6} {e['server_errors']:>6} {e['transport_errors']:>8}")
+
+
+# -- sweep ---------------------------------------------------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(base, proc, timeout=60):
+    parts = urlsplit(base)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"gunicorn exited with {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            conn.request("GET", "/healthz")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("gunicorn did not become healthy")
+
+
+def start_server(workers, threads, scratch, keep_limits, log):
+    port = _free_port()
+    env = dict(
+        os.environ, GUNICORN_BIND=f"127.0.0.1:{port}", GUNICORN_WORKERS=str(workers),
+        GUNICORN_THREADS=str(threads), SESSION_STORE_DIR=os.path.join(scratch, "sessions"),
+        METRICS_DIR=os.path.join(scratch, "metrics"), JOBS_DB=os.path.join(scratch, "jobs.db"),
+        LIMITER_STORAGE_URI="sqlite://" + os.path.join(scratch, "limits.db"),
+    )
+    if not keep_limits:
+        env["RATELIMIT_ENABLED"] = "0"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+                            cwd=root, env=env, stdout=log, stderr=log)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        _wait_healthy(base, proc)
+    except BaseException:
+        proc.kill()
+        raise
+    return proc, base
+
+
+def saturated(s, slo) -> bool:
+    """Fell behind (backlog took longer than the SLO to drain), too slow, or failing."""
+    return (s["drain_s"] > slo or s["p99_ms"] > slo * 1000
+            or s["failed_requests"] > 0.01 * max(1, s["requests"]))
+
+
+def sweep(args, payloads, mix):
+    results = []
+    rates = [float(r) for r in args.rates.split(",")]
+    for workers in (int(w) for w in args.workers.split(",")):
+        for threads in (int(t) for t in args.threads.split(",")):
+            scratch = tempfile.mkdtemp(prefix="loadtest-")
+            with open(os.path.join(scratch, "gunicorn.log"), "wb") as log:
+                proc, base = start_server(workers, threads, scratch, args.keep_limits, log)
+                try:
+                    run(base, 1.0, min(5.0, args.duration), payloads, mix)  # warm-up
+                    best, runs = None, []
+                    for rate in rates:
+                        s = run(base, rate, args.duration, payloads, mix, args.concurrency, args.timeout)
+                        runs.append(dict(rate=rate, **s))
+                        if not args.quiet:
+                            print_summary(f"workers={workers} threads={threads} rate={rate:g}/s", s)
+                        if saturated(s, args.slo):
+                            break
+                        best = rate
+                    results.append(dict(workers=workers, threads=threads, saturation_rate=best, runs=runs))
+                finally:
+                    proc.send_signal(signal.SIGTERM)
+                    try:
+                        proc.wait(30)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"\n{'workers':>7} {'threads':>7} {'saturation (sessions/s)':>24} {'p99 ms there':>13}")
+    for r in results:
+        at = next((x for x in r["runs"] if x["rate"] == r["saturation_rate"]), None)
+        sat = f"{r['saturation_rate']:g}" if r["saturation_rate"] else f"< {rates[0]:g}"
+        print(f"{r['workers']:>7} {r['threads']:>7} {sat:>24} {at['p99_ms'] if at else float('nan'):13.1f}")
+    return results
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        fmt, _, p = part.partition("=")
+        fmt = fmt.strip()
+        if fmt not in DOWNLOADS:
+            raise SystemExit(f"unknown download {fmt!r} (one of {', '.join(DOWNLOADS)})")
+        mix[fmt] = float(p or 1)
+    return mix
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--url", default="http://127.0.0.1:8001", help="running instance (without --sweep)")
+    ap.add_argument("--rate", type=float, default=2.0, help="new sessions per second")
+    ap.add_argument("--duration", type=float, default=30.0, help="seconds of arrivals per run")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="download probabilities per session")
+    ap.add_argument("--payloads", help="JSONL file of form payloads (default: tools.fixtures)")
+    ap.add_argument("--concurrency", type=int, default=256, help="max sessions in flight")
+    ap.add_argument("--timeout", type=float, default=60.0, help="per-request timeout, seconds")
+    ap.add_argument("--sweep", action="store_true", help="start gunicorn per workers x threads and find saturation")
+    ap.add_argument("--workers", default="1,2,4", help="--sweep: gunicorn worker counts")
+    ap.add_argument("--threads", default="1,4", help="--sweep: threads per worker")
+    ap.add_argument("--rates", default="1,2,4,8,16,32", help="--sweep: arrival rates to step through")
+    ap.add_argument("--slo", type=float, default=5.0, help="--sweep: p99 limit in seconds")
+    ap.add_argument("--keep-limits", action="store_true", help="--sweep: leave Flask-Limiter on")
+    ap.add_argument("--quiet", action="store_true", help="--sweep: only print the final table")
+    ap.add_argument("-o", "--output", help="also write the JSON report here")
+    args = ap.parse_args(argv)
+
+    payloads = load_payloads(args.payloads)
+    mix = parse_mix(args.mix)
+    if args.sweep:
+        report = sweep(args, payloads, mix)
+    else:
+        report = run(args.url.rstrip("/"), args.rate, args.duration, payloads, mix, args.concurrency, args.timeout)
+        print_summary(f"{args.url} at {args.rate:g} sessions/s", report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
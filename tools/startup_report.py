@@ -0,0 +1,163 @@
+"""Startup-time report: lazy vs eager vs preload worker boot.
+
+    python -m tools.startup_report [--workers 2] [--pool-size 0] [-o startup.json]
+
+Each mode runs in a fresh interpreter that plays gunicorn: a "master"
+process forks ``--workers`` workers, and each worker serves the form page
+and then its first PDF (no render cache) through the test client.
+
+By default the PDF renders inline (RENDER_POOL_SIZE=0), the only
+configuration in which ``app.preload()`` warms WeasyPrint. ``--pool-size N``
+measures the pooled configuration instead: each worker starts its render
+pool as post_fork does, and the first PDF includes waiting for the pool
+processes, which warm themselves whatever the mode.
+
+* ``lazy``    -- workers import app after the fork (the default config);
+  render dependencies load on the first PDF.
+* ``eager``   -- workers import app and run ``app.preload()`` themselves,
+  i.e. every worker pays for all imports and the warm-up, as before.
+* ``preload`` -- the master imports app and runs ``app.preload()`` once;
+  workers fork with it already loaded (GUNICORN_PRELOAD=1).
+
+Reported per mode: master boot, worker boot (fork until ready), first form
+GET, first PDF, and worker memory from /proc/<pid>/smaps_rollup (RSS, PSS
+and USS = private pages, the memory each extra worker really costs).
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ("lazy", "eager", "preload")
+
+
+def _memory_kb():
+    out = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                    out[key] = int(rest.split()[0])
+    except OSError:
+        import resource
+        return dict(rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    return dict(rss_kb=out.get("Rss"), pss_kb=out.get("Pss"),
+                uss_kb=out.get("Private_Clean", 0) + out.get("Private_Dirty", 0))
+
+
+def _worker(mode, t_fork, conn):
+    clock = time.perf_counter
+    import app as A
+    if mode == "eager":
+        A.preload()
+    A.app.config.update(TESTING=True, WTF_CSRF_ENABLED=False,
+                        SESSION_COOKIE_SECURE=False, SESSION_COOKIE_DOMAIN=None)
+    A.limiter.enabled = False
+    if A.render_pool.size:
+        A.render_pool.start()  # as gunicorn's post_fork hook does
+    report = dict(worker_boot_ms=(clock() - t_fork) * 1000)
+
+    from tools.fixtures import TYPICAL
+    client = A.app.test_client()
+    t0 = clock()
+    assert client.get("/").status_code == 200
+    report["first_form_ms"] = (clock() - t0) * 1000
+    assert client.post("/", data=TYPICAL).status_code == 302
+    t0 = clock()
+    resp = client.get("/resume.pdf")
+    assert resp.status_code == 200, resp.data[:200]
+    report["first_pdf_ms"] = (clock() - t0) * 1000
+    report.update(_memory_kb())
+    os.write(conn, (json.dumps(report) + "\n").encode())
+    A.render_pool.shutdown()
+
+
+def child(mode, workers):
+    """Run one mode in this (fresh) interpreter and print its JSON report."""
+    clock = time.perf_counter
+    t0 = clock()
+    if mode == "preload":
+        import app as A
+        A.preload()
+    master_boot_ms = (clock() - t0) * 1000
+
+    r, w = os.pipe()
+    pids = []
+    for _ in range(workers):
+        t_fork = clock()
+        pid = os.fork()
+        if pid == 0:
+            os.close(r)
+            code = 0
+            try:
+                _worker(mode, t_fork, w)
+            except BaseException as e:
+                os.write(w, (json.dumps(dict(error=f"{type(e).__name__}: {e}")) + "\n").encode())
+                code = 1
+            os._exit(code)
+        pids.append(pid)
+        os.waitpid(pid, 0)  # one at a time, like a rolling restart
+    os.close(w)
+    with os.fdopen(r) as f:
+        results = [json.loads(line) for line in f if line.strip()]
+    print(json.dumps(dict(mode=mode, master_boot_ms=master_boot_ms, workers=results)))
+
+
+def run_mode(mode, workers, pool_size=0):
+    scratch = tempfile.mkdtemp(prefix="startup-report-")
+    env = dict(os.environ, RENDER_POOL_SIZE=str(pool_size), RENDER_CACHE_BYTES="0",
+               LIMITER_STORAGE_URI="memory://", SESSION_SWEEP_INTERVAL="0",
+               SESSION_STORE_DIR=os.path.join(scratch, "sessions"),
+               METRICS_DIR=os.path.join(scratch, "metrics"))
+    proc = subprocess.run([sys.executable, "-m", "tools.startup_report", "--child", mode,
+                           "--workers", str(workers)], env=env, capture_output=True, text=True)
+    shutil.rmtree(scratch, ignore_errors=True)
+    if proc.returncode:
+        raise SystemExit(f"{mode} run failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--workers", type=int, default=2, help="workers forked per mode")
+    ap.add_argument("--pool-size", type=int, default=0,
+                    help="render pool processes per worker (0 = inline, where preload warms WeasyPrint)")
+    ap.add_argument("--modes", default=",".join(MODES), help="comma-separated subset of " + ",".join(MODES))
+    ap.add_argument("-o", "--output", help="also write the JSON report here")
+    ap.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        child(args.child, args.workers)
+        return 0
+
+    reports = [run_mode(m.strip(), args.workers, args.pool_size) for m in args.modes.split(",") if m.strip()]
+    print(f"render pool: {args.pool_size or 'off (inline renders)'}")
+    cols = ("worker_boot_ms", "first_form_ms", "first_pdf_ms", "rss_kb", "pss_kb", "uss_kb")
+    print(f"{'mode':<8} {'master ms':>10} " + " ".join(f"{c:>15}" for c in cols))
+    for rep in reports:
+        errors = [w["error"] for w in rep["workers"] if "error" in w]
+        if errors:
+            print(f"{rep['mode']:<8} worker failed: {errors[0]}")
+            continue
+        means = [_mean([w.get(c) for w in rep["workers"]]) for c in cols]
+        print(f"{rep['mode']:<8} {rep['master_boot_ms']:10.1f} "
+              + " ".join(f"{m:15.1f}" if m is not None else f"{'-':>15}" for m in means))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# weasy_compat.py
+"""WeasyPrint import with the pydyf shim applied.
+
+Both the web app and the render worker processes import WeasyPrint from here
+so the shim runs exactly once per process, before WeasyPrint is loaded.
+"""
+import importlib
+
+# -----------------------------------------------------------------------------
+# pydyf compatibility shim (MUST run before importing weasyprint)
+# Some environments expose pydyf.PDF.__init__(self) while WeasyPrint>=53
+# calls PDF(version, identifier). This shim normalizes the constructor
+# and patches the symbol inside weasyprint.pdf as well.
+# -----------------------------------------------------------------------------
+_PATCH_WPDF = None
+try:
+    import inspect
+    import pydyf
+    sig = str(inspect.signature(pydyf.PDF.__init__))
+    if sig == "(self)":
+        _OldPDF = pydyf.PDF
+
+        class _ShimPDF(_OldPDF):  # keep class name semantics
+            def __init__(self, version="1.7", identifier=None):
+                super().__init__()  # ignore args for old API
+
+        pydyf.PDF = _ShimPDF
+
+        def _patch_weasyprint_pdf():
+            try:
+                wpdf = importlib.import_module("weasyprint.pdf")
+                wpdf.PDF = _ShimPDF
+            except Exception:
+                pass
+
+        _PATCH_WPDF = _patch_weasyprint_pdf
+except Exception:
+    _PATCH_WPDF = None
+
+# Import WeasyPrint AFTER the shim
+from weasyprint import HTML, CSS  # noqa: E402
+if _PATCH_WPDF:
+    _PATCH_WPDF()
+
+__all__ = ["HTML", "CSS", "pdf_options"]
+
+
+def pdf_options(options: dict) -> dict:
+    """``write_pdf`` keyword arguments for options, as this WeasyPrint takes them.
+
+    WeasyPrint >= 59 takes the individual flags listed in its DEFAULT_OPTIONS
+    (full_fonts, optimize_images, dpi, ...); older versions only have
+    ``optimize_size``, a tuple of "fonts" (subset) and "images".
+    """
+    import weasyprint
+    known = getattr(weasyprint, "DEFAULT_OPTIONS", None)
+    if known is not None:
+        return {k: v for k, v in options.items() if k in known}
+    return dict(optimize_size=tuple(
+        name for name, on in (("fonts", not options.get("full_fonts")),
+                              ("images", options.get("optimize_images"))) if on))